@@ -2,6 +2,8 @@ from fastapi import APIRouter
 
 from core.config import settings
 from .passport import router as passport_router
+from .traps import router as traps_router
+from .conflicts import router as conflicts_router
 
 router = APIRouter(
     prefix=settings.api.v1.prefix,
@@ -10,3 +12,11 @@ router.include_router(
     passport_router,
     prefix=settings.api.v1.passport,
 )
+router.include_router(
+    traps_router,
+    prefix=settings.api.v1.traps,
+)
+router.include_router(
+    conflicts_router,
+    prefix=settings.api.v1.conflicts,
+)
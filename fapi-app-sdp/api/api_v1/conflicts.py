@@ -0,0 +1,119 @@
+import io
+import json
+import zipfile
+from collections.abc import AsyncIterator, Sequence
+from pathlib import Path
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError, model_validator
+from starlette import status
+
+from sdp_lib.conflicts.batch import (
+    BatchItemResult,
+    SrcConfig,
+    batch_conflicts_calculator,
+    config_classes
+)
+
+
+router = APIRouter(tags=['Conflicts'])
+
+MAX_BATCH_SIZE = 1000
+
+
+class ConflictsBatchItem(BaseModel):
+    name: str | None = None
+    stages: dict[str, str] = Field(..., description='Фаза -> направления через запятую, например {"1": "1,2,3"}')
+
+
+class ConflictsBatchRequest(BaseModel):
+    items: list[ConflictsBatchItem] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+    @model_validator(mode='after')
+    def check_unique_names(self):
+        """ Имя перекрёстка - каталог конфига в архиве, поэтому имена должны быть уникальными. """
+        names = [get_archive_dir_name(name, i) for i, (name, _) in enumerate(get_items(self), 1)]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f'Повторяющиеся имена перекрёстков: {", ".join(duplicates)}')
+        return self
+
+
+def get_items(batch: ConflictsBatchRequest) -> list[tuple[str, dict[str, str]]]:
+    return [(item.name or str(i), item.stages) for i, item in enumerate(batch.items, 1)]
+
+
+def get_archive_dir_name(name: str, i: int) -> str:
+    return Path(name).name or str(i)
+
+
+async def stream_json_array(results: AsyncIterator[BatchItemResult]) -> AsyncIterator[str]:
+    """
+    Отдаёт результаты элементами json-массива по мере готовности.
+    """
+    yield '['
+    first = True
+    async for result in results:
+        yield f'{"" if first else ","}\n{json.dumps(result.as_dict(), ensure_ascii=False)}'
+        first = False
+    yield '\n]\n'
+
+
+def create_zip(results: Sequence[BatchItemResult], src_filename: str) -> bytes:
+    """
+    Архив со сформированными конфигами и results.json с данными расчётов всех перекрёстков.
+    Для перекрёстков с ошибками конфиг не формируется, ошибки доступны в results.json.
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as obj_zip:
+        for i, result in enumerate(results, 1):
+            if result.config is not None:
+                obj_zip.writestr(f'{get_archive_dir_name(result.name, i)}/{src_filename}', result.config)
+        obj_zip.writestr(
+            'results.json',
+            json.dumps([result.as_dict() for result in results], ensure_ascii=False, indent=4)
+        )
+    return buffer.getvalue()
+
+
+@router.post("/batch")
+async def calculate_conflicts_batch(batch: ConflictsBatchRequest):
+    return StreamingResponse(
+        stream_json_array(batch_conflicts_calculator.iter_results(get_items(batch))),
+        media_type='application/json'
+    )
+
+
+@router.post("/batch/configs")
+async def create_configs_batch(
+    controller_type: str = Form(..., description=f'Тип контроллера: {", ".join(config_classes)}'),
+    items: str = Form(..., description='json: {"items": [{"name": "...", "stages": {"1": "1,2,3"}}]}'),
+    src_config: UploadFile = File(..., description='Исходный конфиг .PTC2(Swarco) или .DAT(Peek)'),
+):
+    if controller_type not in config_classes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Недопустимый тип контроллера: {controller_type}. Допустимые: {", ".join(config_classes)}'
+        )
+    try:
+        batch = ConflictsBatchRequest.model_validate_json(items)
+    except ValidationError as err:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=err.errors(include_context=False)
+        )
+
+    src = SrcConfig(src_config.filename or 'config', await src_config.read())
+    try:
+        results = [
+            result async for result in batch_conflicts_calculator.iter_results(get_items(batch), controller_type, src)
+        ]
+    except ValueError as err:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(err))
+    content = await run_in_threadpool(create_zip, results, src.filename)
+    return Response(
+        content,
+        media_type='application/zip',
+        headers={'Content-Disposition': 'attachment; filename=configs.zip'}
+    )
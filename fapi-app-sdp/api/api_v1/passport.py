@@ -1,18 +1,52 @@
-from collections.abc import Sequence
+import json
+from collections.abc import AsyncIterator, Iterator, Sequence
+from dataclasses import dataclass
+from tempfile import SpooledTemporaryFile
 from fastapi.concurrency import run_in_threadpool
 
 from fastapi import APIRouter, HTTPException
 from fastapi import File, UploadFile
 from starlette import status
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
 
-from docx import Document
-from core.config import UPLOADS_URL
-from sdp_lib.passport.api import create_passport
-from utils.files import PassportSaver
+from core.config import UPLOADS_URL, settings
+from sdp_lib.passport.cache import PassportResult
+from sdp_lib.passport.jobs import Job, JobQueueFullError, JobStatus
+from sdp_lib.passport.pool import PassportValidationTimeoutError
+from utils.files import (
+    PassportSaver,
+    iter_zip_stream,
+    passport_job_queue,
+    passport_results_cache,
+    passport_validation_pool
+)
 
 router = APIRouter(tags=['Passport'])
 DIR_NAME = UPLOADS_URL / 'passport'
+DOCX_MEDIA_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+# При потоковой отдаче docx больше этого размера хранится до отправки во временном файле на диске.
+SPOOL_MAX_SIZE = 1024 * 1024
+
+
+@dataclass(slots=True)
+class SpooledResult:
+    """ Результат проверки паспорта для потоковой отдачи: docx во временном файле. """
+    filename: str
+    digest: str
+    file: SpooledTemporaryFile
+
+
+def spool_result(result: PassportResult) -> SpooledResult:
+    file = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    file.write(result.docx)
+    file.seek(0)
+    return SpooledResult(str(result.filename), result.digest, file)
+
+
+def close_spooled_results(results: Sequence[SpooledResult | PassportResult | None]):
+    for result in results:
+        if isinstance(result, SpooledResult):
+            result.file.close()
 
 
 @router.post("/validation")
@@ -27,24 +61,145 @@ async def upload_docx(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail='Не предоставлено ни одного файла для обработки.'
         )
-    allowed_files, bad_files = [], []
-    for f in files:
-        try:
-            doc = Document(f.file)
-            allowed_files.append(create_passport(f.filename, Document(f.file)))
-        except Exception:
-            bad_files.append(f)
+    # Файлы проверяются параллельно в пуле процессов, результаты из кэша по хэшу содержимого
+    # возвращаются без проверки. Порядок результатов соответствует порядку файлов.
+    contents = [(f.filename, await f.read()) for f in files]
+    # При потоковой отдаче docx каждого результата по мере готовности переносится во временный файл,
+    # поэтому в памяти не накапливаются результаты всех файлов загрузки.
+    stream_results = settings.passport.stream_results
+    results, bad_files, timed_out_files = [None] * len(files), [], []
+    try:
+        async for i, result in passport_validation_pool.iter_validate(contents):
+            if isinstance(result, PassportValidationTimeoutError):
+                timed_out_files.append(files[i])
+            elif isinstance(result, Exception):
+                bad_files.append(files[i])
+            elif stream_results:
+                results[i] = await run_in_threadpool(spool_result, result)
+            else:
+                results[i] = result
+    except BaseException:
+        close_spooled_results(results)
+        raise
+    if bad_files or timed_out_files:
+        close_spooled_results(results)
     if bad_files:
         raise HTTPException(
             400,
             detail=f'Invalid document type. Files: {", ".join(f.filename for f in bad_files)}'
         )
+    if timed_out_files:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f'Превышено время проверки. Files: {", ".join(f.filename for f in timed_out_files)}'
+        )
+    headers = {'X-Passport-Digests': ','.join(result.digest for result in results)}
+    if stream_results:
+        return create_stream_response(results, headers)
+    allowed_files = results
     # for f in files:
     #     display_all_tables(Document(f.file))
     passport_saver = PassportSaver(allowed_files)
     path = await run_in_threadpool(passport_saver.save_and_get_as_docx_if_only_one_else_as_zip_archive,)
     filename = 'result.docx' if path.suffix == ".docx" else path.name
-    return FileResponse(path, headers={'Content-Disposition': f'attachment; filename={filename}'})
+    return FileResponse(
+        path,
+        headers={'Content-Disposition': f'attachment; filename={filename}', **headers}
+    )
+
+
+def iter_spooled_zip_stream(results: Sequence[SpooledResult]) -> Iterator[bytes]:
+    """ Потоковый zip из временных файлов результатов. Временные файлы закрываются после отправки. """
+    try:
+        yield from iter_zip_stream((result.filename, result.file) for result in results)
+    finally:
+        close_spooled_results(results)
+
+
+def create_stream_response(results: Sequence[SpooledResult], headers: dict[str, str]) -> Response:
+    """
+    Один файл отдаётся как docx, несколько - потоковым zip без промежуточной записи на диск
+    (кроме временных файлов результатов больше SPOOL_MAX_SIZE).
+    """
+    if len(results) == 1:
+        with results[0].file as file:
+            content = file.read()
+        return Response(
+            content,
+            media_type=DOCX_MEDIA_TYPE,
+            headers={'Content-Disposition': 'attachment; filename=result.docx', **headers}
+        )
+    return StreamingResponse(
+        iter_spooled_zip_stream(results),
+        media_type='application/zip',
+        headers={'Content-Disposition': 'attachment; filename=results.zip', **headers}
+    )
+
+
+@router.get("/validation/{digest}")
+async def get_validation_dump(digest: str):
+    """ Возвращает Passport.dump() ранее проверенного паспорта по хэшу содержимого. """
+    result = await run_in_threadpool(passport_results_cache.get, digest)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Результат проверки не найден.')
+    return result.dump
+
+
+@router.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_validation_job(files: Sequence[UploadFile] = File(...)):
+    """
+    Создаёт фоновое задание проверки паспортов и сразу возвращает его состояние с идентификатором.
+    Ход проверки: GET /jobs/{job_id} или GET /jobs/{job_id}/events, результат: GET /jobs/{job_id}/result.
+    """
+    if not files:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Не предоставлено ни одного файла для обработки.'
+        )
+    try:
+        job = passport_job_queue.submit([(f.filename, await f.read()) for f in files])
+    except JobQueueFullError as err:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(err))
+    return job.as_dict()
+
+
+async def get_job_or_404(job_id: str) -> Job:
+    job = await passport_job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Задание не найдено.')
+    return job
+
+
+@router.get("/jobs/{job_id}")
+async def get_validation_job(job_id: str):
+    return (await get_job_or_404(job_id)).as_dict()
+
+
+async def stream_job_progress(job: Job) -> AsyncIterator[str]:
+    """ Состояние задания строкой json (ndjson) при каждом изменении до завершения задания. """
+    async for state in passport_job_queue.iter_progress(job):
+        yield f'{json.dumps(state, ensure_ascii=False)}\n'
+
+
+@router.get("/jobs/{job_id}/events")
+async def get_validation_job_events(job_id: str):
+    job = await get_job_or_404(job_id)
+    return StreamingResponse(stream_job_progress(job), media_type='application/x-ndjson')
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_validation_job_result(job_id: str):
+    job = await get_job_or_404(job_id)
+    if not job.is_finished:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f'Задание не завершено: {job.status}.')
+    path = passport_job_queue.get_artifact_path(job)
+    if job.status == JobStatus.failed or path is None or not path.exists():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Результат задания недоступен.')
+    return FileResponse(
+        path,
+        media_type=DOCX_MEDIA_TYPE if path.suffix == '.docx' else 'application/zip',
+        headers={'Content-Disposition': f'attachment; filename={path.name}'}
+    )
 
     # bstream.seek(0)
     # return StreamingResponse(
@@ -0,0 +1,102 @@
+import asyncio
+import contextlib
+import json
+
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from starlette import status
+
+from sdp_lib.management_controllers.snmp.trap_server.broadcaster import (
+    Subscriber,
+    SubscriberFilter,
+    trap_broadcaster
+)
+
+
+router = APIRouter(tags=['Traps'])
+
+
+def create_filter(
+        source: list[str] | None,
+        oid: list[str] | None,
+        event_type: list[str] | None
+) -> SubscriberFilter:
+    try:
+        return SubscriberFilter.create(sources=source, oids=oid, event_types=event_type)
+    except ValueError as err:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f'Недопустимый тип события: {err}')
+
+
+async def send_messages(websocket: WebSocket, subscriber: Subscriber):
+    while True:
+        message = await subscriber.get()
+        await websocket.send_json(message.as_dict())
+
+
+async def wait_disconnect(websocket: WebSocket):
+    """ Читает сообщения клиента (игнорируются) до отключения. """
+    while (await websocket.receive())['type'] != 'websocket.disconnect':
+        pass
+
+
+@router.websocket("/ws")
+async def traps_websocket(
+    websocket: WebSocket,
+    source: list[str] | None = Query(None),
+    oid: list[str] | None = Query(None),
+    event_type: list[str] | None = Query(None),
+    maxsize: int = Query(256, gt=0, le=65536),
+):
+    try:
+        subscriber_filter = SubscriberFilter.create(sources=source, oids=oid, event_types=event_type)
+    except ValueError:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    try:
+        subscriber = trap_broadcaster.subscribe(subscriber_filter, maxsize)
+    except OverflowError:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+    await websocket.accept()
+    # Отключение клиента обнаруживается чтением, поэтому отправка выполняется параллельно с ним:
+    # без чтения подписчик, не получающий сообщений, занимал бы место до первой отправки.
+    tasks = [asyncio.create_task(send_messages(websocket, subscriber)), asyncio.create_task(wait_disconnect(websocket))]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError, WebSocketDisconnect, RuntimeError):
+                await task
+        trap_broadcaster.unsubscribe(subscriber)
+
+
+@router.get("/stream")
+async def traps_sse(
+    source: list[str] | None = Query(None),
+    oid: list[str] | None = Query(None),
+    event_type: list[str] | None = Query(None),
+    maxsize: int = Query(256, gt=0, le=65536),
+):
+    try:
+        subscriber = trap_broadcaster.subscribe(create_filter(source, oid, event_type), maxsize)
+    except OverflowError as err:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(err))
+
+    async def event_stream():
+        try:
+            while True:
+                message = await subscriber.get()
+                yield (
+                    f'event: {message.event_type}\n'
+                    f'data: {json.dumps(message.as_dict(), ensure_ascii=False)}\n\n'
+                )
+        finally:
+            trap_broadcaster.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache'}
+    )
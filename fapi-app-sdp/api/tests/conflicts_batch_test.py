@@ -0,0 +1,46 @@
+import io
+import json
+import zipfile
+from unittest import TestCase, main
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.api_v1 import conflicts
+from sdp_lib.conflicts.batch import BatchItemResult
+
+
+class TestConflictsBatchEndpoints(TestCase):
+
+    def setUp(self) -> None:
+        app = FastAPI()
+        app.include_router(conflicts.router)
+        self.client = TestClient(app)
+
+    def test_duplicate_names(self):
+        items = {'items': [{'name': 'a', 'stages': {'1': '1,2'}}, {'name': 'x/a', 'stages': {'1': '1,3'}}]}
+        response = self.client.post('/batch', json=items)
+        self.assertEqual(response.status_code, 422)
+        self.assertIn('a', response.json()['detail'][0]['msg'])
+        response = self.client.post(
+            '/batch/configs',
+            data={'controller_type': 'Peek', 'items': json.dumps(items)},
+            files={'src_config': ('config.DAT', b'')}
+        )
+        self.assertEqual(response.status_code, 422)
+        # Имена по умолчанию - номер перекрёстка в пакете.
+        items = {'items': [{'stages': {'1': '1,2'}}, {'name': '1', 'stages': {'1': '1,3'}}]}
+        self.assertEqual(self.client.post('/batch', json=items).status_code, 422)
+
+    def test_create_zip(self):
+        results = [
+            BatchItemResult('a', 'h1', {}, b'config_a'),
+            BatchItemResult('b', 'h2', {'errors': ['error']}),
+        ]
+        with zipfile.ZipFile(io.BytesIO(conflicts.create_zip(results, 'config.DAT'))) as obj_zip:
+            self.assertEqual(obj_zip.namelist(), ['a/config.DAT', 'results.json'])
+            self.assertEqual(len(json.loads(obj_zip.read('results.json'))), 2)
+
+
+if __name__ == '__main__':
+    main()
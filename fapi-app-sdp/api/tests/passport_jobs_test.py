@@ -0,0 +1,67 @@
+import json
+import tempfile
+from contextlib import asynccontextmanager
+from unittest import TestCase, main, mock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.api_v1 import passport
+from sdp_lib.passport.jobs import PassportJobQueue
+from sdp_lib.passport.tests.jobs_test import FakeValidationPool
+
+
+class TestPassportJobsEndpoints(TestCase):
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.queue = PassportJobQueue(
+            FakeValidationPool(), self.tmp_dir.name, num_workers=1, max_queued_bytes=16
+        )
+
+        @asynccontextmanager
+        async def lifespan(app: FastAPI):
+            self.queue.start()
+            yield
+            await self.queue.stop()
+
+        app = FastAPI(lifespan=lifespan)
+        app.include_router(passport.router)
+        patcher = mock.patch.object(passport, 'passport_job_queue', self.queue)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = TestClient(app)
+        self.client.__enter__()
+
+    def tearDown(self) -> None:
+        self.client.__exit__(None, None, None)
+        self.tmp_dir.cleanup()
+
+    def submit(self, *files: tuple[str, bytes]):
+        return self.client.post('/jobs', files=[('files', file) for file in files])
+
+    def test_submit_events_and_result(self):
+        response = self.submit(('a.docx', b'A'), ('b.docx', b'bad'))
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()['id']
+        events = self.client.get(f'/jobs/{job_id}/events')
+        self.assertEqual(events.headers['content-type'], 'application/x-ndjson')
+        states = [json.loads(line) for line in events.text.splitlines()]
+        self.assertEqual(states[-1]['status'], 'done')
+        self.assertEqual(states[-1]['processed'], 2)
+        self.assertEqual(self.client.get(f'/jobs/{job_id}').json(), states[-1])
+        result = self.client.get(f'/jobs/{job_id}/result')
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(result.content, b'A')
+
+    def test_queued_bytes_limit(self):
+        response = self.submit(('a.docx', b'A' * 17))
+        self.assertEqual(response.status_code, 503)
+
+    def test_unknown_job(self):
+        self.assertEqual(self.client.get('/jobs/unknown').status_code, 404)
+        self.assertEqual(self.client.get('/jobs/unknown/result').status_code, 404)
+
+
+if __name__ == '__main__':
+    main()
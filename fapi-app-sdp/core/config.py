@@ -10,6 +10,8 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 MEDIA_URL = BASE_DIR / 'media'
 UPLOADS_URL = BASE_DIR / 'media/uploads'
 PASSPORTS_DIR = BASE_DIR / 'media/uploads/passports'
+PASSPORTS_CACHE_DIR = BASE_DIR / 'media/cache/passports'
+PASSPORTS_JOBS_DIR = BASE_DIR / 'media/jobs/passports'
 
 
 class RunConfig(BaseModel):
@@ -20,6 +22,8 @@ class RunConfig(BaseModel):
 class ApiV1Prefix(BaseModel):
     prefix: str = "/v1"
     passport: str = '/passport'
+    traps: str = '/traps'
+    conflicts: str = '/conflicts'
 
 
 class ApiPrefix(BaseModel):
@@ -27,11 +31,36 @@ class ApiPrefix(BaseModel):
     v1: ApiV1Prefix = ApiV1Prefix()
 
 
+class PassportConfig(BaseModel):
+    # True - результаты проверки отдаются потоковым zip без записи на диск.
+    # False - результаты сохраняются в PASSPORTS_DIR, устаревшие каталоги удаляются фоновой задачей.
+    stream_results: bool = True
+    retention_seconds: int = 24 * 60 * 60
+    cleanup_interval_seconds: int = 60 * 60
+    # Фоновые задания проверки (/jobs): размер очереди, количество одновременно выполняемых заданий,
+    # суммарный размер файлов незавершённых заданий, время хранения результатов завершённых заданий.
+    max_queued_jobs: int = 100
+    max_queued_bytes: int = 512 * 1024 * 1024
+    job_workers: int = 2
+    job_ttl_seconds: int = 24 * 60 * 60
+
+
+class TrapsConfig(BaseModel):
+    # True - TrapReceiver запускается в lifespan приложения, trap и события фаз/циклов
+    # рассылаются подписчикам /traps/ws и /traps/stream. По умолчанию выключено: trap принимает
+    # отдельный процесс trap_server/runserver.py, а интерфейсы приёма из config.toml не могут быть
+    # заняты дважды. Включать там, где runserver.py не запускается: traps='{"run_receiver": true}'.
+    run_receiver: bool = False
+    config_path: Path = BASE_DIR / 'sdp_lib/management_controllers/snmp/trap_server/config.toml'
+
+
 class Settings(BaseSettings):
     run: RunConfig = RunConfig()
     run_deb_vbox: RunConfig = RunConfig(host='192.168.45.93', port=8181)
     run_localhost: RunConfig = RunConfig(host='0.0.0.0', port=8181)
     api: ApiPrefix = ApiPrefix()
+    passport: PassportConfig = PassportConfig()
+    traps: TrapsConfig = TrapsConfig()
 
 
 settings = Settings()
@@ -41,5 +70,7 @@ uploads_dir = Path(UPLOADS_URL)
 uploads_dir.mkdir(parents=True, exist_ok=True)
 passports_dir = Path(PASSPORTS_DIR)
 passports_dir.mkdir(parents=True, exist_ok=True)
-
-
+passports_cache_dir = Path(PASSPORTS_CACHE_DIR)
+passports_cache_dir.mkdir(parents=True, exist_ok=True)
+passports_jobs_dir = Path(PASSPORTS_JOBS_DIR)
+passports_jobs_dir.mkdir(parents=True, exist_ok=True)
@@ -1,11 +1,39 @@
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 from api import router as api_router
 
 from core.config import settings
+from sdp_lib.conflicts.batch import batch_conflicts_calculator
+from utils.files import passport_job_queue, passport_validation_pool, run_passport_dirs_cleanup
+from utils.traps import start_trap_receiver
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    cleanup_tasks = [asyncio.create_task(passport_job_queue.run_cleanup(settings.passport.cleanup_interval_seconds))]
+    if not settings.passport.stream_results:
+        cleanup_tasks.append(asyncio.create_task(run_passport_dirs_cleanup(
+            settings.passport.retention_seconds, settings.passport.cleanup_interval_seconds
+        )))
+    passport_job_queue.start()
+    trap_receiver = start_trap_receiver() if settings.traps.run_receiver else None
+    yield
+    if trap_receiver is not None:
+        trap_receiver.shutdown()
+    await passport_job_queue.stop()
+    await asyncio.to_thread(passport_validation_pool.close)
+    await asyncio.to_thread(batch_conflicts_calculator.close)
+    for task in cleanup_tasks:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
 
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.include_router(api_router)
 
 
@@ -0,0 +1,334 @@
+"""
+Пакетный расчёт конфликтов в пуле процессов.
+
+Расчёт каждого перекрёстка выполняется в отдельном процессе пула, что не блокирует
+цикл событий и использует все ядра. Результаты запоминаются по хэшу содержимого
+входных данных (тип контроллера, фазы и направления, исходный конфиг), поэтому
+повторная отправка неизменных перекрёстков не требует расчёта.
+
+Для формирования конфигов исходный файл сохраняется во временный каталог один раз
+для каждого содержимого, процессы пула получают только путь к нему. Каждый процесс
+индексирует ConfigTemplate один раз и использует его для всех перекрёстков с таким же
+исходным файлом. Количество исходных файлов во временном каталоге и шаблонов в каждом
+процессе ограничено(LRU), вытесненные шаблоны закрываются.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+from collections import Counter, OrderedDict
+from collections.abc import AsyncIterator, Mapping, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict
+
+from sdp_lib.conflicts.calculate_conflicts import (
+    CommonConflictsAndStagesAPI,
+    CreateConfigurationFileBase,
+    DataFields,
+    PeekConflictsAndStagesAPI,
+    SwarcoConflictsAndStagesAPI
+)
+from sdp_lib.conflicts.config_rewriter import ConfigTemplate
+
+
+config_classes: dict[str, type[CreateConfigurationFileBase]] = {
+    DataFields.swarco.value: SwarcoConflictsAndStagesAPI,
+    DataFields.peek.value: PeekConflictsAndStagesAPI,
+}
+template_factories = {
+    DataFields.swarco.value: ConfigTemplate.from_swarco_ptc2,
+    DataFields.peek.value: ConfigTemplate.from_peek_dat,
+}
+
+
+def get_content_hash(*parts: Any) -> str:
+    """
+    Хэш sha256 содержимого: словари сериализуются с сортировкой ключей, байты хэшируются как есть.
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else json.dumps(part, sort_keys=True, ensure_ascii=False).encode())
+        h.update(b'\x00')
+    return h.hexdigest()
+
+
+@dataclass(frozen=True, slots=True)
+class SrcConfig:
+    """
+    Исходный конфиг для формирования новых конфигов.
+    """
+    filename: str
+    content: bytes
+    digest: str = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'filename', Path(self.filename).name)
+        object.__setattr__(self, 'digest', hashlib.sha256(self.content).hexdigest())
+
+
+@dataclass(frozen=True, slots=True)
+class BatchItemResult:
+    """
+    Результат расчёта одного перекрёстка.
+    config -> содержимое сформированного конфига или None.
+    """
+    name: str
+    content_hash: str
+    data: Dict
+    config: bytes | None = None
+    cached: bool = False
+
+    @property
+    def errors(self) -> list[str]:
+        return self.data.get(DataFields.errors.value) or []
+
+    def as_dict(self) -> dict[str, Any]:
+        return {'name': self.name, 'content_hash': self.content_hash, 'cached': self.cached, 'data': self.data}
+
+
+# Максимальное количество шаблонов, проиндексированных в одном процессе пула.
+MAX_PROCESS_TEMPLATES = 8
+
+# Шаблоны, проиндексированные в текущем процессе пула(LRU): путь к исходному конфигу -> ConfigTemplate.
+_process_templates: OrderedDict[str, ConfigTemplate] = OrderedDict()
+
+
+def _get_process_template(controller_type: str, path_to_src_config: str) -> ConfigTemplate:
+    template = _process_templates.get(path_to_src_config)
+    if template is not None:
+        _process_templates.move_to_end(path_to_src_config)
+        return template
+    template = _process_templates[path_to_src_config] = template_factories[controller_type](path_to_src_config)
+    while len(_process_templates) > MAX_PROCESS_TEMPLATES:
+        _, evicted = _process_templates.popitem(last=False)
+        evicted.close()
+    return template
+
+
+def calculate_conflicts(stages_groups_data: Dict) -> tuple[Dict, None]:
+    """
+    Расчёт конфликтов без формирования конфига. Выполняется в процессе пула.
+    :return: Кортеж из данных расчёта (instance_data) и None.
+    """
+    obj = CommonConflictsAndStagesAPI(stages_groups_data)
+    obj.build_data()
+    return obj.instance_data, None
+
+
+def calculate_conflicts_and_create_config(
+        controller_type: str,
+        stages_groups_data: Dict,
+        path_to_src_config: str
+) -> tuple[Dict, bytes | None]:
+    """
+    Расчёт конфликтов и формирование конфига. Выполняется в процессе пула.
+    Конфиг формируется, только если расчёт выполнен без ошибок и формирование конфига допустимо.
+    :return: Кортеж из данных расчёта и содержимого нового конфига.
+    """
+    template = _get_process_template(controller_type, path_to_src_config)
+    obj = config_classes[controller_type](stages_groups_data, template=template, prefix_new_config=f'{os.getpid()}_')
+    # build_data без записи conflicts.json в рабочий каталог процесса
+    CommonConflictsAndStagesAPI.build_data(obj)
+    data = obj.instance_data
+    if data[DataFields.errors.value] or not data[DataFields.allow_make_config.value]:
+        return data, None
+    obj.create_config()
+    # Процесс пула выполняет одну задачу за раз, имя с pid не используется одновременно.
+    path_to_new_config = obj.get_path_to_new_config()
+    config = path_to_new_config.read_bytes()
+    path_to_new_config.unlink()
+    data[DataFields.config_file.value][DataFields.path_to_file.value] = template.path.name
+    return data, config
+
+
+class BatchConflictsCalculator:
+    """
+    Пакетный расчёт конфликтов в пуле процессов с запоминанием результатов по хэшу входных данных.
+    Пул создаётся при первом расчёте. Кэш - LRU на maxsize результатов.
+    Во временном каталоге хранится не более max_src_configs исходных конфигов(LRU),
+    конфиги, используемые незавершёнными расчётами, не удаляются.
+    """
+
+    def __init__(
+            self,
+            max_workers: int | None = None,
+            maxsize: int = 1024,
+            executor: Executor | None = None,
+            max_src_configs: int = MAX_PROCESS_TEMPLATES
+    ):
+        self._max_workers = max_workers or min(os.cpu_count() or 1, 8)
+        self._maxsize = maxsize
+        self._executor = executor
+        self._cache: OrderedDict[str, tuple[Dict, bytes | None]] = OrderedDict()
+        self._pending: dict[str, asyncio.Future] = {}
+        self._src_configs_dir: tempfile.TemporaryDirectory | None = None
+        self._max_src_configs = max_src_configs
+        # Пути исходных конфигов во временном каталоге(LRU) и количество незавершённых iter_results по пути.
+        self._src_configs: OrderedDict[str, None] = OrderedDict()
+        self._src_configs_in_use: Counter[str] = Counter()
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(max_workers={self._max_workers} cached={len(self._cache)} '
+                f'hits={self.hits} misses={self.misses})')
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+        return self._executor
+
+    def _cache_get(self, key: str) -> tuple[Dict, bytes | None] | None:
+        result = self._cache.get(key)
+        if result is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+        return result
+
+    def _cache_put(self, key: str, result: tuple[Dict, bytes | None]):
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._maxsize:
+            self._cache.popitem(last=False)
+
+    def _save_src_config(self, src_config: SrcConfig) -> str:
+        """
+        Сохраняет исходный конфиг во временный каталог один раз для каждого содержимого.
+        Процессы пула получают только путь и индексируют шаблон один раз.
+        Путь определяется содержимым, поэтому шаблон процесса пула, проиндексированный
+        до удаления файла, остаётся верным и после повторного сохранения.
+        """
+        if self._src_configs_dir is None:
+            self._src_configs_dir = tempfile.TemporaryDirectory(prefix='conflicts_')
+        path = Path(self._src_configs_dir.name) / src_config.digest / src_config.filename
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            path.write_bytes(src_config.content)
+        self._src_configs[str(path)] = None
+        self._src_configs.move_to_end(str(path))
+        return str(path)
+
+    def _evict_src_configs(self):
+        """ Удаляет давно использованные исходные конфиги сверх max_src_configs, кроме используемых. """
+        for path in list(self._src_configs):
+            if len(self._src_configs) <= self._max_src_configs:
+                break
+            if self._src_configs_in_use[path]:
+                continue
+            del self._src_configs[path]
+            src_path = Path(path)
+            src_path.unlink(missing_ok=True)
+            with contextlib.suppress(OSError):
+                src_path.parent.rmdir()
+
+    async def _calculate(
+            self,
+            key: str,
+            controller_type: str | None,
+            stages_groups_data: Dict,
+            path_to_src_config: str | None
+    ) -> tuple[tuple[Dict, bytes | None], bool]:
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached, True
+        pending = self._pending.get(key)
+        if pending is not None:
+            # Такие же данные уже рассчитываются, например повтор перекрёстка в одном пакете.
+            self.hits += 1
+            return await asyncio.shield(pending), True
+
+        self.misses += 1
+        loop = asyncio.get_running_loop()
+        if path_to_src_config is None:
+            future = loop.run_in_executor(self.executor, calculate_conflicts, stages_groups_data)
+        else:
+            future = loop.run_in_executor(
+                self.executor, calculate_conflicts_and_create_config,
+                controller_type, stages_groups_data, path_to_src_config
+            )
+        self._pending[key] = future
+        try:
+            result = await asyncio.shield(future)
+        finally:
+            self._pending.pop(key, None)
+        self._cache_put(key, result)
+        return result, False
+
+    async def iter_results(
+            self,
+            items: Sequence[tuple[str, Mapping[str, str]]],
+            controller_type: str | None = None,
+            src_config: SrcConfig | None = None
+    ) -> AsyncIterator[BatchItemResult]:
+        """
+        Запускает расчёт всех перекрёстков и возвращает результаты в порядке items по мере готовности.
+        :param items: Последовательность пар (имя перекрёстка, {фаза: 'направления через запятую'}).
+        :param controller_type: 'Swarco' или 'Peek'. Используется при формировании конфигов.
+        :param src_config: Исходный конфиг. Если None - выполняется только расчёт конфликтов.
+        """
+        if src_config is not None and controller_type not in config_classes:
+            raise ValueError(f'Недопустимый тип контроллера: {controller_type}')
+
+        path_to_src_config = None if src_config is None else self._save_src_config(src_config)
+        if path_to_src_config is not None:
+            self._src_configs_in_use[path_to_src_config] += 1
+        tasks, keys = [], []
+        for name, stages_groups_data in items:
+            stages_groups_data = dict(stages_groups_data)
+            if src_config is None:
+                key = get_content_hash(stages_groups_data)
+            else:
+                key = get_content_hash(controller_type, stages_groups_data, src_config.digest)
+            keys.append(key)
+            tasks.append(asyncio.ensure_future(
+                self._calculate(key, controller_type, stages_groups_data, path_to_src_config)
+            ))
+        try:
+            for (name, _), key, task in zip(items, keys, tasks):
+                try:
+                    (data, config), cached = await task
+                except Exception as exc:
+                    data, config, cached = {DataFields.errors.value: [f'{type(exc).__name__}: {exc}']}, None, False
+                yield BatchItemResult(name, key, data, config, cached)
+        finally:
+            for task in tasks:
+                task.cancel()
+            if path_to_src_config is not None:
+                self._src_configs_in_use[path_to_src_config] -= 1
+                if not self._src_configs_in_use[path_to_src_config]:
+                    del self._src_configs_in_use[path_to_src_config]
+                self._evict_src_configs()
+
+    def clear_cache(self):
+        self._cache.clear()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+        if self._src_configs_dir is not None:
+            self._src_configs_dir.cleanup()
+            self._src_configs_dir = None
+        self._src_configs.clear()
+        self._src_configs_in_use.clear()
+
+
+batch_conflicts_calculator = BatchConflictsCalculator()
+
+
+if __name__ == '__main__':
+    async def main():
+        items = [(f'cross_{i}', {'1': '1,2,3', '2': '4,5,6', '3': f'7,8,{9 + i % 4}'}) for i in range(16)]
+        for _ in range(2):
+            async for result in batch_conflicts_calculator.iter_results(items):
+                print(result.name, result.cached, result.data[DataFields.sum_conflicts.value])
+        print(batch_conflicts_calculator)
+        batch_conflicts_calculator.close()
+
+    asyncio.run(main())
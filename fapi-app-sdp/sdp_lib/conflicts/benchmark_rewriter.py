@@ -0,0 +1,95 @@
+"""
+Сравнение формирования конфигурационных файлов .DAT Peek:
+    -- построчное чтение исходного файла и поиск таблиц в каждой строке (create_config_line_by_line);
+    -- ConfigTemplate: шаблон индексируется один раз, неизменные участки копируются из mmap.
+Исходный файл синтезируется: таблицы XSGSG, YSRM_SA_STG, YSRM_UK_STAGE окружены
+таблицами-заполнителями, что соответствует размеру реальных конфигураций.
+Для каждого варианта проверяется побайтовое совпадение результатов.
+
+Запуск: python -m sdp_lib.conflicts.benchmark_rewriter
+"""
+
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from sdp_lib.conflicts.calculate_conflicts import PeekConflictsAndStagesAPI
+from sdp_lib.conflicts.config_rewriter import ConfigTemplate
+
+
+NUM_CONFIGS = 20
+FILLER_RECORDS = 20_000
+
+
+def create_filler_table(name: str, num_records: int) -> str:
+    records = ''.join(
+        f':RECORD\n"Id",{i}\n"Value",{i * 7 % 1000}\n"Comment","{name}_{i}"\n:END\n' for i in range(num_records)
+    )
+    return f':TABLE "{name}",{num_records},3,4,4,10\n{records}:END\n'
+
+
+def create_src_dat(path: Path, filler_records: int = FILLER_RECORDS) -> Path:
+    tables = [
+        create_filler_table('XHEADER', filler_records),
+        create_filler_table('XSGSG', 8),
+        create_filler_table('YKLOK', 16),
+        create_filler_table('YSRM', filler_records),
+        create_filler_table('YSRM_SA_STG', 4),
+        create_filler_table('YSRM_STEP', filler_records),
+        create_filler_table('YSRM_UK_STAGE', 4),
+        create_filler_table('YSRM_UK_STAGE_TRANS', filler_records),
+    ]
+    path.write_text(''.join(tables), encoding='utf-8')
+    return path
+
+
+def create_stages_groups_data(seed: int) -> dict[str, str]:
+    rnd = random.Random(seed)
+    num_groups = rnd.randint(8, 24)
+    return {
+        str(stage): ','.join(map(str, sorted(rnd.sample(range(1, num_groups + 1), rnd.randint(1, num_groups // 2)))))
+        for stage in range(1, rnd.randint(3, 8) + 1)
+    }
+
+
+def run_line_by_line(src: Path, variants: list[dict[str, str]]) -> tuple[float, list[bytes]]:
+    results = []
+    start_time = time.perf_counter()
+    for i, stages_groups_data in enumerate(variants):
+        obj = PeekConflictsAndStagesAPI(stages_groups_data, path_to_src_config=str(src), prefix_new_config=f'old{i}_')
+        obj.use_streaming_rewriter = False
+        obj.build_data()
+        results.append(obj.get_path_to_new_config())
+    elapsed = time.perf_counter() - start_time
+    return elapsed, [p.read_bytes() for p in results]
+
+
+def run_template(src: Path, variants: list[dict[str, str]]) -> tuple[float, list[bytes]]:
+    results = []
+    start_time = time.perf_counter()
+    with ConfigTemplate.from_peek_dat(src) as template:
+        for i, stages_groups_data in enumerate(variants):
+            obj = PeekConflictsAndStagesAPI(stages_groups_data, template=template, prefix_new_config=f'new{i}_')
+            obj.build_data()
+            results.append(obj.get_path_to_new_config())
+    elapsed = time.perf_counter() - start_time
+    return elapsed, [p.read_bytes() for p in results]
+
+
+def main(num_configs: int = NUM_CONFIGS, filler_records: int = FILLER_RECORDS):
+    variants = [create_stages_groups_data(seed) for seed in range(num_configs)]
+    with tempfile.TemporaryDirectory() as tmp:
+        src = create_src_dat(Path(tmp) / 'SRC.DAT', filler_records)
+        print(f'Исходный файл: {src.stat().st_size / 1024 / 1024:.1f} МБ, конфигураций: {num_configs}')
+        old_elapsed, old_results = run_line_by_line(src, variants)
+        new_elapsed, new_results = run_template(src, variants)
+
+    print(f'Построчно:   {old_elapsed:.3f} сек, {num_configs / old_elapsed:.1f} конфиг/сек')
+    print(f'Шаблон mmap: {new_elapsed:.3f} сек, {num_configs / new_elapsed:.1f} конфиг/сек')
+    print(f'Ускорение: x{old_elapsed / new_elapsed:.1f}')
+    print(f'Результаты совпадают: {old_results == new_results}')
+
+
+if __name__ == '__main__':
+    main()
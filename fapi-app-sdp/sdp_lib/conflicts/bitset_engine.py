@@ -0,0 +1,88 @@
+from collections.abc import Iterator, Mapping, Sequence, Set
+from typing import List
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """
+    Возвращает индексы установленных битов маски в порядке возрастания.
+    :param mask: Целое неотрицательное число.
+    """
+    while mask:
+        low_bit = mask & -mask
+        yield low_bit.bit_length() - 1
+        mask ^= low_bit
+
+
+class StagesBitsets:
+    """
+    Представление принадлежности направлений фазам в виде битовых масок.
+
+    Каждому направлению из sorted_groups соответствует бит с индексом направления в
+    sorted_groups, каждой фазе - бит с порядковым номером фазы в stages_data.
+        -- stage_masks[s]: маска направлений фазы s;
+        -- group_stage_masks[i]: маска фаз, в которых участвует направление i;
+        -- enemies_masks[i]: маска направлений, которые не участвуют ни в одной фазе
+           вместе с направлением i (конфликтные направления).
+    Конфликты всех направлений вычисляются объединением масок фаз:
+    O(количество направлений * количество фаз) операций над целыми числами
+    вместо перебора всех пар направлений по всем фазам.
+    """
+
+    def __init__(self, sorted_groups: Sequence[int | float], stages_data: Mapping[str, Set[int | float]]):
+        self.groups = list(sorted_groups)
+        self.stage_keys = list(stages_data.keys())
+        self.index = {group: i for i, group in enumerate(self.groups)}
+        self.all_groups_mask = (1 << len(self.groups)) - 1
+        self.all_stages_mask = (1 << len(self.stage_keys)) - 1
+
+        self.stage_masks: List[int] = []
+        self.group_stage_masks: List[int] = [0] * len(self.groups)
+        for num_stage, groups_in_stage in enumerate(stages_data.values()):
+            mask = 0
+            for group in groups_in_stage:
+                i = self.index[group]
+                mask |= 1 << i
+                self.group_stage_masks[i] |= 1 << num_stage
+            self.stage_masks.append(mask)
+
+        self.enemies_masks: List[int] = []
+        for i, stages_mask in enumerate(self.group_stage_masks):
+            friends_mask = 1 << i
+            for num_stage in iter_bits(stages_mask):
+                friends_mask |= self.stage_masks[num_stage]
+            self.enemies_masks.append(self.all_groups_mask & ~friends_mask)
+
+    def mask_to_groups(self, mask: int) -> List[int | float]:
+        """ Номера направлений маски в порядке возрастания. """
+        return [self.groups[i] for i in iter_bits(mask)]
+
+    def mask_to_stages(self, mask: int) -> List[str]:
+        """ Номера фаз маски в порядке следования фаз. """
+        return [self.stage_keys[i] for i in iter_bits(mask)]
+
+    def is_always_red(self, i: int) -> bool:
+        return not self.group_stage_masks[i]
+
+    def is_always_green(self, i: int) -> bool:
+        return self.group_stage_masks[i] == self.all_stages_mask
+
+    def get_stages_bin_vals(self) -> List[int]:
+        """
+        Бинарные значения фаз направлений для F009 Swarco: сумма 2 ** номер фазы
+        по фазам направления, фаза 8 соответствует 2 ** 0.
+        """
+        stages_vals = [2 ** int(s) if int(s) != 8 else 2 ** 0 for s in self.stage_keys]
+        return [sum(stages_vals[s] for s in iter_bits(mask)) for mask in self.group_stage_masks]
+
+    def create_output_matrix(self, group_labels: Sequence[str], conflict: str, no_conflict: str, cross: str):
+        """
+        Формирует общую матрицу конфликтов: шапку и строку для каждого направления.
+        """
+        matrix = [[cross, *group_labels]]
+        num_groups = len(self.groups)
+        for i, enemies_mask in enumerate(self.enemies_masks):
+            row = [group_labels[i]]
+            row += [conflict if enemies_mask >> j & 1 else no_conflict for j in range(num_groups)]
+            row[i + 1] = cross
+            matrix.append(row)
+        return matrix
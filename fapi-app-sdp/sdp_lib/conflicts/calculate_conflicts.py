@@ -9,7 +9,16 @@ from pathlib import Path
 from typing import Dict, Set, Tuple, List, Iterator, TextIO
 import logging
 
-from sdp_lib.utils_common import set_curr_datetime
+from sdp_lib.conflicts.bitset_engine import StagesBitsets
+from sdp_lib.conflicts.config_rewriter import (
+    ConfigTemplate,
+    iter_matrix_lines,
+    iter_stages_bin_vals_lines,
+    iter_xsgsg_table,
+    iter_ysrm_sa_stage_table,
+    iter_ysrm_uk_stage_table
+)
+from sdp_lib.utils_common.utils_common import get_curr_datetime
 
 # from toolkit.sdp_lib.utils_common import set_curr_datetime
 
@@ -94,8 +103,13 @@ class Utils:
 
 class BaseConflictsAndStagesCalculations:
 
+    # Расчёт конфликтов через битовые маски StagesBitsets. Если False - перебором множеств.
+    use_bitset_engine = True
+
     def __init__(self, stages_groups_data: Dict):
 
+        self._bitsets: StagesBitsets | None = None
+
         self.instance_data = {
             'raw_stages_data': stages_groups_data,
             DataFields.sorted_stages_data.value: None,
@@ -228,8 +242,22 @@ class BaseConflictsAndStagesCalculations:
         """
 
         groups_prop = self.instance_data[DataFields.groups_property.value]
-        for group in self.instance_data.get(DataFields.sorted_all_num_groups.value):
-            groups_prop[group] = self._get_conflicts_and_stages_properties_for_group(group)
+        if not self.use_bitset_engine:
+            for group in self.instance_data.get(DataFields.sorted_all_num_groups.value):
+                groups_prop[group] = self._get_conflicts_and_stages_properties_for_group(group)
+            return
+
+        bitsets = self._bitsets = StagesBitsets(
+            self.instance_data[DataFields.sorted_all_num_groups.value],
+            self.instance_data[DataFields.sorted_stages_data.value]
+        )
+        for i, group in enumerate(bitsets.groups):
+            groups_prop[group] = {
+                DataFields.stages.value: set(bitsets.mask_to_stages(bitsets.group_stage_masks[i])),
+                DataFields.enemy_groups.value: set(bitsets.mask_to_groups(bitsets.enemies_masks[i])),
+                DataFields.always_red.value: bitsets.is_always_red(i),
+                DataFields.always_green.value: bitsets.is_always_green(i)
+            }
 
     def _get_conflicts_and_stages_properties_for_group(self, num_group: int):
         """
@@ -370,23 +398,35 @@ class OutputDataCalculations(BaseConflictsAndStagesCalculations):
         all_numbers_groups = sorted(self.instance_data[DataFields.all_num_groups.value])
         create_bin_vals_stages = self.instance_data[DataFields.allow_make_config.value]
 
-        self.instance_data[DataFields.output_matrix.value] = [
-            self._create_row_output_matrix(all_numbers_groups, first_row=True)
-        ]
+        bitsets = self._bitsets
+        if bitsets is not None:
+            self.instance_data[DataFields.output_matrix.value] = bitsets.create_output_matrix(
+                [f'|0{g}|' if len(str(g)) == 1 else f'|{g}|' for g in all_numbers_groups],
+                conflict=DataFields.conflict_K.value,
+                no_conflict=DataFields.no_conflict_O.value,
+                cross=DataFields.cross_group_star_matrix.value
+            )
+        else:
+            self.instance_data[DataFields.output_matrix.value] = [
+                self._create_row_output_matrix(all_numbers_groups, first_row=True)
+            ]
         f997, numbers_conflicts_groups, stages_bin_vals = [], [], []
         sum_conflicts = 0
 
         for num_group, property_group in groups_property.items():
             enemy_groups = property_group[DataFields.enemy_groups.value]
-            self.instance_data[DataFields.output_matrix.value].append(
-                self._create_row_output_matrix(all_numbers_groups, num_group, enemy_groups)
-            )
+            if bitsets is None:
+                self.instance_data[DataFields.output_matrix.value].append(
+                    self._create_row_output_matrix(all_numbers_groups, num_group, enemy_groups)
+                )
             if self.instance_data[DataFields.allow_make_config.value]:
                 f997.append(self._create_row_f997(num_groups, num_group, enemy_groups))
                 numbers_conflicts_groups.append(f"{';'.join(map(str, sorted(enemy_groups)))};")
             sum_conflicts += len(enemy_groups)
-            if create_bin_vals_stages:
+            if create_bin_vals_stages and bitsets is None:
                 stages_bin_vals.append(self._get_bin_val_stages(stages=property_group[DataFields.stages.value]))
+        if create_bin_vals_stages and bitsets is not None:
+            stages_bin_vals = bitsets.get_stages_bin_vals()
 
         self.instance_data[DataFields.matrix_F997.value] = f997
         self.instance_data[DataFields.numbers_conflicts_groups.value] = numbers_conflicts_groups
@@ -469,7 +509,7 @@ class CommonConflictsAndStagesAPI(OutputDataCalculations):
         :return:
         """
 
-        self.path_to_save_txt = self.path_to_save_txt or f"calculated_data {set_curr_datetime('-')}.txt"
+        self.path_to_save_txt = self.path_to_save_txt or f"calculated_data {get_curr_datetime('-')}.txt"
 
         with open(self.path_to_save_txt, 'w') as f:
             logger.debug(self.instance_data[DataFields.sorted_stages_data.value])
@@ -525,23 +565,54 @@ class CommonConflictsAndStagesAPI(OutputDataCalculations):
 class CreateConfigurationFileBase(CommonConflictsAndStagesAPI):
     """
     Базовый класс для формирования конфигурационных файлов различных контроллеров.
+    Если передан template (проиндексированный ConfigTemplate), исходный файл не читается
+    и не индексируется повторно, что позволяет формировать много конфигураций из одного шаблона.
     """
 
+    # Формирование конфига через ConfigTemplate. Если False - построчным чтением исходного файла.
+    use_streaming_rewriter = True
+
     def __init__(
             self, stages_groups_data: Dict,
             create_txt: bool = False,
             path_to_save_txt: str = None,
             path_to_src_config: str = None,
-            prefix_new_config: str = 'new_'
+            prefix_new_config: str = 'new_',
+            template: ConfigTemplate = None
     ):
         super().__init__(stages_groups_data, create_txt, path_to_save_txt)
-        self.path_to_src_config = path_to_src_config
+        self.path_to_src_config = path_to_src_config or (template.path if template is not None else None)
         self.prefix_new_config = prefix_new_config
+        self.template = template
 
     @abc.abstractmethod
     def create_config(self):
         ...
 
+    @abc.abstractmethod
+    def open_template(self) -> ConfigTemplate:
+        ...
+
+    @abc.abstractmethod
+    def get_replacements(self) -> Dict:
+        ...
+
+    def get_path_to_new_config(self) -> Path:
+        p = pathlib.Path(self.path_to_src_config)
+        return p.parent / f'{self.prefix_new_config}{p.name}'
+
+    def create_config_from_template(self):
+        """
+        Формирует конфиг заменой разделов шаблона данными расчётов.
+        """
+        template = self.template or self.open_template()
+        try:
+            path_to_new_config = template.render(self.get_path_to_new_config(), self.get_replacements())
+        finally:
+            if template is not self.template:
+                template.close()
+        self.push_result_to_instance_data(path_to_new_config)
+
     def build_data(self, create_json=False):
         """
         Основной метод для получения данных по расчетам конфликтов, привзяки фаз и прочих значений.
@@ -612,7 +683,25 @@ class SwarcoConflictsAndStagesAPI(CreateConfigurationFileBase):
             curr_line_from_file_for_write = next(file_for_read)
         file_for_write.write(curr_line_from_file_for_write)
 
+    def open_template(self) -> ConfigTemplate:
+        return ConfigTemplate.from_swarco_ptc2(self.path_to_src_config)
+
+    def get_replacements(self) -> Dict:
+        matrix_f997 = self.instance_data[DataFields.matrix_F997.value]
+        return {
+            '997': iter_matrix_lines(matrix_f997),
+            '992': iter_matrix_lines(matrix_f997),
+            '006': (),
+            '009': iter_stages_bin_vals_lines(self.instance_data[DataFields.stages_bin_vals.value])
+        }
+
     def create_config(self):
+        if self.use_streaming_rewriter:
+            self.create_config_from_template()
+        else:
+            self.create_config_line_by_line()
+
+    def create_config_line_by_line(self):
         """
         Создает .PTC2 файл конфигурации с учетов произведённых расчетов конфликтов и бинарных значений фаз.
         Алгоритм:
@@ -671,18 +760,16 @@ class PeekConflictsAndStagesAPI(CreateConfigurationFileBase):
         :return: строка :TABLE "XSGSG" для записи в новый DAT файл.
         """
 
-        table_conflicts = f':TABLE "XSGSG",{str(self.instance_data[DataFields.sum_conflicts.value])},4,3,4,4,3\n'
-        for group, properties in self.instance_data[DataFields.groups_property.value].items():
-            for enemy_group in properties[DataFields.enemy_groups.value]:
-                table_conflicts += (
-                    f':RECORD\n'
-                    f'"Type",2\n'
-                    f'"Id1",{group}\n'
-                    f'"Id2",{str(enemy_group)}\n'
-                    f'"Time",30\n'
-                    f':END\n'
-                )
-        return f'{table_conflicts}:END\n'
+        return ''.join(self.iter_conflicts_for_write())
+
+    def iter_conflicts_for_write(self):
+        return iter_xsgsg_table(
+            self.instance_data[DataFields.sum_conflicts.value],
+            (
+                (group, properties[DataFields.enemy_groups.value])
+                for group, properties in self.instance_data[DataFields.groups_property.value].items()
+            )
+        )
 
     def get_ysrm_sa_stage_and_ysrm_uk_stage(self) -> Tuple[str, str]:
         """
@@ -690,27 +777,8 @@ class PeekConflictsAndStagesAPI(CreateConfigurationFileBase):
         :return: Кортеж из двух строк ysrm_sa_stage и ysrm_uk_stage для записи в новый DAT файл.
         """
 
-        sum_stages = str(self.instance_data[DataFields.number_of_stages.value])
-        ysrm_sa_stage = f':TABLE "YSRM_SA_STG",{sum_stages},2,4,10\n'
-        ysrm_uk_stage = f':TABLE "YSRM_UK_STAGE",{sum_stages},4,4,4,1,10\n'
-
-        for stage, groups_in_stage in self.instance_data[DataFields.sorted_stages_data.value].items():
-            groups_in_stage = f"{','.join(map(str, groups_in_stage))}"
-            ysrm_sa_stage += (
-                f':RECORD\n'
-                f'"Id",{stage}\n'
-                f'"SGdef","{groups_in_stage}"\n'
-                f':END\n'
-            )
-            ysrm_uk_stage += (
-                f':RECORD\n'
-                f'"ProcessId",1\n'
-                f'"StageId",{stage}\n'
-                f'"StartUpStage",{str(True) if stage == "1" else str(False)}\n'
-                f'"SignalGroups",",{groups_in_stage},"\n'
-                f':END\n'
-            )
-        return f'{ysrm_sa_stage}:END\n', f'{ysrm_uk_stage}:END\n'
+        stages = self.instance_data[DataFields.sorted_stages_data.value]
+        return ''.join(iter_ysrm_sa_stage_table(stages)), ''.join(iter_ysrm_uk_stage_table(stages))
 
     def skipping_lines(self, file: Iterator, stopper: str) -> str:
         """
@@ -725,7 +793,24 @@ class PeekConflictsAndStagesAPI(CreateConfigurationFileBase):
             line = next(file)
         return line
 
+    def open_template(self) -> ConfigTemplate:
+        return ConfigTemplate.from_peek_dat(self.path_to_src_config)
+
+    def get_replacements(self) -> Dict:
+        stages = self.instance_data[DataFields.sorted_stages_data.value]
+        return {
+            'XSGSG': self.iter_conflicts_for_write(),
+            'YSRM_SA_STG': iter_ysrm_sa_stage_table(stages),
+            'YSRM_UK_STAGE': iter_ysrm_uk_stage_table(stages)
+        }
+
     def create_config(self):
+        if self.use_streaming_rewriter:
+            self.create_config_from_template()
+        else:
+            self.create_config_line_by_line()
+
+    def create_config_line_by_line(self):
         """
         Формирует новый DAT файл конфигурации на основе расчётов.
         :return:
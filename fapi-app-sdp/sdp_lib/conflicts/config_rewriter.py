@@ -0,0 +1,192 @@
+"""
+Потоковая замена разделов конфигурационных файлов .DAT (Peek) и .PTC2 (Swarco).
+
+Файл-шаблон отображается в память (mmap) и индексируется один раз: для каждого раздела
+запоминаются смещения начала и конца заменяемых данных. При формировании нового файла
+неизменные участки шаблона копируются без декодирования и разбора на строки, а вместо
+заменяемых разделов записываются строки из генераторов. Один проиндексированный шаблон
+можно использовать для формирования любого количества конфигураций.
+
+Пример:
+    with ConfigTemplate.from_peek_dat('CO413.DAT') as template:
+        template.render('new_CO413.DAT', {'XSGSG': iter_xsgsg_table(...)})
+"""
+
+import io
+import mmap
+import os
+import re
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Self
+
+
+table_pattern = re.compile(rb'^:TABLE "([^"]+)"', re.MULTILINE)
+swarco_function_pattern = re.compile(rb'^NewSheet693  : Work\.(\d{3})[^\n]*\n', re.MULTILINE)
+swarco_section_end = b'NeXt'
+
+
+@dataclass(frozen=True, slots=True)
+class Section:
+    """
+    Заменяемый участок шаблона [start, end) в байтах.
+    """
+    name: str
+    start: int
+    end: int
+
+
+def index_peek_tables(data: mmap.mmap | bytes) -> dict[str, Section]:
+    """
+    Индексирует таблицы .DAT Peek. Раздел таблицы - от строки ':TABLE "Имя"'
+    до строки ':END', закрывающей таблицу, включительно. Вложенные блоки
+    ':RECORD' ... ':END' и ':MEMO' ... ':END' учитываются по глубине вложенности.
+    """
+    sections = {}
+    for match in table_pattern.finditer(data):
+        pos, depth = match.end(), 1
+        while depth:
+            pos = data.find(b'\n:', pos)
+            if pos < 0:
+                raise ValueError(f'Не найден конец таблицы {match.group(1)!r}')
+            pos += 1
+            if data[pos:pos + 4] == b':END':
+                depth -= 1
+            elif data[pos:pos + 7] == b':RECORD' or data[pos:pos + 5] == b':MEMO':
+                depth += 1
+        end = data.find(b'\n', pos)
+        end = len(data) if end < 0 else end + 1
+        name = match.group(1).decode()
+        sections.setdefault(name, Section(name, match.start(), end))
+    return sections
+
+
+def index_swarco_functions(data: mmap.mmap | bytes) -> dict[str, Section]:
+    """
+    Индексирует функции .PTC2 Swarco. Раздел функции - строки после заголовка
+    'NewSheet693  : Work.NNN' до строки, содержащей 'NeXt'. Заголовок и строка 'NeXt' не заменяются.
+    """
+    sections = {}
+    for match in swarco_function_pattern.finditer(data):
+        next_pos = data.find(swarco_section_end, match.end())
+        if next_pos < 0:
+            raise ValueError(f'Не найден конец функции Work.{match.group(1).decode()}')
+        end = data.rfind(b'\n', match.end() - 1, next_pos) + 1
+        name = match.group(1).decode()
+        sections.setdefault(name, Section(name, match.end(), end))
+    return sections
+
+
+class ConfigTemplate:
+    """
+    Проиндексированный шаблон конфигурационного файла.
+    """
+
+    def __init__(self, path: str | os.PathLike, indexer, encoding: str = 'utf-8'):
+        self.path = Path(path)
+        self.encoding = encoding
+        with open(self.path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.sections: dict[str, Section] = indexer(self._data)
+        self.newline = '\r\n' if self._data.find(b'\r\n') >= 0 else '\n'
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(path={self.path} sections={len(self.sections)})'
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @classmethod
+    def from_peek_dat(cls, path: str | os.PathLike, encoding: str = 'utf-8') -> Self:
+        return cls(path, index_peek_tables, encoding)
+
+    @classmethod
+    def from_swarco_ptc2(cls, path: str | os.PathLike, encoding: str = 'utf-8') -> Self:
+        return cls(path, index_swarco_functions, encoding)
+
+    def _encode_lines(self, lines: Iterable[str]) -> Iterable[bytes]:
+        encoding, newline = self.encoding, self.newline
+        if newline == '\n':
+            return (line.encode(encoding) for line in lines)
+        return (line.replace('\n', newline).encode(encoding) for line in lines)
+
+    def render(
+            self,
+            dst_path: str | os.PathLike,
+            replacements: Mapping[str, Iterable[str]],
+            buffer_size: int = 1024 * 1024
+    ) -> Path:
+        """
+        Формирует новый файл: разделы из replacements заменяются строками из
+        соответствующих генераторов, остальные данные копируются из шаблона без изменений.
+        Разделы, отсутствующие в шаблоне, пропускаются.
+        :param dst_path: Путь к новому файлу.
+        :param replacements: Словарь {имя раздела: итерируемый объект строк}.
+        :param buffer_size: Размер буфера записи в байтах.
+        :return: Путь к новому файлу.
+        """
+        sections = sorted(
+            ((self.sections[name], lines) for name, lines in replacements.items() if name in self.sections),
+            key=lambda item: item[0].start
+        )
+        view = memoryview(self._data)
+        pos = 0
+        try:
+            with open(dst_path, 'wb', buffering=0) as raw, io.BufferedWriter(raw, buffer_size) as f:
+                for section, lines in sections:
+                    f.write(view[pos:section.start])
+                    f.writelines(self._encode_lines(lines))
+                    pos = section.end
+                f.write(view[pos:])
+        finally:
+            view.release()
+        return Path(dst_path)
+
+    def close(self):
+        self._data.close()
+
+
+def iter_xsgsg_table(sum_conflicts: int, groups_enemies: Iterable[tuple[int, Iterable[int]]]) -> Iterable[str]:
+    """
+    Строки таблицы :TABLE "XSGSG" (конфликты направлений) .DAT Peek.
+    :param groups_enemies: Пары (направление, конфликтные направления).
+    """
+    yield f':TABLE "XSGSG",{sum_conflicts},4,3,4,4,3\n'
+    for group, enemy_groups in groups_enemies:
+        for enemy_group in enemy_groups:
+            yield f':RECORD\n"Type",2\n"Id1",{group}\n"Id2",{enemy_group}\n"Time",30\n:END\n'
+    yield ':END\n'
+
+
+def iter_ysrm_sa_stage_table(stages: Mapping[str, Iterable[int]]) -> Iterable[str]:
+    """ Строки таблицы :TABLE "YSRM_SA_STG" .DAT Peek. """
+    yield f':TABLE "YSRM_SA_STG",{len(stages)},2,4,10\n'
+    for stage, groups_in_stage in stages.items():
+        yield f':RECORD\n"Id",{stage}\n"SGdef","{",".join(map(str, groups_in_stage))}"\n:END\n'
+    yield ':END\n'
+
+
+def iter_ysrm_uk_stage_table(stages: Mapping[str, Iterable[int]]) -> Iterable[str]:
+    """ Строки таблицы :TABLE "YSRM_UK_STAGE" .DAT Peek. """
+    yield f':TABLE "YSRM_UK_STAGE",{len(stages)},4,4,4,1,10\n'
+    for stage, groups_in_stage in stages.items():
+        yield (
+            f':RECORD\n"ProcessId",1\n"StageId",{stage}\n'
+            f'"StartUpStage",{str(True) if stage == "1" else str(False)}\n'
+            f'"SignalGroups",",{",".join(map(str, groups_in_stage))},"\n:END\n'
+        )
+    yield ':END\n'
+
+
+def iter_matrix_lines(matrix: Iterable[Iterable[str]]) -> Iterable[str]:
+    """ Строки матрицы для функций F994, F997 .PTC2 Swarco. """
+    return (f'{"".join(row)}\n' for row in matrix)
+
+
+def iter_stages_bin_vals_lines(stages_bin_vals: Iterable[int]) -> Iterable[str]:
+    """ Строки функции F009 .PTC2 Swarco. """
+    return (f';{val:03d};;1;\n' for val in stages_bin_vals)
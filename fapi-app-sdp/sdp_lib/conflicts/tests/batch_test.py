@@ -0,0 +1,115 @@
+import asyncio
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import TestCase, main, mock
+
+from sdp_lib.conflicts import batch
+from sdp_lib.conflicts.batch import BatchConflictsCalculator, SrcConfig, calculate_conflicts
+from sdp_lib.conflicts.benchmark_rewriter import create_src_dat
+from sdp_lib.conflicts.calculate_conflicts import DataFields
+
+
+class TestBatchConflictsCalculator(TestCase):
+
+    items = [
+        ('cross_1', {'1': '1,2,3', '2': '4,5,6'}),
+        ('cross_2', {'1': '1,4', '2': '2,3', '3': '5'}),
+        ('cross_1_copy', {'1': '1,2,3', '2': '4,5,6'}),
+        ('bad', {'1': '1,x'}),
+    ]
+
+    def setUp(self) -> None:
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.calculator = BatchConflictsCalculator(maxsize=2, executor=self.executor)
+
+    def tearDown(self) -> None:
+        self.calculator.close()
+
+    def get_results(self, items, controller_type=None, src_config=None):
+        async def collect():
+            return [r async for r in self.calculator.iter_results(items, controller_type, src_config)]
+        return asyncio.run(collect())
+
+    def test_results_in_input_order(self):
+        results = self.get_results(self.items)
+        self.assertEqual([r.name for r in results], [name for name, _ in self.items])
+        for result, (_, stages) in zip(results[:3], self.items):
+            self.assertEqual(result.data, calculate_conflicts(dict(stages))[0])
+            self.assertFalse(result.errors)
+        self.assertTrue(results[3].errors)
+
+    def test_cache(self):
+        first = self.get_results(self.items[:3])
+        # Повтор перекрёстка в одном пакете использует один расчёт.
+        self.assertEqual([r.cached for r in first], [False, False, True])
+        self.assertEqual(first[0].content_hash, first[2].content_hash)
+        self.assertEqual((self.calculator.hits, self.calculator.misses), (1, 2))
+        second = self.get_results(self.items[:2])
+        self.assertTrue(all(r.cached for r in second))
+        self.assertEqual([r.data for r in second], [r.data for r in first[:2]])
+
+    def test_lru_eviction(self):
+        self.get_results(self.items[:2])
+        self.get_results([('cross_3', {'1': '7,8', '2': '9'})])
+        results = self.get_results(self.items[:2])
+        self.assertEqual([r.cached for r in results], [False, True])
+
+    def test_invalid_controller_type(self):
+        with self.assertRaises(ValueError):
+            self.get_results(self.items, 'Unknown', SrcConfig('config.PTC2', b''))
+
+    def test_close(self):
+        self.get_results(self.items[:1])
+        self.calculator.close()
+        self.assertTrue(self.executor._shutdown)
+        self.assertIsNone(self.calculator._executor)
+
+    def create_src_configs(self, num: int) -> list[SrcConfig]:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            src_configs = []
+            for i in range(num):
+                path = create_src_dat(Path(tmp_dir) / f'src_{i}.DAT', filler_records=2 + i)
+                src_configs.append(SrcConfig(path.name, path.read_bytes()))
+        return src_configs
+
+    def test_src_configs_lru(self):
+        calculator = BatchConflictsCalculator(maxsize=16, executor=self.executor, max_src_configs=1)
+        self.addCleanup(calculator.close)
+        src_configs = self.create_src_configs(3)
+        with mock.patch.object(batch, 'MAX_PROCESS_TEMPLATES', 2), \
+                mock.patch.object(batch, '_process_templates', batch.OrderedDict()) as templates:
+            for src_config in src_configs:
+                async def collect():
+                    return [r async for r in calculator.iter_results(self.items[:2], 'Peek', src_config)]
+                results = asyncio.run(collect())
+                self.assertTrue(all(r.config is not None for r in results))
+            # Во временном каталоге остаётся только последний исходный конфиг.
+            src_dir = Path(calculator._src_configs_dir.name)
+            self.assertEqual([p.name for p in src_dir.glob('*/*')], ['src_2.DAT'])
+            # В процессе хранится не более MAX_PROCESS_TEMPLATES шаблонов, вытесненный шаблон закрыт.
+            self.assertEqual([Path(p).name for p in templates], ['src_1.DAT', 'src_2.DAT'])
+            self.assertTrue(all(not t._data.closed for t in templates.values()))
+            for template in templates.values():
+                template.close()
+
+    def test_evicted_template_closed(self):
+        src_configs = self.create_src_configs(2)
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                mock.patch.object(batch, 'MAX_PROCESS_TEMPLATES', 1), \
+                mock.patch.object(batch, '_process_templates', batch.OrderedDict()) as templates:
+            paths = []
+            for src_config in src_configs:
+                path = Path(tmp_dir) / src_config.filename
+                path.write_bytes(src_config.content)
+                paths.append(str(path))
+            first = batch._get_process_template('Peek', paths[0])
+            self.assertIs(batch._get_process_template('Peek', paths[0]), first)
+            batch._get_process_template('Peek', paths[1])
+            self.assertEqual(list(templates), [paths[1]])
+            self.assertTrue(first._data.closed)
+            templates[paths[1]].close()
+
+
+if __name__ == '__main__':
+    main()
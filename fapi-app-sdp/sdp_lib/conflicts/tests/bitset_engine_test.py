@@ -0,0 +1,88 @@
+import random
+import tempfile
+from pathlib import Path
+from unittest import TestCase, main
+
+from sdp_lib.conflicts.bitset_engine import StagesBitsets, iter_bits
+from sdp_lib.conflicts.calculate_conflicts import CommonConflictsAndStagesAPI, DataFields
+
+
+class LegacyConflictsAndStagesAPI(CommonConflictsAndStagesAPI):
+    use_bitset_engine = False
+
+
+class TestBitsetEngine(TestCase):
+
+    def calculate(self, raw_data_stages, calculation_class=CommonConflictsAndStagesAPI):
+        calculation = calculation_class(dict(raw_data_stages))
+        calculation.build_data()
+        return calculation.instance_data
+
+    def assert_same_as_legacy(self, raw_data_stages):
+        self.assertEqual(
+            self.calculate(raw_data_stages),
+            self.calculate(raw_data_stages, LegacyConflictsAndStagesAPI)
+        )
+
+    def test_iter_bits(self):
+        self.assertEqual(list(iter_bits(0b1010_0101)), [0, 2, 5, 7])
+        self.assertEqual(list(iter_bits(0)), [])
+
+    def test_enemies_masks(self):
+        """
+        Направления 1, 2 в фазе 1, направления 2, 3 в фазе 2: конфликт только у 1 и 3.
+        """
+        bitsets = StagesBitsets([1, 2, 3], {'1': {1, 2}, '2': {2, 3}})
+        self.assertEqual(bitsets.mask_to_groups(bitsets.enemies_masks[0]), [3])
+        self.assertEqual(bitsets.mask_to_groups(bitsets.enemies_masks[1]), [])
+        self.assertEqual(bitsets.mask_to_groups(bitsets.enemies_masks[2]), [1])
+        self.assertEqual(bitsets.get_stages_bin_vals(), [2, 6, 4])
+
+    def test_same_as_legacy(self):
+        self.assert_same_as_legacy({
+            '1': '1,4,2,3,5,5,5,5,3,4,2',
+            '2': '1,6,7,7,3',
+            '3': '9,10,8,13,3,10,',
+            '4': '5,6,4'
+        })
+
+    def test_same_as_legacy_with_float_groups(self):
+        self.assert_same_as_legacy({
+            '1': '1,2,3,4',
+            '2': '2,5,6',
+            '3': '4.1,4.2,8,9'
+        })
+
+    def test_same_as_legacy_random(self):
+        rnd = random.Random(0)
+        for _ in range(50):
+            num_groups, num_stages = rnd.randint(1, 48), rnd.randint(1, 8)
+            raw_data_stages = {
+                str(stage): ','.join(
+                    str(g) for g in rnd.sample(range(1, num_groups + 1), rnd.randint(1, num_groups))
+                )
+                for stage in range(1, num_stages + 1)
+            }
+            with self.subTest(raw_data_stages=raw_data_stages):
+                instance_data = self.calculate(raw_data_stages)
+                self.assertEqual(instance_data, self.calculate(raw_data_stages, LegacyConflictsAndStagesAPI))
+                self.assertEqual(
+                    len(instance_data[DataFields.output_matrix.value]),
+                    instance_data[DataFields.number_of_groups.value] + 1
+                )
+
+    def test_txt_report_same_as_legacy(self):
+        raw_data_stages = {'1': '1,2,3,4', '2': '2,5,6', '3': '4.1,4.2,8,9'}
+        reports = []
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for calculation_class in (CommonConflictsAndStagesAPI, LegacyConflictsAndStagesAPI):
+                path = Path(tmp_dir) / f'{calculation_class.__name__}.txt'
+                calculation = calculation_class(dict(raw_data_stages), create_txt=True, path_to_save_txt=str(path))
+                calculation.build_data()
+                self.assertTrue(calculation.instance_data[DataFields.txt_file.value][DataFields.created.value])
+                reports.append(path.read_text())
+        self.assertEqual(*reports)
+
+
+if __name__ == '__main__':
+    main()
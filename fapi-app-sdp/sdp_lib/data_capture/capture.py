@@ -0,0 +1,322 @@
+"""
+Движок одновременного сбора данных с нескольких источников (SNMP, Modbus, HTTP).
+
+В отличие от main_loop.main, где опрос выполняется раундами с asyncio.sleep(delay)
+и реальный период увеличивается на время ответа самого медленного источника:
+    -- каждый источник опрашивается со своим периодом по абсолютным срокам
+       (start + n * period), поэтому период не накапливает ошибку;
+    -- если опрос не уложился в период, пропущенные сроки не выполняются, а учитываются
+       в CaptureSource.num_missed;
+    -- время измерения берётся из монотонных часов, время по часам компьютера вычисляется
+       от момента запуска и не зависит от перевода системных часов;
+    -- последние значения всех источников с заданным шагом сводятся в строки
+       общей временной шкалы (AlignedRow), что позволяет сравнивать, например,
+       фазу по Modbus и по SNMP в один и тот же момент;
+    -- запись выполняется пачками в фоновом потоке BatchWriter.
+"""
+
+import asyncio
+import datetime
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from sdp_lib.data_capture.producers import AbstractProducer
+from sdp_lib.data_capture.writers import BatchWriter
+from sdp_lib.utils_common.utils_common import format_time
+
+
+@dataclass(frozen=True, slots=True)
+class Sample:
+    """
+    Результат одного опроса источника.
+    t_request -> монотонное время начала запроса.
+    latency -> время выполнения запроса в секундах.
+    """
+    source: str
+    protocol: str
+    t_request: float
+    latency: float
+    wall_time: datetime.datetime
+    value: Any
+    error: str | None = None
+
+    @property
+    def t_measure(self) -> float:
+        """ Оценка момента измерения: середина интервала запроса. """
+        return self.t_request + self.latency / 2
+
+    def as_record(self) -> tuple:
+        return (
+            format_time(self.wall_time), self.source, self.protocol,
+            self.value, f'{self.latency * 1000:.1f}', self.error or ''
+        )
+
+
+@dataclass(slots=True)
+class CaptureSource:
+    """
+    Источник данных и параметры его опроса.
+    period -> период опроса в секундах.
+    timeout -> максимальное время запроса. None - равно period.
+    max_age -> возраст значения, после которого оно не используется на общей шкале.
+               None - два периода опроса.
+    process_event -> вызывать ли producer.event_process() после каждого опроса.
+    """
+    producer: AbstractProducer
+    period: float
+    timeout: float | None = None
+    max_age: float | None = None
+    process_event: bool = False
+    num_samples: int = field(default=0, init=False)
+    num_errors: int = field(default=0, init=False)
+    num_missed: int = field(default=0, init=False)
+
+    def __post_init__(self):
+        if self.period <= 0:
+            raise ValueError('period должен быть больше 0')
+        self.timeout = self.timeout or self.period
+        self.max_age = self.max_age or self.period * 2
+
+    @property
+    def name(self) -> str:
+        return self.producer.get_name()
+
+
+@dataclass(frozen=True, slots=True)
+class AlignedRow:
+    """
+    Значения всех источников на момент t шкалы.
+    values, ages -> значение и его возраст в секундах для каждого источника в порядке
+                    источников движка. None - нет актуального значения.
+    """
+    tick: int
+    t: float
+    wall_time: datetime.datetime
+    values: tuple[Any, ...]
+    ages: tuple[float | None, ...]
+
+    def is_consistent(self) -> bool:
+        """ Все источники имеют актуальное значение и значения совпадают. """
+        return None not in self.values and len(set(self.values)) == 1
+
+    def as_record(self) -> tuple:
+        return (
+            format_time(self.wall_time), self.tick, *self.values,
+            'OK' if self.is_consistent() else 'MISMATCH'
+        )
+
+
+class Timeline:
+    """
+    Последние значения источников для построения строк общей временной шкалы.
+    """
+
+    def __init__(self, sources: Sequence[CaptureSource]):
+        self._names = [source.name for source in sources]
+        self._max_ages = [source.max_age for source in sources]
+        self._index = {name: i for i, name in enumerate(self._names)}
+        self._last_samples: list[Sample | None] = [None] * len(self._names)
+
+    @property
+    def names(self) -> list[str]:
+        return self._names
+
+    def update(self, sample: Sample):
+        i = self._index[sample.source]
+        last = self._last_samples[i]
+        if sample.error is None and (last is None or sample.t_measure >= last.t_measure):
+            self._last_samples[i] = sample
+
+    def create_row(self, tick: int, t: float, wall_time: datetime.datetime) -> AlignedRow:
+        values, ages = [], []
+        for sample, max_age in zip(self._last_samples, self._max_ages):
+            age = None if sample is None else t - sample.t_measure
+            if age is None or age > max_age:
+                values.append(None)
+                ages.append(None)
+            else:
+                values.append(sample.value)
+                ages.append(age)
+        return AlignedRow(tick, t, wall_time, tuple(values), tuple(ages))
+
+
+class CaptureEngine:
+    """
+    Движок сбора данных.
+        -- sources: источники и их периоды опроса;
+        -- timeline_step: шаг общей временной шкалы. None - наименьший период опроса;
+        -- writer: фоновый писатель. Получает AlignedRow.as_record() и, если
+           write_samples=True, Sample.as_record();
+        -- on_sample, on_row: необязательные обработчики, вызываются в цикле событий.
+    """
+
+    def __init__(
+            self,
+            sources: Sequence[CaptureSource],
+            *,
+            timeline_step: float | None = None,
+            writer: BatchWriter | None = None,
+            write_samples: bool = False,
+            on_sample: Callable[[Sample], Any] | None = None,
+            on_row: Callable[[AlignedRow], Any] | None = None
+    ):
+        if not sources:
+            raise ValueError('Не заданы источники')
+        self._sources = list(sources)
+        self._timeline = Timeline(self._sources)
+        self._timeline_step = timeline_step or min(source.period for source in self._sources)
+        self._writer = writer
+        self._write_samples = write_samples
+        self._on_sample = on_sample
+        self._on_row = on_row
+        self._t_start = 0.
+        self._wall_start = datetime.datetime.now()
+
+    @property
+    def sources(self) -> list[CaptureSource]:
+        return self._sources
+
+    @property
+    def timeline_header(self) -> tuple[str, ...]:
+        return 'Время', 'Шаг', *self._timeline.names, 'Статус'
+
+    def to_wall_time(self, t: float) -> datetime.datetime:
+        return self._wall_start + datetime.timedelta(seconds=t - self._t_start)
+
+    @staticmethod
+    async def _sleep_until(loop: asyncio.AbstractEventLoop, deadline: float):
+        delay = deadline - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _poll(self, source: CaptureSource, loop: asyncio.AbstractEventLoop) -> Sample:
+        t_request = loop.time()
+        try:
+            await asyncio.wait_for(source.producer.request_and_process(), timeout=source.timeout)
+            error, value = source.producer.response
+        except asyncio.TimeoutError:
+            error, value = f'Превышено время запроса: {source.timeout} сек', None
+        except Exception as exc:
+            error, value = f'{type(exc).__name__}: {exc}', None
+        latency = loop.time() - t_request
+        if error is not None and not isinstance(error, str):
+            error = ', '.join(map(str, error)) if isinstance(error, Sequence) else str(error)
+        return Sample(
+            source.name, source.producer.get_protocol(), t_request, latency,
+            self.to_wall_time(t_request), value, error or None
+        )
+
+    async def _run_source(self, source: CaptureSource):
+        loop = asyncio.get_running_loop()
+        deadline = self._t_start
+        while True:
+            sample = await self._poll(source, loop)
+            source.num_samples += 1
+            if sample.error is not None:
+                source.num_errors += 1
+            if source.process_event:
+                source.producer.event_process()
+            self._timeline.update(sample)
+            if self._on_sample is not None:
+                self._on_sample(sample)
+            if self._writer is not None and self._write_samples:
+                self._writer.put(sample.as_record())
+
+            deadline += source.period
+            now = loop.time()
+            if now >= deadline:
+                missed = int((now - deadline) // source.period) + 1
+                source.num_missed += missed
+                deadline += missed * source.period
+            await self._sleep_until(loop, deadline)
+
+    async def _run_timeline(self):
+        loop = asyncio.get_running_loop()
+        tick = 0
+        while True:
+            tick += 1
+            t = self._t_start + tick * self._timeline_step
+            await self._sleep_until(loop, t)
+            row = self._timeline.create_row(tick, t, self.to_wall_time(t))
+            if self._on_row is not None:
+                self._on_row(row)
+            if self._writer is not None:
+                self._writer.put(row.as_record())
+
+    async def run(self, duration: float | None = None):
+        """
+        Запускает сбор данных на duration секунд или до отмены задачи.
+        Писатель запускается и по окончании закрывается движком.
+        """
+        loop = asyncio.get_running_loop()
+        self._t_start = loop.time()
+        self._wall_start = datetime.datetime.now()
+        if self._writer is not None:
+            self._writer.start()
+            self._writer.put(self.timeline_header)
+        tasks = [
+            asyncio.create_task(self._run_source(source), name=f'capture_{source.name}')
+            for source in self._sources
+        ]
+        tasks.append(asyncio.create_task(self._run_timeline(), name='capture_timeline'))
+        try:
+            await asyncio.wait_for(asyncio.gather(*tasks), timeout=duration)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self._writer is not None:
+                await asyncio.to_thread(self._writer.close)
+
+    def get_stats(self) -> dict[str, dict[str, int]]:
+        return {
+            source.name: {
+                'samples': source.num_samples,
+                'errors': source.num_errors,
+                'missed': source.num_missed
+            }
+            for source in self._sources
+        }
+
+
+if __name__ == '__main__':
+    import logging
+    import random
+
+    from sdp_lib.data_capture.writers import LoggerSink
+
+    logging.basicConfig(level=logging.INFO)
+
+    class FakeHost:
+        protocol = 'fake'
+
+        def __init__(self, latency: float):
+            self.latency = latency
+            self.current_stage = 1
+            self.response_errors = []
+
+        async def get_current_stage(self):
+            await asyncio.sleep(random.uniform(0, self.latency))
+            self.current_stage = int(time.monotonic()) // 3 % 4 + 1
+            return self
+
+    class FakeProducer(AbstractProducer):
+        async def request_and_process(self):
+            await self._host.get_current_stage()
+            self.response = None, self._host.current_stage
+            return self
+
+    engine = CaptureEngine(
+        [
+            CaptureSource(FakeProducer(FakeHost(.05), None, 'modbus'), period=.1),
+            CaptureSource(FakeProducer(FakeHost(.3), None, 'snmp'), period=.5),
+        ],
+        timeline_step=.5,
+        writer=BatchWriter(LoggerSink(logging.getLogger('capture')), flush_interval=.5)
+    )
+    asyncio.run(engine.run(duration=5))
+    print(engine.get_stats())
@@ -6,6 +6,8 @@ from sdp_lib.data_capture.storage import LogWriter
 
 
 async def main(delay: float, producers: Iterable[AbstractProducer], log_writer: LogWriter):
+    # Одна задача записи: следующая запись начинается только после завершения предыдущей.
+    write_task: asyncio.Task | None = None
     while True:
         pending = [asyncio.create_task(prod.request_and_process(), name=prod.get_name()) for prod in producers]
         while pending:
@@ -14,5 +16,7 @@ async def main(delay: float, producers: Iterable[AbstractProducer], log_writer:
                 await done_task
                 producer: AbstractProducer = done_task.result()
                 producer.event_process()
-        asyncio.create_task(asyncio.to_thread(log_writer.write_all))
+        if write_task is not None:
+            await write_task
+        write_task = asyncio.create_task(asyncio.to_thread(log_writer.write_all))
         await asyncio.sleep(delay)
\ No newline at end of file
@@ -14,6 +14,9 @@ class AbstractProducer:
     def get_name(self):
         return self._name
 
+    def get_protocol(self) -> str:
+        return str(getattr(self._host, 'protocol', ''))
+
     def get_event(self) -> Event:
         return self._event
 
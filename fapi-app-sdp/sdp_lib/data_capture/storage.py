@@ -1,10 +1,15 @@
+import threading
 from collections import deque
 from collections.abc import Iterable
 from functools import cached_property
 from logging import Logger
+from typing import TYPE_CHECKING
 
 from openpyxl.workbook import Workbook
 
+if TYPE_CHECKING:
+    from sdp_lib.data_capture.writers import BatchSink
+
 
 class RecordsStorage:
     """ Класс представляет собой хранилище сообщений для логгирования событий. """
@@ -45,13 +50,17 @@ class LogWriter:
             self,
             record_storage: RecordsStorage,
             logger: Logger,
-            wb: Workbook,
-            excel_filename: str
+            wb: Workbook | None,
+            excel_filename: str,
+            excel_sink: 'BatchSink | None' = None
     ):
         self._record_storage = record_storage
         self._logger = logger
         self._wb = wb
         self._excel_filename = excel_filename
+        self._excel_sink = excel_sink
+        # write_all вызывается в отдельном потоке, запись в excel_sink/wb не должна пересекаться.
+        self._lock = threading.Lock()
 
     def write_filelog(self):
         """
@@ -61,15 +70,35 @@ class LogWriter:
             self._logger.info(self._record_storage.filelog_records.popleft())
 
     def write_excel(self):
-        """ Осуществляет запись в соответствующий эксель файл. """
+        """
+        Осуществляет запись в соответствующий эксель файл.
+        Если задан excel_sink (например, CsvSink или XlsxStreamSink), новые записи
+        передаются в него, и файл целиком не перезаписывается.
+        """
+        if self._excel_sink is not None:
+            records = []
+            while self._record_storage.excel_records:
+                records.append(self._record_storage.excel_records.popleft())
+            if records:
+                self._excel_sink.write_batch(records)
+            return
         while self._record_storage.excel_records:
             self._wb.active.append(self._record_storage.excel_records.popleft())
         self._wb.save(self._excel_filename)
 
     def write_all(self):
         """ Осуществляет все доступные варианты записей. """
-        self.write_filelog()
-        self.write_excel()
+        with self._lock:
+            self.write_filelog()
+            self.write_excel()
+
+    def close(self):
+        """ Записывает оставшиеся записи и закрывает excel_sink. """
+        with self._lock:
+            self.write_filelog()
+            self.write_excel()
+            if self._excel_sink is not None:
+                self._excel_sink.close()
 
 
 
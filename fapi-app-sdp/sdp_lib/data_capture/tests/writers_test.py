@@ -0,0 +1,90 @@
+import csv
+import tempfile
+from pathlib import Path
+from unittest import TestCase, main
+
+from openpyxl import load_workbook
+
+from sdp_lib.data_capture.writers import BatchWriter, CsvSink, XlsxStreamSink, export_csv_to_xlsx
+
+
+class TestWriters(TestCase):
+
+    header = ('time', 'stage')
+    records = [(f'10:00:{i:02d}', i % 4 + 1) for i in range(9)]
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp_dir.name)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def read_csv(self, path: Path) -> list[list[str]]:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            return list(csv.reader(f, delimiter=';'))
+
+    def read_xlsx(self, path: Path) -> list[tuple]:
+        wb = load_workbook(path, read_only=True)
+        try:
+            return list(wb.active.values)
+        finally:
+            wb.close()
+
+    def test_csv_rollover(self):
+        sink = CsvSink(self.directory / 'report.csv', self.header, rows_per_file=3)
+        # Пачки не совпадают с границами частей.
+        sink.write_batch(self.records[:2])
+        sink.write_batch(self.records[2:7])
+        # Строки записываются в файл сразу после write_batch, до закрытия приёмника.
+        self.assertEqual(len(self.read_csv(sink.paths[-1])), 2)
+        sink.write_batch(self.records[7:])
+        sink.close()
+        self.assertEqual([p.name for p in sink.paths], ['report_001.csv', 'report_002.csv', 'report_003.csv'])
+        parts = [self.read_csv(path) for path in sink.paths]
+        self.assertEqual([len(rows) for rows in parts], [4, 4, 4])
+        self.assertTrue(all(rows[0] == list(self.header) for rows in parts))
+        self.assertEqual([row for rows in parts for row in rows[1:]], [[t, str(s)] for t, s in self.records])
+
+    def test_csv_without_rollover(self):
+        sink = CsvSink(self.directory / 'report.csv', self.header)
+        sink.write_batch(self.records)
+        sink.close()
+        self.assertEqual(sink.paths, [self.directory / 'report.csv'])
+        self.assertEqual(len(self.read_csv(sink.paths[0])), 10)
+
+    def test_xlsx_rollover(self):
+        sink = XlsxStreamSink(self.directory / 'report.xlsx', self.header, rows_per_file=4)
+        sink.write_batch(self.records)
+        sink.close()
+        self.assertEqual(
+            [p.name for p in sink.paths], ['report_001.xlsx', 'report_002.xlsx', 'report_003.xlsx']
+        )
+        parts = [self.read_xlsx(path) for path in sink.paths]
+        self.assertEqual([len(rows) for rows in parts], [5, 5, 2])
+        self.assertEqual([row for rows in parts for row in rows[1:]], self.records)
+
+    def test_export_csv_to_xlsx(self):
+        sink = CsvSink(self.directory / 'report.csv', self.header, rows_per_file=4)
+        sink.write_batch(self.records)
+        sink.close()
+        path = export_csv_to_xlsx(sink.paths, self.directory / 'report.xlsx')
+        rows = self.read_xlsx(path)
+        # Заголовок только из первой части.
+        self.assertEqual(len(rows), len(self.records) + 1)
+        self.assertEqual(rows[0], self.header)
+        rows = self.read_xlsx(export_csv_to_xlsx(sink.paths, path, skip_repeated_header=False))
+        self.assertEqual(len(rows), len(self.records) + len(sink.paths))
+
+    def test_batch_writer(self):
+        sink = CsvSink(self.directory / 'report.csv', self.header, rows_per_file=3)
+        with BatchWriter(sink, batch_size=4, flush_interval=10) as writer:
+            writer.put(*self.records)
+        # Оставшиеся записи записываются при закрытии, приёмники закрываются.
+        self.assertEqual(writer.num_written, len(self.records))
+        self.assertTrue(sink._file.closed)
+        self.assertEqual(sum(len(self.read_csv(path)) - 1 for path in sink.paths), len(self.records))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,289 @@
+import abc
+import csv
+import logging
+import os
+import queue
+import threading
+import time
+from collections.abc import Iterable, Sequence
+from logging import Logger
+from pathlib import Path
+from typing import Any, Protocol
+
+from openpyxl.workbook import Workbook
+
+
+logger = logging.getLogger(__name__)
+
+
+class BatchSink(Protocol):
+    """
+    Приёмник записей BatchWriter. Методы вызываются из фонового потока писателя.
+    """
+    def write_batch(self, records: Sequence[Any]) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class LoggerSink:
+    """ Пишет каждую запись отдельным сообщением логгера. """
+    def __init__(self, logger_: Logger, level: int = logging.INFO):
+        self._logger = logger_
+        self._level = level
+
+    def write_batch(self, records: Sequence[Any]):
+        for record in records:
+            self._logger.log(self._level, record if isinstance(record, str) else ' | '.join(map(str, record)))
+
+    def close(self):
+        pass
+
+
+def get_part_path(path: Path, part: int) -> Path:
+    """ Возвращает путь части файла: report.csv -> report_001.csv. """
+    return path.with_name(f'{path.stem}_{part:03d}{path.suffix}')
+
+
+class _RolloverSink(abc.ABC):
+    """
+    Общая логика приёмников с разбиением на части по количеству строк.
+    Заголовок записывается в начало каждой части.
+    """
+
+    def __init__(
+            self,
+            path: str | os.PathLike,
+            header: Sequence[Any] | None = None,
+            rows_per_file: int | None = None
+    ):
+        self._path = Path(path)
+        self._header = header
+        self._rows_per_file = rows_per_file
+        self._part = 0
+        self._rows_in_part = 0
+        self.paths: list[Path] = []
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(path={self._path} parts={len(self.paths)})'
+
+    @abc.abstractmethod
+    def _open_part(self, path: Path):
+        ...
+
+    @abc.abstractmethod
+    def _close_part(self):
+        ...
+
+    @abc.abstractmethod
+    def _write_rows(self, rows: Sequence[Sequence[Any]]):
+        ...
+
+    def _next_part(self):
+        if self.paths:
+            self._close_part()
+        self._part += 1
+        path = self._path if self._rows_per_file is None else get_part_path(self._path, self._part)
+        self._open_part(path)
+        self.paths.append(path)
+        self._rows_in_part = 0
+        if self._header is not None:
+            self._write_rows([self._header])
+
+    def write_batch(self, records: Sequence[Sequence[Any]]):
+        if not self.paths:
+            self._next_part()
+        start = 0
+        while start < len(records):
+            if self._rows_per_file is not None and self._rows_in_part >= self._rows_per_file:
+                self._next_part()
+            stop = len(records) if self._rows_per_file is None else (
+                start + self._rows_per_file - self._rows_in_part
+            )
+            chunk = records[start:stop]
+            self._write_rows(chunk)
+            self._rows_in_part += len(chunk)
+            start += len(chunk)
+
+    def close(self):
+        if self.paths:
+            self._close_part()
+
+
+class CsvSink(_RolloverSink):
+    """
+    Потоковая запись строк в csv. Каждая пачка дописывается в конец файла,
+    стоимость записи не зависит от количества уже записанных строк.
+    При заданном rows_per_file файл разбивается на части report_001.csv, report_002.csv...
+    """
+
+    def __init__(
+            self,
+            path: str | os.PathLike,
+            header: Sequence[Any] | None = None,
+            rows_per_file: int | None = None,
+            delimiter: str = ';',
+            encoding: str = 'utf-8-sig'
+    ):
+        super().__init__(path, header, rows_per_file)
+        self._delimiter = delimiter
+        self._encoding = encoding
+        self._file = None
+        self._writer = None
+
+    def _open_part(self, path: Path):
+        self._file = open(path, 'w', newline='', encoding=self._encoding)
+        self._writer = csv.writer(self._file, delimiter=self._delimiter)
+
+    def _close_part(self):
+        self._file.close()
+
+    def _write_rows(self, rows: Sequence[Sequence[Any]]):
+        self._writer.writerows(rows)
+        self._file.flush()
+
+
+class XlsxStreamSink(_RolloverSink):
+    """
+    Запись строк в xlsx в режиме openpyxl write_only: строки сразу сериализуются
+    во временный файл и не накапливаются в памяти. Файл сохраняется при достижении
+    rows_per_file строк (затем начинается новая часть) и при закрытии.
+    Поскольку до сохранения части файл недоступен, для длительных сессий
+    его стоит использовать вместе с CsvSink.
+    """
+
+    def __init__(
+            self,
+            path: str | os.PathLike,
+            header: Sequence[Any] | None = None,
+            rows_per_file: int | None = 100_000,
+            sheet_title: str = 'Данные'
+    ):
+        super().__init__(path, header, rows_per_file)
+        self._sheet_title = sheet_title
+        self._wb: Workbook | None = None
+        self._ws = None
+        self._current_path: Path | None = None
+
+    def _open_part(self, path: Path):
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet(self._sheet_title)
+        self._current_path = path
+
+    def _close_part(self):
+        self._wb.save(self._current_path)
+        self._wb = self._ws = None
+
+    def _write_rows(self, rows: Sequence[Sequence[Any]]):
+        for row in rows:
+            self._ws.append(list(row))
+
+
+def export_csv_to_xlsx(
+        csv_paths: Iterable[str | os.PathLike],
+        xlsx_path: str | os.PathLike,
+        delimiter: str = ';',
+        encoding: str = 'utf-8-sig',
+        skip_repeated_header: bool = True,
+        sheet_title: str = 'Данные'
+) -> Path:
+    """
+    Объединяет части csv в один xlsx по окончании сессии. Строки читаются
+    и записываются потоково (openpyxl write_only), весь файл в памяти не хранится.
+    :param skip_repeated_header: Не переносить первую строку всех частей, кроме первой.
+    :return: Путь к xlsx.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_title)
+    for i, path in enumerate(csv_paths):
+        with open(path, newline='', encoding=encoding) as f:
+            reader = csv.reader(f, delimiter=delimiter)
+            if i and skip_repeated_header:
+                next(reader, None)
+            for row in reader:
+                ws.append(row)
+    wb.save(xlsx_path)
+    return Path(xlsx_path)
+
+
+class BatchWriter:
+    """
+    Фоновый писатель записей пачками.
+
+    Записи помещаются в очередь из цикла событий без блокировки, фоновый поток забирает
+    их и передаёт в приёмники пачками не более batch_size записей либо по истечении
+    flush_interval секунд с момента предыдущей записи. Запись в файлы не выполняется
+    в цикле событий и не требует отдельного потока на каждую пачку.
+    """
+
+    _stop = object()
+
+    def __init__(
+            self,
+            *sinks: BatchSink,
+            batch_size: int = 512,
+            flush_interval: float = 1.,
+            name: str = 'capture_writer'
+    ):
+        self._sinks = list(sinks)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.num_written = 0
+        self.num_batches = 0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def start(self):
+        if not self._thread.is_alive():
+            self._thread.start()
+
+    def put(self, *records: Any):
+        """ Добавляет записи в очередь. Безопасно вызывать из любого потока. """
+        for record in records:
+            self._queue.put(record)
+
+    def _flush(self, batch: list[Any]):
+        if not batch:
+            return
+        for sink in self._sinks:
+            try:
+                sink.write_batch(batch)
+            except Exception as exc:
+                logger.exception(f'Ошибка записи в {sink!r}: {exc}')
+        self.num_written += len(batch)
+        self.num_batches += 1
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self._flush_interval
+        while True:
+            try:
+                record = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                pass
+            else:
+                if record is self._stop:
+                    self._flush(batch)
+                    break
+                batch.append(record)
+            if len(batch) >= self._batch_size or time.monotonic() >= deadline:
+                self._flush(batch)
+                batch = []
+                deadline = time.monotonic() + self._flush_interval
+
+    def close(self):
+        """ Записывает оставшиеся записи, останавливает поток и закрывает приёмники. """
+        if self._thread.is_alive():
+            self._queue.put(self._stop)
+            self._thread.join()
+        for sink in self._sinks:
+            try:
+                sink.close()
+            except Exception as exc:
+                logger.exception(f'Ошибка закрытия {sink!r}: {exc}')
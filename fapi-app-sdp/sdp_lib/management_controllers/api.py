@@ -6,5 +6,4 @@ from sdp_lib.management_controllers.snmp.snmp_core import (
 )
 from sdp_lib.management_controllers.snmp.snmp_requests import snmp_engine
 from sdp_lib.management_controllers.http.peek.peek_http import PeekWebHosts
-
-
+from sdp_lib.management_controllers.http.session_manager import http_session_manager
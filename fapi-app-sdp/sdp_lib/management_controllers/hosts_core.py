@@ -70,6 +70,7 @@ class RequestResponse:
         self.status_response = None
         self.errors = []
         self._processed_data = {}
+        self.__dict__.pop('processed_pretty_data', None)
 
     @cached_property
     def processed_pretty_data(self) -> MutableMapping[str, Any]:
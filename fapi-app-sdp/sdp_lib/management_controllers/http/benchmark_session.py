@@ -0,0 +1,77 @@
+"""
+Сравнение пропускной способности http-запросов:
+    -- новое соединение на каждый запрос (поведение без общей сессии);
+    -- общая сессия http_session_manager с keep-alive соединениями.
+Запросы отправляются на локальный stub-сервер, имитирующий веб-интерфейс контроллеров.
+
+Запуск: python -m sdp_lib.management_controllers.http.benchmark_session
+"""
+
+import asyncio
+import time
+
+import aiohttp
+from aiohttp import web
+
+from sdp_lib.management_controllers.http.request_sender import AsyncHttpRequests
+from sdp_lib.management_controllers.http.session_manager import HttpSessionManager
+
+
+STUB_HOST = '127.0.0.1'
+STUB_PORTS = (18081, 18082, 18083, 18084)
+NUM_REQUESTS = 4000
+STUB_PAGE = ':SUBTITLE;Stub controller\n' * 64
+
+
+async def stub_handler(request: web.Request) -> web.Response:
+    return web.Response(text=STUB_PAGE)
+
+
+async def run_stub_servers() -> list[web.AppRunner]:
+    runners = []
+    for port in STUB_PORTS:
+        app = web.Application()
+        app.router.add_get('/', stub_handler)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, STUB_HOST, port).start()
+        runners.append(runner)
+    return runners
+
+
+async def run_requests(session: aiohttp.ClientSession, num_requests: int) -> tuple[float, int]:
+    """
+    Отправляет num_requests запросов, равномерно распределённых по stub-серверам.
+    :return: Кортеж из количества запросов в секунду и количества ошибок.
+    """
+    sender = AsyncHttpRequests(session)
+    targets = [(f'http://{STUB_HOST}:{port}/', asyncio.Semaphore(6)) for port in STUB_PORTS]
+    start_time = time.perf_counter()
+    results = await asyncio.gather(
+        *(sender.fetch(*targets[i % len(targets)]) for i in range(num_requests))
+    )
+    elapsed = time.perf_counter() - start_time
+    errors = sum(1 for error, _, _ in results if error is not None)
+    return num_requests / elapsed, errors
+
+
+async def main(num_requests: int = NUM_REQUESTS):
+    runners = await run_stub_servers()
+    try:
+        no_keepalive_session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(force_close=True))
+        try:
+            rps, errors = await run_requests(no_keepalive_session, num_requests)
+            print(f'Новое соединение на каждый запрос: {rps:.0f} запросов/сек, ошибок: {errors}')
+        finally:
+            await no_keepalive_session.close()
+
+        async with HttpSessionManager() as shared_session:
+            rps, errors = await run_requests(shared_session, num_requests)
+            print(f'Общая сессия с keep-alive: {rps:.0f} запросов/сек, ошибок: {errors}')
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
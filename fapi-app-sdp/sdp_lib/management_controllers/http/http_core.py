@@ -26,8 +26,15 @@ class HttpHosts(Host):
         # self._parser = None
         # self._varbinds_for_request = None
 
-    def set_base_url(self):
-        if check_is_ipv4(self._ipv4):
+    def set_base_url(self, base_url: str = None):
+        """
+        Устанавливает базовый url хоста.
+        :param base_url: Явно заданный url (например, с нестандартным портом). Если не передан,
+                         url формируется из ip-адреса хоста.
+        """
+        if base_url is not None:
+            self._base_url = base_url.rstrip('/')
+        elif check_is_ipv4(self._ipv4):
             self._base_url = f'{Names.http_prefix}{self._ipv4}'
         else:
             self._base_url = ''
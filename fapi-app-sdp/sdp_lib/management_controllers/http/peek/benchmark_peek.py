@@ -0,0 +1,114 @@
+"""
+Нагрузочный бенчмарк PeekWebHosts на симуляторе веб-интерфейса ДК Peek.
+
+Запускает num_hosts симуляторов на адресах 127.0.0.x, выполняет заданное количество
+вызовов get_states и set_stage и выводит распределение задержек и количество ошибок.
+
+Запуск: python -m sdp_lib.management_controllers.http.peek.benchmark_peek
+"""
+
+import asyncio
+import random
+import statistics
+import time
+from collections.abc import Callable, Awaitable
+from dataclasses import dataclass, field
+
+from sdp_lib.management_controllers.http.peek.peek_http import PeekWebHosts
+from sdp_lib.management_controllers.http.peek.simulator import (
+    SimulatorConfig,
+    run_simulators
+)
+from sdp_lib.management_controllers.http.session_manager import http_session_manager
+
+
+SIMULATOR_PORT = 18180
+
+
+@dataclass(slots=True)
+class LatencyReport:
+    name: str
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    elapsed: float = 0.
+
+    def as_string(self) -> str:
+        if not self.latencies:
+            return f'{self.name}: нет данных'
+        ms = sorted(lat * 1000 for lat in self.latencies)
+        percentiles = statistics.quantiles(ms, n=100, method='inclusive')
+        return (
+            f'{self.name}: вызовов={len(ms)} ошибок={self.errors} '
+            f'вызовов/сек={len(ms) / self.elapsed:.0f} | '
+            f'мс: min={ms[0]:.2f} p50={percentiles[49]:.2f} p90={percentiles[89]:.2f} '
+            f'p99={percentiles[98]:.2f} max={ms[-1]:.2f}'
+        )
+
+
+def create_hosts(num_hosts: int) -> list[PeekWebHosts]:
+    hosts = []
+    for i in range(num_hosts):
+        ipv4 = f'127.0.{i // 250}.{i % 250 + 1}'
+        host = PeekWebHosts(ipv4, host_id=f'sim{i}')
+        host.set_base_url(f'http://{ipv4}:{SIMULATOR_PORT}')
+        hosts.append(host)
+    return hosts
+
+
+async def run_calls(
+        name: str,
+        hosts: list[PeekWebHosts],
+        num_calls: int,
+        method: Callable[[PeekWebHosts], Awaitable[PeekWebHosts]],
+        concurrency: int
+) -> LatencyReport:
+    """
+    Выполняет num_calls вызовов method, распределённых по hosts, не более concurrency одновременно.
+    Один хост обрабатывает вызовы последовательно, как при реальном управлении.
+    """
+    report = LatencyReport(name)
+    semaphore = asyncio.Semaphore(concurrency)
+    host_locks = {id(host): asyncio.Lock() for host in hosts}
+
+    async def call(host: PeekWebHosts):
+        async with semaphore, host_locks[id(host)]:
+            start_time = time.perf_counter()
+            await method(host)
+            report.latencies.append(time.perf_counter() - start_time)
+            if host.build_response_as_dict()['errors']:
+                report.errors += 1
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(call(hosts[i % len(hosts)]) for i in range(num_calls)))
+    report.elapsed = time.perf_counter() - start_time
+    return report
+
+
+async def main(
+        num_hosts: int = 50,
+        num_calls: int = 5000,
+        concurrency: int = 200,
+        config: SimulatorConfig = SimulatorConfig(latency=.005, jitter=.01, error_rate=.001)
+):
+    hosts = create_hosts(num_hosts)
+    simulators, runners = await run_simulators(
+        [(host.ip_v4, SIMULATOR_PORT) for host in hosts], config
+    )
+    try:
+        reports = [
+            await run_calls('get_states', hosts, num_calls, lambda h: h.get_states(), concurrency),
+            await run_calls(
+                'set_stage', hosts, num_calls, lambda h: h.set_stage(random.randint(0, 8)), concurrency
+            ),
+        ]
+        for report in reports:
+            print(report.as_string())
+        print(f'Всего запросов к симуляторам: {sum(sim.num_requests for sim in simulators)}')
+    finally:
+        await http_session_manager.close()
+        for runner in runners:
+            await runner.cleanup()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+import time
+from collections.abc import (
+    MutableMapping,
+    Sequence
+)
+from dataclasses import dataclass, field
+
+from sdp_lib.management_controllers.http.peek.static_data import Actuator
+from sdp_lib.management_controllers.http.peek.varbinds import (
+    Payload,
+    inputs_prefix
+)
+from sdp_lib.management_controllers.structures import InputsStructure
+
+
+@dataclass(slots=True)
+class CachedInputs:
+    """
+    Последнее известное состояние ВВОДОВ контроллера.
+    inputs -> словарь вида {имя ввода: (index, num, name, state, time, actuator)},
+              аналогичный данным InputsPageParser.
+    timestamp -> значение time.monotonic() на момент получения/обновления данных.
+    """
+    inputs: MutableMapping[str, tuple[str, ...]]
+    timestamp: float
+    names_by_index: dict[str, str] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.names_by_index = {props[InputsStructure.INDEX]: name for name, props in self.inputs.items()}
+
+
+class InputsStateCache:
+    """
+    Кэш состояний ВВОДОВ контроллеров Peek, ключ - ip-адрес хоста.
+    Позволяет при установке фазы не запрашивать страницу ВВОДОВ, если её
+    состояние известно и не устарело, и отправлять только изменяемые ВВОДЫ.
+    """
+
+    matches_actuator_value_to_state = {
+        Actuator.ON_as_value: ('1', Actuator.ON_as_chars),
+        Actuator.OFF_as_value: ('0', Actuator.OFF_as_chars),
+    }
+
+    def __init__(self, seconds_freshness: float = 30):
+        self._storage: dict[str, CachedInputs] = {}
+        self._seconds_freshness = float(seconds_freshness)
+
+    def set_freshness_time_in_seconds(self, seconds: float):
+        self._seconds_freshness = float(seconds)
+
+    def get_seconds_freshness(self) -> float:
+        return self._seconds_freshness
+
+    def put(self, ipv4: str, inputs: MutableMapping[str, tuple[str, ...]]):
+        self._storage[ipv4] = CachedInputs(dict(inputs), time.monotonic())
+
+    def get_fresh(self, ipv4: str) -> MutableMapping[str, tuple[str, ...]] | None:
+        """
+        Возвращает копию состояния ВВОДОВ, если оно не старше self._seconds_freshness секунд.
+        :return: Словарь с ВВОДАМИ или None, если данные отсутствуют или устарели.
+        """
+        cached = self._storage.get(ipv4)
+        if cached is None or time.monotonic() - cached.timestamp >= self._seconds_freshness:
+            return None
+        return dict(cached.inputs)
+
+    def invalidate(self, ipv4: str):
+        self._storage.pop(ipv4, None)
+
+    def apply_payloads(self, ipv4: str, payloads: Sequence[Payload]):
+        """
+        Обновляет состояние ВВОДОВ после успешной отправки payloads.
+        Для ВВОДОВ, переведённых в ВКЛ/ВЫКЛ, состояние известно заранее.
+        После перевода ВВОДА в ВФ его состояние определяет контроллер,
+        поэтому данные хоста удаляются из кэша.
+        """
+        cached = self._storage.get(ipv4)
+        if cached is None:
+            return
+        for payload in payloads:
+            (_, par_name), (_, actuator_value) = payload.data
+            name = cached.names_by_index.get(par_name.removeprefix(inputs_prefix))
+            new_state = self.matches_actuator_value_to_state.get(actuator_value)
+            if name is None or new_state is None:
+                self.invalidate(ipv4)
+                return
+            props = list(cached.inputs[name])
+            props[InputsStructure.STATE], props[InputsStructure.ACTUATOR] = new_state
+            cached.inputs[name] = tuple(props)
+        cached.timestamp = time.monotonic()
+
+
+inputs_state_cache = InputsStateCache()
@@ -2,6 +2,7 @@ import asyncio
 import json
 import time
 from collections.abc import (
+    MutableMapping,
     MutableSequence,
     Sequence
 )
@@ -23,12 +24,14 @@ from sdp_lib.management_controllers.http.peek import (
     routes,
     static_data
 )
+from sdp_lib.management_controllers.http.peek.inputs_state import inputs_state_cache
 from sdp_lib.management_controllers.http.peek.varbinds import (
     InputsPayloads,
     Payload
 )
 from sdp_lib.management_controllers.parsers.parsers_peek_http import (
     MainPageParser,
+    MainPageStreamParser,
     InputsPageParser,
     PeekWebPagesParser,
     SetInputsPageParser,
@@ -49,13 +52,20 @@ class PeekWebHosts(HttpHosts):
 
     _parser_class = PeekWebPagesParser
     _ok_alert = 'alert_msg = "";'
+    stream_main_page = True
+    # Установка фазы по состоянию ВВОДОВ из inputs_state_cache без запроса страницы ВВОДОВ.
+    # Состояние, изменённое другим клиентом(например, сброс MPP_MAN), кэш не отражает, и ВВОД,
+    # считающийся включённым, не будет отправлен. Включать, только если контроллером управляет
+    # один экземпляр сервиса.
+    use_inputs_cache = False
 
     def __init__(self, ipv4: str = None, host_id = None, session: aiohttp.ClientSession = None):
         super().__init__(ipv4=ipv4, host_id=host_id, session=session)
         self._semaphore = asyncio.Semaphore(value=6)
         self._request_response_data_get_states.set_parse_method(
-            self._request_response_data_get_states.parser_obj.main_page_parser.sort
+            self._request_response_data_get_states.parser_obj.main_page_parser.parse
         )
+        self._main_page_stream_parser = MainPageStreamParser()
 
     @cached_property
     def matches(self) -> dict[DataFromWeb, tuple[str, Callable, Type[T_Parsers]]]:
@@ -73,7 +83,7 @@ class PeekWebHosts(HttpHosts):
                     protocol=self.protocol,
                     add_to_response_storage=True,
                     parser_obj=parser,
-                    parser=parser.sort,
+                    parser=parser.parse,
                     coro=method(self._base_url + route, self._semaphore)
                 )
 
@@ -81,9 +91,15 @@ class PeekWebHosts(HttpHosts):
 
     async def get_states(self, *extras: DataFromWeb):
         self._request_storage.clear()
-        self._request_response_data_get_states.load_coro(
-            self._request_sender.fetch(self._base_url + routes.main_page, self._semaphore)
-        )
+        if self.stream_main_page:
+            self._request_response_data_get_states.set_parse_method(self._main_page_stream_parser.get_parsed_data)
+            coro = self._request_sender.fetch_stream(
+                self._base_url + routes.main_page, self._semaphore, self._main_page_stream_parser
+            )
+        else:
+            self._request_response_data_get_states.set_parse_method(MainPageParser().parse)
+            coro = self._request_sender.fetch(self._base_url + routes.main_page, self._semaphore)
+        self._request_response_data_get_states.load_coro(coro)
         self._request_storage.append(self._request_response_data_get_states)
         for data_from_web in extras:
             DataFromWeb(data_from_web)
@@ -134,30 +150,81 @@ class PeekWebHosts(HttpHosts):
                 break
         return success, faults
 
+    async def _get_inputs_for_set_stage(self) -> tuple[MutableMapping | None, bool]:
+        """
+        Возвращает состояние ВВОДОВ хоста из кэша, если оно актуально,
+        иначе запрашивает страницу ВВОДОВ и обновляет кэш.
+        :return: Кортеж (состояние ВВОДОВ или None при ошибке запроса, True если данные взяты из кэша).
+        """
+        if self.use_inputs_cache:
+            inputs = inputs_state_cache.get_fresh(self._ipv4)
+            if inputs is not None:
+                return inputs, True
+
+        request_response_inputs = await self._request_sender.common_request(
+            self.build_request_response(DataFromWeb.inputs_page_get)
+        )
+        if request_response_inputs.errors:
+            self._request_response_data_default.errors += request_response_inputs.errors
+            return None, False
+        inputs = request_response_inputs.processed_pretty_data[FieldsNames.inputs]
+        inputs_state_cache.put(self._ipv4, inputs)
+        return inputs, False
+
+    async def _send_payloads_groups(self, groups_payloads: Sequence[Sequence[Payload]]) -> MutableSequence[str]:
+        """
+        Отправляет группы payloads. Payloads внутри группы независимы и отправляются конкурентно,
+        группы отправляются последовательно: следующая группа отправляется только после
+        успешной отправки предыдущей. Пустые группы пропускаются.
+        :return: Список имён payloads, отправленных с ошибкой.
+        """
+        for payloads in groups_payloads:
+            if not payloads:
+                continue
+            ok, faults = await self._make_request_and_process_response(payloads)
+            if faults:
+                inputs_state_cache.invalidate(self._ipv4)
+                return faults
+            inputs_state_cache.apply_payloads(self._ipv4, payloads)
+        return []
+
     async def set_stage(self, stage: int):
         stage = int(stage)
+        self._request_response_data_default.reset_data()
         if not 0 <= stage <= 8:
             self._request_response_data_default.load_error(str(BadValueToSet(value=stage, expected=(0, 8))))
             self._data_storage.put(self._request_response_data_default)
             return self
 
-        request_response_inputs = await self._request_sender.common_request(
-            self.build_request_response(DataFromWeb.inputs_page_get)
-        )
-        if request_response_inputs.errors:
+        inputs, from_cache = await self._get_inputs_for_set_stage()
+        if inputs is None:
+            self._data_storage.put(self._request_response_data_default)
             return self
 
-        inps_data = InputsPayloads(request_response_inputs.processed_pretty_data['inputs'])
-        success_sent, faults_sent = [], []
-        for payloads in inps_data.create_payloads(stage):
-            ok, faults = await self._make_request_and_process_response(payloads)
-            faults_sent += faults
-            if faults:
-                faults_sent += faults
-                self._request_response_data_default.load_error(f'Ошибка установки ВВОДОВ: {faults_sent}')
+        groups_payloads = InputsPayloads(inputs).create_payloads(stage)
+        if from_cache and not any(groups_payloads):
+            # По данным кэша ВВОДЫ уже в нужном состоянии. Кэш мог устареть(ВВОДЫ изменены
+            # с другого клиента), поэтому перед ответом об успехе проверяем страницу ВВОДОВ.
+            inputs_state_cache.invalidate(self._ipv4)
+            inputs, from_cache = await self._get_inputs_for_set_stage()
+            if inputs is None:
                 self._data_storage.put(self._request_response_data_default)
                 return self
-            success_sent += ok
+            groups_payloads = InputsPayloads(inputs).create_payloads(stage)
+        faults_sent = await self._send_payloads_groups(groups_payloads)
+        if faults_sent and from_cache:
+            # Состояние из кэша могло устареть: повторяем с актуальными данными страницы ВВОДОВ.
+            inputs_state_cache.invalidate(self._ipv4)
+            inputs, _ = await self._get_inputs_for_set_stage()
+            if inputs is None:
+                self._data_storage.put(self._request_response_data_default)
+                return self
+            faults_sent = await self._send_payloads_groups(InputsPayloads(inputs).create_payloads(stage))
+        if faults_sent:
+            self._request_response_data_default.load_error(f'Ошибка установки ВВОДОВ: {faults_sent}')
+            self._data_storage.put(self._request_response_data_default)
+            return self
+
         parser = SetInputsPageParser()
         request_response = RequestResponse(
             name=FieldsNames.set_stage,
@@ -166,11 +233,7 @@ class PeekWebHosts(HttpHosts):
             protocol=self.protocol,
             add_to_response_storage=True
         )
-        if not faults_sent:
-            data_to_response = {FieldsNames.set_stage: int(stage)}
-        else:
-            data_to_response = {FieldsNames.set_stage: f'Ошибка установки фазы {int(stage)}'}
-        request_response.load_raw_response(data_to_response)
+        request_response.load_raw_response({FieldsNames.set_stage: stage})
         self._data_storage.put(request_response)
         return self
 
@@ -0,0 +1,229 @@
+"""
+Симулятор веб-интерфейса ДК Peek для тестов и бенчмарков без оборудования.
+
+Отдаёт главную страницу, страницу ВВОДОВ и принимает POST установки ВВОДА
+по тем же маршрутам (routes), что использует PeekWebHosts. Хранит состояние ВВОДОВ:
+при включении MPP_MAN и одного из ВВОДОВ фаз поток переходит в ручной режим с этой фазой.
+Поддерживает задержку ответа и внедрение ошибок.
+
+Запуск: python -m sdp_lib.management_controllers.http.peek.simulator
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+
+from aiohttp import web
+
+from sdp_lib.management_controllers.http.peek import routes
+from sdp_lib.management_controllers.http.peek.static_data import Actuator
+from sdp_lib.management_controllers.http.peek.varbinds import (
+    MPP_MAN,
+    inputs_prefix,
+    key_payload,
+    mpp_stages_inputs,
+    val_payload
+)
+
+
+page_set_inputs_pattern = (
+    '<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 4.01 Frameset//EN">\n<html>\n<head>\n'
+    '<meta http-equiv="Content-Type" content="text/html; charset=UTF-8"/>\n'
+    '<SCRIPT type="text/javascript" language=\'javascript\'>\n<!--\ndatapage = "cell1020.hvi";\n\n'
+    'alert_msg = "{alert}";\n\n-->\n</SCRIPT>\n</head>\n<body onload="init()">\n</body>\n</html>\n'
+)
+page_tft_only_tail = (
+    ':BEGIN_TFT_ONLY\n<div id="nav_home">\n<br /><br />\n<ul>\n'
+    '<li><button type=button OnClick=\'top.doDataHref("cell1370.hvi",1)\'>##CELL_1370##</button></li>\n'
+    '<li><button type=button OnClick=\'top.doHref("detswico.hvi",1)\'>##T_DETSWICO##</button></li>\n'
+    '</ul>\n</div>\n:END_TFT_ONLY\n'
+)
+default_inputs_names = tuple(dict.fromkeys((
+    'MKEY1', 'MKEY2', 'MKEY3', 'MKEY4', 'MKEY5', 'KEY10', 'KEY11', 'KEY12',
+    *mpp_stages_inputs, MPP_MAN, 'MPP_FL', 'MPP_OFF', 'MPP_QPH', 'MPP_AUT',
+    'CP_OFF', 'CP_FLASH', 'CP_RED', 'CP_AUTO', 'CP_FIX', 'MIMIC'
+)))
+
+
+@dataclass(slots=True)
+class SimulatorConfig:
+    """
+    Настройки симулятора.
+    latency -> базовая задержка ответа в секундах.
+    jitter -> максимальная случайная добавка к задержке в секундах.
+    error_rate -> доля ответов со статусом 500.
+    alert_error_rate -> доля POST-ответов с сообщением об ошибке в alert_msg.
+    hang_rate -> доля запросов, ответ на которые задерживается на hang_seconds (имитация таймаута).
+    """
+    latency: float = 0.
+    jitter: float = 0.
+    error_rate: float = 0.
+    alert_error_rate: float = 0.
+    hang_rate: float = 0.
+    hang_seconds: float = 5.
+    num_streams: int = 2
+    address: str = 'Simulator: Peek'
+
+
+@dataclass(slots=True)
+class SimulatedInput:
+    index: int
+    name: str
+    state: str = '0'
+    actuator: str = Actuator.VF_as_chars
+    state_time: int = field(default_factory=lambda: int(time.monotonic()))
+
+    def as_line(self) -> str:
+        return f':D;{self.index};{self.index + 1};{self.name};{self.state};{self.state_time};{self.actuator}'
+
+
+class PeekSimulator:
+    """
+    Состояние и обработчики одного симулируемого контроллера Peek.
+    """
+
+    def __init__(self, config: SimulatorConfig = None):
+        self._config = config or SimulatorConfig()
+        self._inputs = [SimulatedInput(i, name) for i, name in enumerate(default_inputs_names)]
+        self._inputs_by_index = {str(inp.index): inp for inp in self._inputs}
+        self._inputs_by_name = {inp.name: inp for inp in self._inputs}
+        self._plan = '001'
+        self._stage_ft = 1
+        self.num_requests = 0
+        self.matches_get_routes = {
+            routes.main_page: self.main_page,
+            routes.get_inputs: self.inputs_page,
+        }
+
+    @property
+    def config(self) -> SimulatorConfig:
+        return self._config
+
+    def get_current_mode_and_stage(self) -> tuple[str, int]:
+        if self._inputs_by_name[MPP_MAN].state == '1':
+            for name, num_stage in mpp_stages_inputs.items():
+                if self._inputs_by_name[name].state == '1':
+                    return 'MAN', num_stage
+        self._stage_ft = self._stage_ft % len(mpp_stages_inputs) + 1
+        return 'FT', self._stage_ft
+
+    def create_main_page(self) -> str:
+        mode, stage = self.get_current_mode_and_stage()
+        lines = [
+            ':TITLE;##MENU_001a##',
+            f':SUBTITLE;{self._config.address}',
+            ':TFT_NAVBAR;10', ':REFRESH_LOCK;1', '', ':BEGINTABLE', ':W;;200px;', '',
+            f':D;;##T_PLAN##;{self._plan} -             ', '',
+            f':D;;##T_TIMINGSET##;{self._plan}', '',
+            f':D;;##T_TIME##;{time.strftime("%Y-%m-%d %H:%M:%S")}',
+            ':D;;##T_ALARMS##;', '', ':ENDTABLE', '',
+        ]
+        for num_stream in range(1, self._config.num_streams + 1):
+            lines += [
+                f'<b>##T_STREAM## {num_stream}</b>', ':BEGINTABLE', ':W;;200px;',
+                ':D;;##T_STATE##;УПРАВЛЕНИЕ', ':D;;##T_CYCLE##;0 (0)',
+                f':D;;##T_MODE## (##T_STAGE##);{mode} ({stage})', ':ENDTABLE', '',
+            ]
+        return '\n'.join(lines) + '\n' + page_tft_only_tail
+
+    def create_inputs_page(self) -> str:
+        return '\n'.join((
+            ':TITLE;##CELL_1020##', ':TFT_NAVBAR;3', ':TFT_EDIT;1', ':MIN;0', f':MAX;{len(self._inputs)}', '',
+            ':BEGINMAINTABLE', ':W;;40px;;100px;100px;100px',
+            ':H;;##T_ID##;##T_INPUT##;##T_STATE##;##T_TIME##;##T_SWICO##',
+            *(inp.as_line() for inp in self._inputs),
+            ':ENDMAINTABLE', ''
+        ))
+
+    def set_input(self, par_name: str, par_value: str) -> str:
+        """
+        Устанавливает значение актуатора ВВОДА.
+        :return: Текст ошибки для alert_msg или пустая строка при успешной установке.
+        """
+        inp = self._inputs_by_index.get(str(par_name).removeprefix(inputs_prefix))
+        if inp is None or par_value not in (Actuator.VF_as_value, Actuator.OFF_as_value, Actuator.ON_as_value):
+            return 'Внутренняя ошибка: Неизвестный параметр'
+        inp.actuator = Actuator.get_reverse_value(par_value)
+        inp.state = '1' if par_value == Actuator.ON_as_value else '0'
+        inp.state_time = int(time.monotonic())
+        return ''
+
+    async def _delay_and_check_errors(self) -> web.Response | None:
+        self.num_requests += 1
+        cfg = self._config
+        if cfg.hang_rate and random.random() < cfg.hang_rate:
+            await asyncio.sleep(cfg.hang_seconds)
+        elif cfg.latency or cfg.jitter:
+            await asyncio.sleep(cfg.latency + random.uniform(0, cfg.jitter))
+        if cfg.error_rate and random.random() < cfg.error_rate:
+            return web.Response(status=500, text='Internal Server Error')
+        return None
+
+    async def main_page(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.create_main_page(), charset='utf-8')
+
+    async def inputs_page(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.create_inputs_page(), charset='utf-8')
+
+    async def post_set_input(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        if self._config.alert_error_rate and random.random() < self._config.alert_error_rate:
+            alert = 'Внутренняя ошибка: Симуляция'
+        else:
+            alert = self.set_input(form.get(key_payload), form.get(val_payload))
+        return web.Response(text=page_set_inputs_pattern.format(alert=alert), content_type='text/html')
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """
+        Единый обработчик: маршруты Peek содержат query-строку, поэтому
+        сопоставление выполняется по request.path_qs.
+        """
+        error_response = await self._delay_and_check_errors()
+        if error_response is not None:
+            return error_response
+        if request.method == 'POST' and request.path_qs == routes.set_inputs:
+            return await self.post_set_input(request)
+        handler = self.matches_get_routes.get(request.path_qs)
+        if request.method == 'GET' and handler is not None:
+            return await handler(request)
+        return web.Response(status=404, text='Not Found')
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route('*', '/{tail:.*}', self.handle)
+        return app
+
+
+async def run_simulators(
+        hosts: list[tuple[str, int]],
+        config: SimulatorConfig = None
+) -> tuple[list[PeekSimulator], list[web.AppRunner]]:
+    """
+    Запускает по одному симулятору на каждую пару (ip, port).
+    Для loopback можно использовать любые адреса 127.0.0.0/8.
+    :return: Кортеж из списка симуляторов и списка web.AppRunner для последующей остановки.
+    """
+    simulators, runners = [], []
+    for ipv4, port in hosts:
+        simulator = PeekSimulator(config)
+        runner = web.AppRunner(simulator.create_app(), access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, ipv4, port).start()
+        simulators.append(simulator)
+        runners.append(runner)
+    return simulators, runners
+
+
+async def main():
+    simulators, runners = await run_simulators([('127.0.0.1', 8080)], SimulatorConfig(latency=.05, jitter=.05))
+    print('Симулятор Peek запущен: http://127.0.0.1:8080. Для остановки нажмите Ctrl-C')
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -1,4 +1,5 @@
 import asyncio
+from typing import Any
 
 import aiohttp
 
@@ -7,6 +8,7 @@ from sdp_lib.management_controllers.exceptions import (
     BadControllerType
 )
 from sdp_lib.management_controllers.hosts_core import RequestResponse
+from sdp_lib.management_controllers.http.session_manager import http_session_manager
 
 
 class AsyncHttpRequests:
@@ -14,7 +16,7 @@ class AsyncHttpRequests:
     default_timeout_get_request = .4
     default_timeout_post_request = .6
 
-    def __init__(self, session: aiohttp.ClientSession):
+    def __init__(self, session: aiohttp.ClientSession = None):
         self._session = session
         self._client_get_timeout = aiohttp.ClientTimeout(connect=self.default_timeout_get_request)
         self._client_post_timeout = aiohttp.ClientTimeout(connect=self.default_timeout_get_request)
@@ -22,6 +24,16 @@ class AsyncHttpRequests:
     def load_session(self, session: aiohttp.ClientSession):
         self._session = session
 
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        Возвращает переданную сессию или, если сессия не передана,
+        общую сессию http_session_manager с keep-alive соединениями.
+        """
+        if self._session is None:
+            return http_session_manager.session
+        return self._session
+
     async def fetch(
             self,
             url: str,
@@ -31,7 +43,7 @@ class AsyncHttpRequests:
         error = status = content = None
         try:
             async with semaphore:
-                async with self._session.get(url, timeout=timeout) as response:
+                async with self.session.get(url, timeout=timeout) as response:
                     assert response.status == 200
                     status = response.status
                     content = await response.text()
@@ -41,6 +53,39 @@ class AsyncHttpRequests:
             error = BadControllerType()
         return error, status, content
 
+    async def fetch_stream(
+            self,
+            url: str,
+            semaphore: asyncio.Semaphore,
+            stream_parser,
+            timeout: aiohttp.ClientTimeout = aiohttp.ClientTimeout(connect=.4),
+            chunk_size: int = 4096
+    ) -> tuple[str | None, int, Any]:
+        """
+        Получает контент веб страницы частями и передаёт их потоковому парсеру.
+        Если парсер сообщил, что все необходимые данные извлечены,
+        чтение прекращается и соединение закрывается, не дожидаясь конца тела ответа.
+        :param stream_parser: Парсер с методами reset(encoding), feed(chunk) -> bool и close().
+        :return: Кортеж (ошибка, статус ответа, результат stream_parser.close()).
+        """
+        error = status = content = None
+        try:
+            async with semaphore:
+                async with self.session.get(url, timeout=timeout) as response:
+                    assert response.status == 200
+                    status = response.status
+                    stream_parser.reset(response.charset or 'utf-8')
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        if stream_parser.feed(chunk):
+                            response.close()
+                            break
+                    content = stream_parser.close()
+        except asyncio.TimeoutError:
+            error = ConnectionTimeout()
+        except (AssertionError, aiohttp.client_exceptions.ClientConnectorCertificateError):
+            error = BadControllerType()
+        return error, status, content
+
     async def post_request(
             self,
             url: str,
@@ -51,7 +96,7 @@ class AsyncHttpRequests:
         error = status = content = None
         try:
             async with semaphore:
-                async with self._session.post(url, timeout=timeout, **kwargs) as response:
+                async with self.session.post(url, timeout=timeout, **kwargs) as response:
                     assert response.status == 200
                     status = response.status
                     content = await response.text()
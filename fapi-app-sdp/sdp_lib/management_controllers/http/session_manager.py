@@ -0,0 +1,90 @@
+import asyncio
+
+import aiohttp
+
+
+class HttpSessionManager:
+    """
+    Управляет общей для всех http-хостов aiohttp.ClientSession.
+
+    Коннектор настроен для большого количества встроенных веб-серверов контроллеров:
+        -- ограничение количества соединений на один хост (limit_per_host);
+        -- keep-alive соединений в течение keepalive_timeout секунд;
+        -- контроллеры адресуются ip-адресом, поэтому ответы резолвера кэшируются бессрочно,
+           а проверка ssl отключена (веб-интерфейс контроллеров работает по http).
+    Сессия создаётся лениво в работающем цикле событий и пересоздаётся,
+    если была закрыта или цикл событий сменился.
+    """
+
+    default_limit = 1024
+    default_limit_per_host = 4
+    default_keepalive_timeout = 30
+    default_timeout = aiohttp.ClientTimeout(total=5, connect=1)
+
+    def __init__(
+            self,
+            *,
+            limit: int = default_limit,
+            limit_per_host: int = default_limit_per_host,
+            keepalive_timeout: float = default_keepalive_timeout,
+            timeout: aiohttp.ClientTimeout = default_timeout
+    ):
+        if limit_per_host < 1:
+            raise ValueError('limit_per_host должен быть больше 0')
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._keepalive_timeout = keepalive_timeout
+        self._timeout = timeout
+        self._session: aiohttp.ClientSession | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def __repr__(self):
+        return (
+            f'{self.__class__.__name__}('
+            f'limit={self._limit} limit_per_host={self._limit_per_host} '
+            f'keepalive_timeout={self._keepalive_timeout} session={self._session}'
+            f')'
+        )
+
+    async def __aenter__(self):
+        return self.session
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def create_connector(self) -> aiohttp.TCPConnector:
+        return aiohttp.TCPConnector(
+            limit=self._limit,
+            limit_per_host=self._limit_per_host,
+            keepalive_timeout=self._keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=None,
+            ssl=False,
+        )
+
+    def create_session(self) -> aiohttp.ClientSession:
+        return aiohttp.ClientSession(
+            connector=self.create_connector(),
+            timeout=self._timeout,
+            connector_owner=True
+        )
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        Возвращает общую сессию. Должен вызываться из работающего цикла событий.
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = self.create_session()
+            self._loop = loop
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+
+http_session_manager = HttpSessionManager()
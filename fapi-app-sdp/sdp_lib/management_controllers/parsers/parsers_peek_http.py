@@ -1,5 +1,7 @@
+import codecs
 import json
 import pprint
+import re
 import time
 from collections.abc import MutableMapping, MutableSequence
 from dataclasses import dataclass, make_dataclass, field
@@ -251,6 +253,121 @@ class MainPageParser(Parsers):
         return self._page_data.as_dict
 
 
+class MainPageStreamParser(MainPageParser):
+    """
+    Потоковый парсер контента главной web страницы ДК Peek.
+    Принимает контент частями (например, чанками тела http-ответа) и извлекает
+    данные одним предкомпилированным шаблоном. Как только встречена строка
+    окончания полезных данных (_pattern_stop), дальнейшее чтение контента не требуется.
+    """
+
+    _pattern_stop = ':BEGIN_TFT_ONLY'
+    _pattern_main_page = re.compile(
+        r'^(?:'
+        r':SUBTITLE;(?P<address>[^\r\n]*)'
+        r'|:D;;##T_PLAN##;(?P<plan>\S*)[^\r\n]*'
+        r'|:D;;##T_TIMINGSET##;(?P<plan_param>[^\r\n]*)'
+        r'|:D;;##T_TIME##;(?P<current_time>[^\r\n]*)'
+        r'|:D;;##T_ALARMS##;(?P<alarms>[^\r\n]*)'
+        r'|<b>##T_STREAM## (?P<stream>[^<\r\n]*)</b>'
+        r'|:D;;##T_STATE##;(?P<state>[^\r\n]*)'
+        r'|:D;;##T_MODE## \(##T_STAGE##\);(?P<mode_and_stage>[^\r\n]*)'
+        rf'|(?P<stop>{_pattern_stop})'
+        r')\r?$',
+        re.MULTILINE
+    )
+
+    def __init__(self):
+        super().__init__()
+        self._decoder = None
+        self._tail = ''
+        self._is_complete = False
+        self.reset()
+
+    @property
+    def is_complete(self) -> bool:
+        return self._is_complete
+
+    def reset(self, encoding: str = 'utf-8'):
+        """
+        Подготавливает парсер к разбору новой страницы.
+        :param encoding: Кодировка контента, передаваемого в self.feed в виде bytes.
+        """
+        self._page_data = MainPageData()
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        self._tail = ''
+        self._is_complete = False
+
+    def _process_lines(self, content: str, endpos: int):
+        for matched in self._pattern_main_page.finditer(content, 0, endpos):
+            name = matched.lastgroup
+            if name == 'stop':
+                self._is_complete = True
+                return
+            value = matched.group(name)
+            if name == 'stream':
+                self._page_data.all_xp_data.append([value, None, None, None])
+            elif name == 'state':
+                if self._page_data.all_xp_data:
+                    self._page_data.all_xp_data[-1][1] = value
+            elif name == 'mode_and_stage':
+                if self._page_data.all_xp_data:
+                    try:
+                        mode, stage = value.split()
+                        self._page_data.all_xp_data[-1][2:] = mode, stage.replace('(', '').replace(')', '')
+                    except ValueError:
+                        pass
+            elif name == 'plan':
+                self._page_data.plan = value or None
+            else:
+                setattr(self._page_data, name, value)
+
+    def feed(self, chunk: bytes | str) -> bool:
+        """
+        Обрабатывает очередную часть контента. Разбираются только полные строки,
+        неполная последняя строка сохраняется до следующего вызова.
+        :param chunk: Часть контента страницы.
+        :return: True, если все необходимые данные извлечены и чтение можно прекратить, иначе False.
+        """
+        if self._is_complete:
+            return True
+        if isinstance(chunk, bytes):
+            chunk = self._decoder.decode(chunk)
+        content = self._tail + chunk
+        end_last_line = content.rfind('\n')
+        if end_last_line == -1:
+            self._tail = content
+            return False
+        self._tail = content[end_last_line + 1:]
+        self._process_lines(content, end_last_line)
+        return self._is_complete
+
+    def close(self) -> dict[str, Any]:
+        """
+        Разбирает оставшийся контент и возвращает извлечённые данные.
+        :return: Словарь с данными главной страницы, аналогичный MainPageParser.parse.
+        """
+        if not self._is_complete:
+            content = self._tail + self._decoder.decode(b'', final=True)
+            self._process_lines(content, len(content))
+            self._is_complete = True
+        self._tail = ''
+        return self._page_data.as_dict
+
+    def get_parsed_data(self, *args) -> dict[str, Any]:
+        return self._page_data.as_dict
+
+    def parse(self, content: str):
+        """
+        Парсит весь контент главной web страницы ДК Peek за один вызов.
+        :param content: Контент страницы.
+        :return: Словарь с данными главной страницы.
+        """
+        self.reset()
+        self.feed(content)
+        return self.close()
+
+
 input_data: TypeAlias = tuple[str, str, str, str, str, str]
 
 
@@ -319,6 +436,11 @@ if __name__ == '__main__':
 
     # print(o)
     print(json.dumps(p.main_page_parser.parse(s), indent=4, ensure_ascii=False))
+    stream_parser = MainPageStreamParser()
+    for i in range(0, len(s), 64):
+        if stream_parser.feed(s[i: i + 64]):
+            break
+    assert stream_parser.close() == MainPageParser().parse(s)
 
     print(f'Время составило: {time.perf_counter() - start_time:.8f}')
 
@@ -0,0 +1,16 @@
+from typing import Any
+
+from sdp_lib.management_controllers.parsers.parser_core import Parsers
+
+
+class SwarcoSshParser(Parsers):
+    """
+    Парсер данных сеанса интерактивной оболочки ДК Swarco.
+    Данные сеанса обрабатываются при отправке команд (swarco_terminal.process_terminal_stdout),
+    поэтому парсер формирует словарь для response из уже обработанных данных.
+    """
+
+    def parse(self, content: Any) -> dict[str, Any]:
+        if isinstance(content, dict):
+            return content
+        return {'stdout': content}
@@ -0,0 +1,183 @@
+"""
+Текущее состояние дорожных контроллеров, полученное из snmp-trap.
+
+TrapReceiver (trap_server/runserver.py или lifespan приложения) и процессы, опрашивающие
+контроллеры (snmp_core), работают в разных процессах. Поэтому состояние хранится
+в общем каталоге: для каждого контроллера файл <ip>.json, который перезаписывается
+атомарно при каждом trap. Каталог задаётся переменной окружения live_state_dir,
+по умолчанию - sdp_live_state во временном каталоге системы.
+"""
+
+import ipaddress
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from sdp_lib.management_controllers.fields_names import FieldsNames
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIVE_STATE_DIR = Path(tempfile.gettempdir()) / 'sdp_live_state'
+
+
+@dataclass(slots=True)
+class LiveState:
+    """
+    Текущее состояние дорожного контроллера, полученное из snmp-trap.
+    last_seen -> значение time.time() в момент последнего trap от контроллера.
+    """
+    ipv4: str
+    num_stage: int
+    val_stage: str
+    time_ticks: int
+    last_seen: float
+
+    def get_response_data(self, host_protocol: str) -> dict[str, Any]:
+        """
+        Формирует данные для ответа в формате, аналогичном ответу на snmp-запрос фазы.
+        :param host_protocol: Протокол хоста(stcip, ug405).
+        :return: Словарь с протоколом и номером текущей фазы.
+        """
+        return {str(FieldsNames.protocol): host_protocol, str(FieldsNames.curr_stage): self.num_stage}
+
+
+class LiveStateCache:
+    """
+    Кэш текущих состояний контроллеров, которые отправляют snmp-trap
+    о смене фазы в TrapReceiver. Обновляется обработчиками trap,
+    используется хостами snmp_core для ответа без опроса контроллера.
+    Если задан directory, состояния хранятся в файлах каталога и доступны
+    всем процессам, иначе - только в памяти текущего процесса.
+    """
+
+    def __init__(self, seconds_freshness: float = 60, directory: str | os.PathLike | None = None):
+        self._states: dict[str, LiveState] = {}
+        self._seconds_freshness: float = float(seconds_freshness)
+        self._directory = Path(directory) if directory is not None else None
+
+    def __repr__(self):
+        return (
+            f'{self.__class__.__name__}('
+            f'seconds_freshness={self._seconds_freshness} directory={self._directory} states={self._states}'
+            f')'
+        )
+
+    def __contains__(self, ipv4: str):
+        return self.get(ipv4) is not None
+
+    def __len__(self):
+        if self._directory is None:
+            return len(self._states)
+        return sum(1 for _ in self._directory.glob('*.json'))
+
+    @property
+    def directory(self) -> Path | None:
+        return self._directory
+
+    def set_freshness_time_in_seconds(self, seconds: float):
+        self._seconds_freshness = float(seconds)
+
+    def get_seconds_freshness(self) -> float:
+        return self._seconds_freshness
+
+    def _get_path(self, ipv4: str) -> Path:
+        return self._directory / f'{ipaddress.IPv4Address(ipv4)}.json'
+
+    def _save(self, state: LiveState):
+        if self._directory is None:
+            return
+        try:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            path = self._get_path(state.ipv4)
+            tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+            tmp_path.write_text(json.dumps(asdict(state)), encoding='utf-8')
+            os.replace(tmp_path, path)
+        except (OSError, ValueError) as exc:
+            logger.warning(f'Ошибка сохранения состояния контроллера {state.ipv4}: {exc}')
+
+    def _load(self, ipv4: str) -> LiveState | None:
+        try:
+            return LiveState(**json.loads(self._get_path(ipv4).read_bytes()))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def update(
+            self,
+            ipv4: str,
+            *,
+            num_stage: int,
+            val_stage: str,
+            time_ticks: int
+    ) -> LiveState:
+        """
+        Обновляет состояние контроллера данными из trap о смене фазы.
+        :param ipv4: ip-адрес контроллера.
+        :param num_stage: Номер фазы в десятичном представлении.
+        :param val_stage: Значение оида фазы.
+        :param time_ticks: Значение sysUpTime из trap.
+        :return: Обновлённый экземпляр LiveState.
+        """
+        state = self._states.get(ipv4)
+        if state is None:
+            state = self._states[ipv4] = LiveState(ipv4, num_stage, val_stage, time_ticks, time.time())
+        else:
+            state.num_stage = num_stage
+            state.val_stage = val_stage
+            state.time_ticks = time_ticks
+            state.last_seen = time.time()
+        self._save(state)
+        return state
+
+    def touch(self, ipv4: str) -> None:
+        """
+        Обновляет время последнего trap от контроллера без изменения фазы.
+        Если состояние контроллера ещё не известно, ничего не делает.
+        """
+        state = self.get(ipv4)
+        if state is not None:
+            state.last_seen = time.time()
+            self._save(state)
+
+    def get(self, ipv4: str) -> LiveState | None:
+        if self._directory is None:
+            return self._states.get(ipv4)
+        state = self._load(ipv4)
+        if state is None:
+            self._states.pop(ipv4, None)
+        else:
+            self._states[ipv4] = state
+        return state
+
+    def check_is_fresh(self, state: LiveState) -> bool:
+        return time.time() - state.last_seen < self._seconds_freshness
+
+    def get_fresh(self, ipv4: str) -> LiveState | None:
+        """
+        Возвращает состояние контроллера, если оно не старше self._seconds_freshness секунд.
+        :param ipv4: ip-адрес контроллера.
+        :return: Экземпляр LiveState или None, если состояние отсутствует или устарело.
+        """
+        state = self.get(ipv4)
+        if state is None or not self.check_is_fresh(state):
+            return None
+        return state
+
+    def remove(self, ipv4: str) -> None:
+        self._states.pop(ipv4, None)
+        if self._directory is not None:
+            self._get_path(ipv4).unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        self._states.clear()
+        if self._directory is not None and self._directory.exists():
+            for path in self._directory.glob('*.json'):
+                path.unlink(missing_ok=True)
+
+
+live_state_cache = LiveStateCache(directory=os.getenv('live_state_dir') or DEFAULT_LIVE_STATE_DIR)
@@ -8,6 +8,7 @@ from collections import deque
 from dataclasses import dataclass
 from functools import cached_property
 from typing import (
+    Any,
     Self,
     Type
 )
@@ -51,6 +52,11 @@ from sdp_lib.management_controllers.snmp.snmp_utils import (
     VarbPotokP,
     VarbPeek, ScnUg405, convert_ascii_string_to_chars
 )
+from sdp_lib.management_controllers.snmp.live_state import (
+    LiveState,
+    LiveStateCache,
+    live_state_cache
+)
 from sdp_lib.management_controllers.snmp.snmp_requests import (
     AsyncSnmpRequests,
     snmp_engine,
@@ -144,6 +150,7 @@ class SnmpHost(Host):
         self._request_response_data_default.set_parse_method(
             self._request_response_data_default.parser_obj
         )
+        self._live_state_cache: LiveStateCache | None = live_state_cache
 
     @cached_property
     @abc.abstractmethod
@@ -159,6 +166,35 @@ class SnmpHost(Host):
     def request_sender(self) -> AsyncSnmpRequests:
         return self._request_sender
 
+    def set_live_state_cache(self, cache: LiveStateCache | None):
+        """
+        Устанавливает кэш состояний, обновляемый из snmp-trap.
+        :param cache: Экземпляр LiveStateCache или None, чтобы всегда опрашивать контроллер.
+        """
+        self._live_state_cache = cache
+
+    def _load_current_stage_from_live_state(self, host_protocol: str) -> bool:
+        """
+        Если в кэше состояний есть актуальные данные о фазе контроллера,
+        помещает их в self._data_storage вместо snmp-запроса.
+        :param host_protocol: Протокол хоста(stcip, ug405) для ответа в формате snmp-запроса фазы.
+        :return: True, если ответ сформирован из кэша, иначе False.
+        """
+        if self._live_state_cache is None:
+            return False
+        state = self._live_state_cache.get_fresh(self._ipv4)
+        if state is None:
+            return False
+        request_response = RequestResponse(
+            protocol=self.protocol,
+            name='live_state',
+            add_to_response_storage=True,
+            parser=functools.partial(LiveState.get_response_data, host_protocol=host_protocol)
+        )
+        request_response.load_raw_response(state)
+        self._data_storage.put(request_response)
+        return True
+
     async def _make_request(self, request_response: RequestResponse) -> Self:
         """
         Осуществляет вызов соответствующего snmp-запроса и передает
@@ -212,6 +248,12 @@ class Ug405Hosts(SnmpHost):
         self._request_response_data_default.set_parse_method(
             self._request_response_data_default.parser_obj
         )
+        self._request_response_data_current_stage = RequestResponse(
+            protocol=self.protocol,
+            name='get_current_stage',
+            add_to_response_storage=True,
+            parser=self._parse_current_stage
+        )
 
 
     @cached_property
@@ -378,6 +420,37 @@ class Ug405Hosts(SnmpHost):
         )
         return await self._make_request(self._request_response_data_get_states)
 
+    def _parse_current_stage(self, varbinds) -> dict[str, Any]:
+        """
+        Формирует номер текущей фазы из ответа на snmp-get оида utcReplyGn.
+        Формат совпадает с ответом из кэша состояний (LiveState.get_response_data).
+        """
+        return {
+            str(FieldsNames.protocol): FieldsNames.protocol_ug405,
+            str(FieldsNames.curr_stage): self._varbinds.get_num_stage_from_oid_val(pretty_print(varbinds[0][1]))
+        }
+
+    async def get_current_stage(self) -> Self:
+        """
+        Формирует номер текущей фазы из кэша состояний, обновляемого snmp-trap.
+        Если данные в кэше отсутствуют или устарели, запрашивает у контроллера только оид фазы.
+        В обоих случаях данные ответа: protocol и curr_stage.
+        :return: Self.
+        """
+        if self._load_current_stage_from_live_state(FieldsNames.protocol_ug405):
+            return self
+        self._request_response_data_current_stage.reset_data()
+        self._request_response_data_current_stage = await self.collect_dependencies_and_load_errors_if_has(
+            self._request_response_data_current_stage
+        )
+        if self._request_response_data_current_stage.errors:
+            self._data_storage.put(self._request_response_data_current_stage)
+            return self
+        self._request_response_data_current_stage.load_coro(
+            self._request_sender.snmp_get(self._varbinds.get_stage_varbinds(self._scn.scn_as_ascii))
+        )
+        return await self._make_request(self._request_response_data_current_stage)
+
     async def set_stage(self, value: int) -> Self:
         """
         Отравляет snmp-set запрос на установку фазы дорожного контроллера.
@@ -442,6 +515,8 @@ class StcipHosts(SnmpHost):
         return await self._make_request(self._request_response_data_default)
 
     async def get_current_stage(self):
+        if self._load_current_stage_from_live_state(FieldsNames.protocol_stcip):
+            return self
         self._request_response_data_default.reset_data()
         self._request_response_data_default.load_coro(
             self._request_sender.snmp_get(self._varbinds.get_stage_varbinds)
@@ -423,6 +423,9 @@ class CommonVarbindsUg405(StageConverterMixinUg405):
                 scn_as_ascii, self.states_oids, True
             )
 
+    def get_stage_varbinds(self, scn_as_ascii: str) -> T_Varbinds:
+        return add_scn_to_oids(scn_as_ascii, (Oids.utcReplyGn, ), True)
+
     def get_varbinds_set_stage(
             self,
             scn_as_ascii: str,
@@ -0,0 +1,191 @@
+import asyncio
+import collections
+import logging
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Any
+
+
+logger = logging.getLogger('server_ntfc')
+
+
+class EventTypes(StrEnum):
+    """
+    Типы сообщений, рассылаемых подписчикам.
+    """
+    trap = 'trap'
+    stage = 'stage'
+    cycle = 'cycle'
+
+
+@dataclass(frozen=True, slots=True)
+class TrapMessage:
+    """
+    Сообщение для рассылки подписчикам.
+    oids -> множество оидов, содержащихся в trap, по которому выполняется фильтрация.
+    """
+    event_type: EventTypes
+    source: str
+    timestamp: float
+    oids: frozenset[str]
+    data: dict[str, Any]
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            'event_type': str(self.event_type),
+            'source': self.source,
+            'timestamp': self.timestamp,
+            'data': self.data
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class SubscriberFilter:
+    """
+    Фильтр сообщений подписчика. Пустое поле означает отсутствие фильтрации по нему.
+    """
+    sources: frozenset[str] = frozenset()
+    oids: frozenset[str] = frozenset()
+    event_types: frozenset[EventTypes] = frozenset()
+
+    @classmethod
+    def create(
+            cls,
+            sources: Iterable[str] | None = None,
+            oids: Iterable[str] | None = None,
+            event_types: Iterable[str] | None = None
+    ):
+        """
+        Создаёт фильтр из параметров запроса.
+        :raise ValueError: Если передан недопустимый тип события.
+        """
+        return cls(
+            sources=frozenset(sources or ()),
+            oids=frozenset(oids or ()),
+            event_types=frozenset(EventTypes(e) for e in (event_types or ()))
+        )
+
+    def match(self, message: TrapMessage) -> bool:
+        if self.event_types and message.event_type not in self.event_types:
+            return False
+        if self.sources and message.source not in self.sources:
+            return False
+        if self.oids and self.oids.isdisjoint(message.oids):
+            return False
+        return True
+
+
+class Subscriber:
+    """
+    Подписчик на рассылку trap и событий.
+    Сообщения хранятся в очереди ограниченного размера: при переполнении
+    самое старое сообщение отбрасывается, поэтому медленный клиент
+    не блокирует приём trap.
+    """
+
+    def __init__(
+            self,
+            subscriber_filter: SubscriberFilter,
+            maxsize: int = 256,
+            loop: asyncio.AbstractEventLoop = None
+    ):
+        if not 0 < maxsize <= 65536:
+            raise ValueError('Размер очереди должен быть в диапазоне от 1 до 65536')
+        self._filter = subscriber_filter
+        self._queue: collections.deque[TrapMessage] = collections.deque(maxlen=maxsize)
+        self._has_messages = asyncio.Event()
+        self._loop = loop or asyncio.get_running_loop()
+        self._dropped = 0
+
+    def __repr__(self):
+        return (
+            f'{self.__class__.__name__}('
+            f'filter={self._filter} queued={len(self._queue)} dropped={self._dropped}'
+            f')'
+        )
+
+    @property
+    def filter(self) -> SubscriberFilter:
+        return self._filter
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    def _put(self, message: TrapMessage):
+        if len(self._queue) == self._queue.maxlen:
+            self._dropped += 1
+        self._queue.append(message)
+        self._has_messages.set()
+
+    def put_nowait(self, message: TrapMessage):
+        """
+        Помещает сообщение в очередь. Может вызываться из любого потока.
+        """
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            self._put(message)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._put, message)
+
+    async def get(self) -> TrapMessage:
+        while not self._queue:
+            self._has_messages.clear()
+            await self._has_messages.wait()
+        return self._queue.popleft()
+
+
+class TrapBroadcaster:
+    """
+    Рассылает декодированные trap и события StageEvents/Cycles подписчикам.
+    Фильтрация выполняется на стороне сервера до помещения сообщения в очередь подписчика.
+    """
+
+    def __init__(self, max_subscribers: int = 64):
+        self._subscribers: set[Subscriber] = set()
+        self._max_subscribers = max_subscribers
+
+    @property
+    def num_subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, subscriber_filter: SubscriberFilter, maxsize: int = 256) -> Subscriber:
+        if len(self._subscribers) >= self._max_subscribers:
+            raise OverflowError(f'Превышено максимальное количество подписчиков: {self._max_subscribers}')
+        subscriber = Subscriber(subscriber_filter, maxsize)
+        self._subscribers.add(subscriber)
+        logger.info(f'Добавлен подписчик: {subscriber}')
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+        logger.info(f'Удалён подписчик: {subscriber}')
+
+    def publish(
+            self,
+            event_type: EventTypes,
+            source: str,
+            data: dict[str, Any],
+            oids: Iterable[str] = ()
+    ) -> int:
+        """
+        Рассылает сообщение подписчикам, фильтр которых ему соответствует.
+        :return: Количество подписчиков, получивших сообщение.
+        """
+        if not self._subscribers:
+            return 0
+        message = TrapMessage(event_type, source, time.time(), frozenset(oids), data)
+        cnt = 0
+        for subscriber in tuple(self._subscribers):
+            if subscriber.filter.match(message):
+                subscriber.put_nowait(message)
+                cnt += 1
+        return cnt
+
+
+trap_broadcaster = TrapBroadcaster()
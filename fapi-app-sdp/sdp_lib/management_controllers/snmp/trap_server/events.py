@@ -41,6 +41,13 @@ class BaseEvent:
     def varbinds(self):
         return self._varbinds
 
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            'source': self._source,
+            'time_ticks': self._time_ticks,
+            'varbinds': self._varbinds
+        }
+
     def _get_time_ticks(self):
         try:
             return int(self._varbinds[oids.Oids.time_ticks])
@@ -106,6 +113,13 @@ class StageEvents(BaseEvent):
             f'time_ticks={self._time_ticks}'
         )
 
+    def as_dict(self) -> dict[str, Any]:
+        return super().as_dict() | {
+            'num_stage': self._num_stage,
+            'val_stage': self._val_stage,
+            'is_restart_cycle_stage_point': bool(self._is_restart_cycle_stage_point)
+        }
+
     @property
     def prev_event(self):
         return self._prev_event
@@ -169,6 +183,14 @@ class Cycles:
     def get_stage_sequence(self):
         return "->".join(str(stg.num_stage) for stg in self)
 
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            'source': self._cyc_stages[0].source,
+            'cycle_time': self.get_cyc_time(),
+            'stage_sequence': [stg.num_stage for stg in self],
+            'stages': [stg.as_dict() for stg in self]
+        }
+
     def get_stages_data_for_log_as_string(self):
         data = ''
         for i, event in enumerate(self[1:]):
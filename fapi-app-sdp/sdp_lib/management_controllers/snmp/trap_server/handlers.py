@@ -17,7 +17,15 @@ from sdp_lib.management_controllers.snmp import (
     oids,
     snmp_utils
 )
+from sdp_lib.management_controllers.snmp.live_state import (
+    LiveStateCache,
+    live_state_cache
+)
 from sdp_lib.management_controllers.snmp.snmp_utils import parse_varbinds_to_dict
+from sdp_lib.management_controllers.snmp.trap_server.broadcaster import (
+    EventTypes,
+    trap_broadcaster
+)
 from sdp_lib.management_controllers.snmp.trap_server.configparser import (
     CycleConfig,
     ConfigParser
@@ -176,6 +184,7 @@ class CycleAndStagesHandler(AbstractHandler):
             type_controller: AllowedControllers,
             reset_cyc_num_stage=1,
             prom_tacts: MutableMapping[int | str, float] = None,
+            state_cache: LiveStateCache | None = live_state_cache
     ):
         super().__init__(type_controller, name_source)
         self._current_cycle_stage_events = deque(maxlen=128)
@@ -184,6 +193,7 @@ class CycleAndStagesHandler(AbstractHandler):
         self._reset_cyc_num_stage = reset_cyc_num_stage
         self._prom_tacts = prom_tacts or {}
         self._stages_times = {}
+        self._state_cache = state_cache
 
     def _get_controller_instance_stage_oid(self):
         if self._type_controller in (AllowedControllers.POTOK_S, AllowedControllers.SWARCO):
@@ -203,7 +213,7 @@ class CycleAndStagesHandler(AbstractHandler):
             return snmp_utils.StageConverterMixinUg405.get_num_stage_from_oid_val
         elif self._type_controller == AllowedControllers.POTOK_S:
             return snmp_utils.StageConverterMixinPotokS.get_num_stage_from_oid_val
-        elif self._type_controller == AllowedControllers.POTOK_S:
+        elif self._type_controller == AllowedControllers.SWARCO:
             return snmp_utils.StageConverterMixinSwarco.get_num_stage_from_oid_val
         raise ValueError(f'Недопустимый тип контроллера: {self._type_controller}')
 
@@ -228,12 +238,26 @@ class CycleAndStagesHandler(AbstractHandler):
         self._current_cycle_stage_events.append(self._current_event)
         verbose_trap_logger.info(self._current_event.create_log_message())
 
+        if self._state_cache is not None:
+            self._state_cache.update(
+                self._name_source,
+                num_stage=num_stage,
+                val_stage=stage_oid_val,
+                time_ticks=self._current_event.time_ticks
+            )
+        trap_broadcaster.publish(
+            EventTypes.stage, self._name_source, self._current_event.as_dict(), self._processed_varbinds.keys()
+        )
+
         if self._current_event.is_restart_cycle_stage_point:
             cyc = Cycles(self._current_cycle_stage_events)
             self._events_storage.append(cyc)
             self._current_cycle_stage_events.clear()
             self._current_cycle_stage_events.append(self._current_event)
             verbose_trap_logger.info(cyc.create_log_message(f'Общее количество циклов: {self.num_events}\n'))
+            trap_broadcaster.publish(
+                EventTypes.cycle, self._name_source, cyc.as_dict(), self._processed_varbinds.keys()
+            )
         return
 
 
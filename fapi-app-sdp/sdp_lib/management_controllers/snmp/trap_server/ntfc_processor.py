@@ -3,8 +3,15 @@ import pickle
 import time
 import logging
 
+from sdp_lib.management_controllers.snmp.live_state import live_state_cache
 from sdp_lib.management_controllers.snmp.snmp_utils import parse_varbinds_to_dict
+from sdp_lib.management_controllers.snmp.trap_server.broadcaster import (
+    EventTypes,
+    trap_broadcaster
+)
+from sdp_lib.management_controllers.snmp.trap_server.configparser import ConfigParser
 from sdp_lib.management_controllers.snmp.trap_server.handlers import HandlersManagement
+from sdp_lib.management_controllers.snmp.trap_server.server import TrapReceiver
 from sdp_lib.management_controllers.structures import TrapTransport
 from sdp_lib import logging_config
 
@@ -14,6 +21,7 @@ verbose_trap_logger = logging.getLogger('trap_verbose')
 
 
 handlers = HandlersManagement()
+logger = logging.getLogger('server_ntfc')
 
 
 def callback_func(snmp_engine, stateReference, contextEngineId, contextName, varBinds, cbCtx):
@@ -31,11 +39,32 @@ def callback_func(snmp_engine, stateReference, contextEngineId, contextName, var
         varbinds_as_str = " | ".join(f'{oid}={val}' for oid, val in parsed_varbinds.items())
         all_trap_logger.info( f'Source: {source}\nVarbinds: {varbinds_as_str}')
 
+    live_state_cache.touch(source)
+    trap_broadcaster.publish(EventTypes.trap, source, {'varbinds': parsed_varbinds}, parsed_varbinds.keys())
     curr_source_handlers = handlers.get_handlers(source)
     for handler in curr_source_handlers:
         handler(parsed_varbinds, int(time.time()))
 
 
+def create_trap_receiver(config: ConfigParser) -> TrapReceiver:
+    """
+    Загружает конфигурацию в обработчики, регистрирует обработчики циклов и фаз
+    и создаёт TrapReceiver с callback_func.
+    :param config: Экземпляр ConfigParser с конфигурацией сервера.
+    :return: Экземпляр TrapReceiver.
+    """
+    handlers.load_server_config(config)
+    if config.has_cycles:
+        logger.info('Регистрирую обработчики циклов и фаз')
+        handlers.register_cycles(config.cycles)
+        logger.info(f'Зарегистрированные обработчики циклов и фаз: {config.cycles}')
+    return TrapReceiver(
+        net_interfaces=config.net_interfaces,
+        community_data=config.community,
+        cb_func=callback_func
+    )
+
+
 if __name__ == '__main__':
 
     with open('vb.pkl' , 'rb') as f:
@@ -75,6 +75,15 @@ class TrapReceiver:
         logger.info(f'Регистрирую сервер и коллбэк функцию для trap сообщения...')
         self._register_receiver_and_callback()
 
+    def start(self):
+        """
+        Запускает приём trap в работающем цикле событий без блокировки,
+        например в lifespan приложения. Остановка - self.shutdown().
+        """
+        self._setup()
+        self._snmp_engine.transport_dispatcher.job_started(1)
+        logger.info(f'Сервер запущен в текущем цикле событий.')
+
     def run(self):
         self._setup()
         self._snmp_engine.transport_dispatcher.job_started(1)
@@ -0,0 +1,107 @@
+"""
+Бенчмарк ssh-управления Swarco ITC на симуляторе оболочки ITC.
+
+Сравнивает установку фазы SwarcoSSH.set_stage с новым ssh-соединением на каждый вызов
+и через пул ssh-сеансов, а также измеряет обход всех контроллеров SwarcoFanOutExecutor.
+
+Запуск: python -m sdp_lib.management_controllers.ssh.benchmark_ssh
+"""
+
+import asyncio
+import functools
+import random
+import statistics
+import time
+
+from sdp_lib.management_controllers.ssh.fan_out import SwarcoFanOutExecutor
+from sdp_lib.management_controllers.ssh.session_pool import SshSessionPool
+from sdp_lib.management_controllers.ssh.simulator import (
+    SwarcoSimulatorConfig,
+    run_simulators
+)
+from sdp_lib.management_controllers.ssh.ssh_core import (
+    SwarcoItcUserConnectionsSSH,
+    SwarcoSSH
+)
+from sdp_lib.management_controllers.ssh.swarco_terminal import instat102_and_display
+
+
+SIMULATOR_PORT = 18022
+
+
+def format_latencies(name: str, latencies: list[float], errors: int) -> str:
+    ms = sorted(lat * 1000 for lat in latencies)
+    percentiles = statistics.quantiles(ms, n=100, method='inclusive')
+    return (
+        f'{name}: вызовов={len(ms)} ошибок={errors} | '
+        f'мс: min={ms[0]:.1f} p50={percentiles[49]:.1f} p90={percentiles[89]:.1f} max={ms[-1]:.1f}'
+    )
+
+
+async def set_stage_new_connection(ip: str, stage: int) -> SwarcoSSH:
+    driver = SwarcoItcUserConnectionsSSH(ip, port=SIMULATOR_PORT)
+    host = SwarcoSSH(ip, driver=driver)
+    try:
+        return await host.set_stage(stage)
+    finally:
+        await driver.close()
+
+
+async def run_set_stage(name: str, ips: list[str], num_calls: int, set_stage) -> str:
+    """
+    Выполняет num_calls установок фазы, вызовы к одному контроллеру выполняются последовательно.
+    """
+    latencies, errors = [], 0
+    locks = {ip: asyncio.Lock() for ip in ips}
+
+    async def call(ip: str):
+        nonlocal errors
+        async with locks[ip]:
+            start_time = time.perf_counter()
+            host = await set_stage(ip, random.randint(1, 8))
+            latencies.append(time.perf_counter() - start_time)
+            if host.build_response_as_dict()['errors']:
+                errors += 1
+
+    await asyncio.gather(*(call(ips[i % len(ips)]) for i in range(num_calls)))
+    return format_latencies(name, latencies, errors)
+
+
+async def main(
+        num_hosts: int = 20,
+        num_calls: int = 200,
+        config: SwarcoSimulatorConfig = SwarcoSimulatorConfig(command_delay=.005, jitter=.005)
+):
+    ips = [f'127.0.{i // 250}.{i % 250 + 1}' for i in range(num_hosts)]
+    simulators = await run_simulators([(ip, SIMULATOR_PORT) for ip in ips], config)
+    pool = SshSessionPool(
+        connection_factory=functools.partial(SwarcoItcUserConnectionsSSH, port=SIMULATOR_PORT)
+    )
+    try:
+        print(await run_set_stage('set_stage, новое соединение', ips, num_calls, set_stage_new_connection))
+        print(await run_set_stage(
+            'set_stage, пул сеансов', ips, num_calls,
+            lambda ip, stage: SwarcoSSH(ip, sessions_pool=pool).set_stage(stage)
+        ))
+        executor = SwarcoFanOutExecutor(
+            max_concurrency=num_hosts,
+            connection_factory=functools.partial(SwarcoItcUserConnectionsSSH, port=SIMULATOR_PORT)
+        )
+        start_time = time.perf_counter()
+        results = await executor.run_all(ips, instat102_and_display)
+        print(
+            f'Обход {len(results)} контроллеров: {time.perf_counter() - start_time:.2f} сек, '
+            f'ошибок: {sum(1 for result in results if result.error)}, '
+            f'среднее время этапов, мс: '
+            f'connect={statistics.fmean(r.timings.connect or 0 for r in results) * 1000:.1f} '
+            f'login={statistics.fmean(r.timings.login or 0 for r in results) * 1000:.1f} '
+            f'command={statistics.fmean(r.timings.command or 0 for r in results) * 1000:.1f}'
+        )
+    finally:
+        await pool.close_all()
+        for simulator in simulators:
+            await simulator.stop()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
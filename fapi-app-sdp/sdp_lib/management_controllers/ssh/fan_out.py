@@ -0,0 +1,197 @@
+"""
+Параллельное выполнение сценария команд оболочки ITC на множестве контроллеров Swarco.
+
+Каждый контроллер обрабатывается в отдельном сеансе: подключение, вход уровня 2
+и конвейерная отправка команд. Количество одновременно обрабатываемых контроллеров
+ограничено max_concurrency. Результаты отдаются по мере готовности, для каждого
+контроллера фиксируется время этапов: подключение, вход, выполнение команд.
+
+Пример:
+    executor = SwarcoFanOutExecutor(max_concurrency=100)
+    async for result in executor.run(ips, instat102_and_display):
+        print(result.as_dict())
+"""
+
+import asyncio
+import time
+from collections.abc import (
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Sequence
+)
+from dataclasses import dataclass, field
+from typing import Any
+
+from sdp_lib.management_controllers.ssh.ssh_core import SwarcoItcUserConnectionsSSH
+from sdp_lib.management_controllers.ssh.swarco_terminal import (
+    instat102_and_display,
+    process_terminal_stdout
+)
+
+
+TerminalScript = Sequence[str | tuple[str, Any]]
+
+
+@dataclass(slots=True)
+class PhaseTimings:
+    """
+    Время этапов обработки контроллера в секундах. None - этап не выполнялся.
+    """
+    connect: float | None = None
+    login: float | None = None
+    command: float | None = None
+
+    @property
+    def total(self) -> float:
+        return sum(t for t in (self.connect, self.login, self.command) if t is not None)
+
+
+@dataclass(slots=True)
+class HostResult:
+    """
+    Результат выполнения сценария команд на одном контроллере.
+    states -> обработанный process_terminal_stdout вывод команд, ключ - имя поля.
+    raw_stdout -> список пар (команда, stdout).
+    """
+    ip: str
+    states: dict[str, Any] = field(default_factory=dict)
+    raw_stdout: list[tuple[str, str]] = field(default_factory=list)
+    error: str | None = None
+    timings: PhaseTimings = field(default_factory=PhaseTimings)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            'ip': self.ip,
+            'error': self.error,
+            'states': self.states,
+            'timings': {
+                'connect': self.timings.connect,
+                'login': self.timings.login,
+                'command': self.timings.command,
+                'total': self.timings.total
+            }
+        }
+
+
+def get_commands_from_script(script: TerminalScript) -> list[str]:
+    """
+    Возвращает список команд сценария. Элемент сценария - команда или
+    кортеж (команда, данные обработки), как в instat102_and_display.
+    """
+    return [item if isinstance(item, str) else item[0] for item in script]
+
+
+class SwarcoFanOutExecutor:
+    """
+    Выполняет сценарий команд оболочки ITC на списке контроллеров Swarco
+    с ограничением количества одновременных сеансов.
+        -- max_concurrency: максимальное количество одновременно обрабатываемых контроллеров;
+        -- login_l2: выполнять ли вход уровня 2 перед отправкой команд;
+        -- command_timeout: максимальное время ожидания вывода всех команд сценария;
+        -- host_timeout: максимальное время обработки одного контроллера;
+        -- connection_factory: вызываемый объект, создающий сеанс по ip-адресу.
+    """
+
+    def __init__(
+            self,
+            *,
+            max_concurrency: int = 50,
+            login_l2: bool = True,
+            command_timeout: float = 10,
+            host_timeout: float = 60,
+            connection_factory: Callable[[str], SwarcoItcUserConnectionsSSH] = SwarcoItcUserConnectionsSSH
+    ):
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency должен быть больше 0')
+        self._max_concurrency = max_concurrency
+        self._login_l2 = login_l2
+        self._command_timeout = command_timeout
+        self._host_timeout = host_timeout
+        self._connection_factory = connection_factory
+
+    async def _execute_script(
+            self,
+            session: SwarcoItcUserConnectionsSSH,
+            commands: list[str],
+            result: HostResult
+    ):
+        start_time = time.perf_counter()
+        if not await session.check_connection_and_interactive_session():
+            result.error = str(session.get_err_from_stack_or_none() or 'SSH connection failed')
+            return
+        result.timings.connect = time.perf_counter() - start_time
+
+        if self._login_l2:
+            start_time = time.perf_counter()
+            success_login = await session.login_l2()
+            result.timings.login = time.perf_counter() - start_time
+            if not success_login:
+                result.error = str(session.get_err_from_stack_or_none())
+                return
+
+        start_time = time.perf_counter()
+        commands_stdout = await session.write_commands_and_read_shell(commands, timeout=self._command_timeout)
+        result.timings.command = time.perf_counter() - start_time
+        for command, stdout in zip(commands, commands_stdout):
+            result.raw_stdout.append((command, stdout))
+            field_name, processed_data = process_terminal_stdout(command, stdout)
+            if processed_data is not None:
+                result.states[field_name] = processed_data
+        if len(commands_stdout) != len(commands):
+            result.error = f'Получен вывод {len(commands_stdout)} из {len(commands)} команд'
+
+    async def execute_on_host(self, ip: str, commands: list[str]) -> HostResult:
+        """
+        Выполняет команды на одном контроллере. Исключения не выбрасываются,
+        ошибка сохраняется в HostResult.error.
+        """
+        result = HostResult(ip)
+        session = self._connection_factory(ip)
+        try:
+            await asyncio.wait_for(self._execute_script(session, commands, result), timeout=self._host_timeout)
+        except asyncio.TimeoutError:
+            result.error = f'Превышено время обработки контроллера: {self._host_timeout} сек'
+        except Exception as exc:
+            result.error = f'{type(exc).__name__}: {exc}'
+        finally:
+            await session.close()
+        return result
+
+    async def run(self, ips: Iterable[str], script: TerminalScript) -> AsyncIterator[HostResult]:
+        """
+        Выполняет сценарий на всех контроллерах, отдавая результаты по мере готовности.
+        :param ips: ip-адреса контроллеров.
+        :param script: Сценарий команд.
+        """
+        commands = get_commands_from_script(script)
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def limited(ip: str) -> HostResult:
+            async with semaphore:
+                return await self.execute_on_host(ip, commands)
+
+        tasks = [asyncio.create_task(limited(ip)) for ip in ips]
+        try:
+            for coro in asyncio.as_completed(tasks):
+                yield await coro
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def run_all(self, ips: Iterable[str], script: TerminalScript) -> list[HostResult]:
+        """
+        Выполняет сценарий на всех контроллерах и возвращает все результаты.
+        """
+        return [result async for result in self.run(ips, script)]
+
+
+if __name__ == '__main__':
+    async def main():
+        executor = SwarcoFanOutExecutor(max_concurrency=20)
+        start_time = time.perf_counter()
+        async for result in executor.run(['10.179.20.9', '10.179.56.1'], instat102_and_display):
+            print(result.as_dict())
+        print(f'Время выполнения: {time.perf_counter() - start_time:.2f}')
+
+    asyncio.run(main())
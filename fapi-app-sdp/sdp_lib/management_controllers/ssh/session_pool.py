@@ -0,0 +1,205 @@
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+from collections.abc import (
+    AsyncIterator,
+    Callable
+)
+from typing import TYPE_CHECKING
+
+from sdp_lib.management_controllers.exceptions import ConnectionTimeout
+from sdp_lib.management_controllers.ssh.swarco_terminal import ItcTerminal
+
+if TYPE_CHECKING:
+    from sdp_lib.management_controllers.ssh.ssh_core import SwarcoItcUserConnectionsSSH
+
+
+logger = logging.getLogger(__name__)
+
+
+class _HostSessions:
+    """
+    Сеансы одного контроллера: свободные сеансы и ограничение одновременно используемых.
+    """
+    __slots__ = ('idle', 'semaphore', 'num_opened')
+
+    def __init__(self, max_sessions: int):
+        self.idle: deque['SwarcoItcUserConnectionsSSH'] = deque()
+        self.semaphore = asyncio.Semaphore(max_sessions)
+        self.num_opened = 0
+
+
+class SshSessionPool:
+    """
+    Пул ssh-сеансов с контроллерами Swarco ITC, ключ - ip-адрес.
+
+    Хранит установленные сеансы интерактивной оболочки с выполненным входом уровня 2,
+    поэтому повторная отправка команд не требует нового ssh-рукопожатия и логина.
+        -- max_sessions_per_host: максимальное количество одновременно используемых сеансов с контроллером;
+        -- idle_timeout: через сколько секунд простоя сеанс закрывается;
+        -- keepalive_interval: период проверки свободных сеансов командой ECHO;
+        -- connection_factory: вызываемый объект, создающий сеанс по ip-адресу.
+    Общий для процесса экземпляр пула - ssh_core.ssh_sessions_pool.
+    """
+
+    def __init__(
+            self,
+            *,
+            max_sessions_per_host: int = 1,
+            idle_timeout: float = 300,
+            keepalive_interval: float = 30,
+            acquire_timeout: float = 30,
+            connection_factory: Callable[[str], 'SwarcoItcUserConnectionsSSH']
+    ):
+        if max_sessions_per_host < 1:
+            raise ValueError('max_sessions_per_host должен быть больше 0')
+        self._max_sessions_per_host = max_sessions_per_host
+        self._idle_timeout = idle_timeout
+        self._keepalive_interval = keepalive_interval
+        self._acquire_timeout = acquire_timeout
+        self._connection_factory = connection_factory
+        self._hosts: dict[str, _HostSessions] = {}
+        self._maintenance_task: asyncio.Task | None = None
+
+    def __repr__(self):
+        return (
+            f'{self.__class__.__name__}('
+            f'hosts={len(self._hosts)} idle_sessions={self.num_idle_sessions} '
+            f'max_sessions_per_host={self._max_sessions_per_host}'
+            f')'
+        )
+
+    @property
+    def num_idle_sessions(self) -> int:
+        return sum(len(host.idle) for host in self._hosts.values())
+
+    def _get_host_sessions(self, ip: str) -> _HostSessions:
+        host = self._hosts.get(ip)
+        if host is None:
+            host = self._hosts[ip] = _HostSessions(self._max_sessions_per_host)
+        return host
+
+    def _start_maintenance(self):
+        if self._maintenance_task is None or self._maintenance_task.done():
+            self._maintenance_task = asyncio.create_task(self._maintenance(), name='ssh_pool_maintenance')
+
+    async def _open_session(self, ip: str) -> 'SwarcoItcUserConnectionsSSH':
+        session = self._connection_factory(ip)
+        if not await session.warm_up():
+            error = session.get_err_from_stack_or_none() or 'SSH connection failed'
+            await session.close()
+            raise ConnectionError(str(error))
+        return session
+
+    async def acquire(self, ip: str) -> 'SwarcoItcUserConnectionsSSH':
+        """
+        Возвращает готовый к работе сеанс с контроллером. Если свободного живого сеанса нет,
+        открывает новый. Ожидает, если достигнут лимит одновременных сеансов с контроллером.
+        :raise ConnectionError: Если не удалось установить сеанс.
+        :raise ConnectionTimeout: Если свободный сеанс не появился за acquire_timeout секунд.
+        """
+        self._start_maintenance()
+        host = self._get_host_sessions(ip)
+        try:
+            await asyncio.wait_for(host.semaphore.acquire(), timeout=self._acquire_timeout)
+        except asyncio.TimeoutError:
+            raise ConnectionTimeout()
+        try:
+            while host.idle:
+                session = host.idle.pop()
+                if session.is_alive():
+                    return session
+                host.num_opened -= 1
+                await session.close()
+            session = await self._open_session(ip)
+            host.num_opened += 1
+            return session
+        except BaseException:
+            host.semaphore.release()
+            raise
+
+    async def release(self, session: 'SwarcoItcUserConnectionsSSH', discard: bool = False):
+        """
+        Возвращает сеанс в пул.
+        :param discard: Если True или сеанс неработоспособен, сеанс закрывается.
+        """
+        host = self._get_host_sessions(session.ip_v4)
+        try:
+            if discard or not session.is_alive():
+                host.num_opened -= 1
+                await session.close()
+            else:
+                session.last_used = time.monotonic()
+                host.idle.append(session)
+        finally:
+            host.semaphore.release()
+
+    @contextlib.asynccontextmanager
+    async def session(self, ip: str) -> AsyncIterator['SwarcoItcUserConnectionsSSH']:
+        """
+        Контекстный менеджер для получения сеанса из пула.
+        При исключении внутри блока сеанс закрывается и в пул не возвращается.
+        """
+        ssh_session = await self.acquire(ip)
+        discard = True
+        try:
+            yield ssh_session
+            discard = False
+        finally:
+            await self.release(ssh_session, discard=discard)
+
+    async def _check_idle_session(self, session: 'SwarcoItcUserConnectionsSSH') -> bool:
+        try:
+            stdout = await session.write_and_read_shell(ItcTerminal.echo)
+        except (AttributeError, BrokenPipeError, ConnectionResetError, OSError):
+            return False
+        return 'Ok' in stdout or ItcTerminal.l2_identifier in stdout
+
+    async def _evict_and_check_idle_sessions(self):
+        now = time.monotonic()
+        for host in tuple(self._hosts.values()):
+            for _ in range(len(host.idle)):
+                # Проверяемый сеанс занимает место в семафоре контроллера, как выданный через acquire,
+                # иначе acquire при пустой очереди idle откроет сеанс сверх max_sessions_per_host.
+                # Если все места заняты, проверка сеансов контроллера откладывается до следующего цикла.
+                if host.semaphore.locked():
+                    break
+                await host.semaphore.acquire()
+                try:
+                    if not host.idle:
+                        break
+                    session = host.idle.popleft()
+                    is_expired = now - session.last_used >= self._idle_timeout
+                    if is_expired or not session.is_alive() or not await self._check_idle_session(session):
+                        host.num_opened -= 1
+                        await session.close()
+                        logger.debug(f'Сеанс закрыт: {session}, простой истёк: {is_expired}')
+                    else:
+                        host.idle.append(session)
+                finally:
+                    host.semaphore.release()
+
+    async def _maintenance(self):
+        while True:
+            await asyncio.sleep(self._keepalive_interval)
+            try:
+                await self._evict_and_check_idle_sessions()
+            except Exception as exc:
+                logger.exception(f'Ошибка обслуживания пула ssh-сеансов: {exc}')
+
+    async def close_all(self):
+        """
+        Закрывает все свободные сеансы и останавливает фоновое обслуживание пула.
+        """
+        if self._maintenance_task is not None:
+            self._maintenance_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._maintenance_task
+            self._maintenance_task = None
+        for host in self._hosts.values():
+            while host.idle:
+                await host.idle.pop().close()
+        self._hosts.clear()
+
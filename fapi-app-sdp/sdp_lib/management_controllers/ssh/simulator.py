@@ -0,0 +1,300 @@
+"""
+Симулятор оболочки ITC контроллера Swarco на asyncssh для тестов и бенчмарков без оборудования.
+
+Поддерживает команды, которые использует SwarcoSSH: lang UK, вход уровня 2 (login_commands),
+ECHO, itc, instatNNN ?, inpNNN=V и SIMULATE DISPLAY --poll. Как и оболочка ITC, выводит эхо
+команды, результат и приглашение ('> ' или '&&> ' при уровне 2), после которого следует символ '\\x00'.
+Хранит состояние ВХОДОВ: при включённом inp102 и одном из ВХОДОВ фаз 104-111 поток переходит
+в ручной режим с соответствующей фазой. Поддерживает задержки ответа и вывод частями.
+
+Запуск: python -m sdp_lib.management_controllers.ssh.simulator
+"""
+
+import asyncio
+import random
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import asyncssh
+
+from sdp_lib.management_controllers.ssh.constants import (
+    kex_algs,
+    enc_algs
+)
+from sdp_lib.management_controllers.ssh.swarco_terminal import (
+    ItcTerminal,
+    matches_num_inp_to_stage
+)
+
+
+PROMPT_L1 = '> '
+PROMPT_L2 = f'{ItcTerminal.l2_identifier} '
+PROMPT_PASSWORD = 'Enter password for level 2> '
+FIRST_INPUT = 101
+NUM_INPUTS = 155
+NUM_INPUTS_INSTAT = 70
+
+
+@dataclass(slots=True)
+class SwarcoSimulatorConfig:
+    """
+    Настройки симулятора.
+    command_delay -> базовая задержка ответа на команду в секундах.
+    jitter -> максимальная случайная добавка к задержке в секундах.
+    login_l2_delay -> дополнительная задержка проверки пароля уровня 2 в секундах.
+    chunk_size -> если больше 0, вывод отправляется частями указанного размера.
+    chunk_delay -> задержка между частями вывода в секундах.
+    ssh_login, ssh_passwd -> учётные данные ssh. None - принимается любое значение.
+    l2_login, l2_pass -> команда и пароль входа уровня 2.
+    """
+    command_delay: float = 0.
+    jitter: float = 0.
+    login_l2_delay: float = 0.
+    chunk_size: int = 0
+    chunk_delay: float = 0.
+    ssh_login: str | None = None
+    ssh_passwd: str | None = None
+    l2_login: str = ItcTerminal.l2_login
+    l2_pass: str = ItcTerminal.l2_pass
+    address: str = 'Simulator: Swarco'
+
+
+class SwarcoItcState:
+    """
+    Общее для всех сеансов состояние симулируемого контроллера.
+    """
+
+    def __init__(self):
+        self.inputs = {num_inp: 0 for num_inp in range(FIRST_INPUT, FIRST_INPUT + NUM_INPUTS)}
+        self._start_time = time.monotonic()
+        self.num_commands = 0
+
+    def get_mode_and_stage(self) -> tuple[str, int]:
+        if self.inputs[102]:
+            for num_inp, num_stage in matches_num_inp_to_stage.items():
+                if self.inputs[num_inp]:
+                    return 'MAN', num_stage
+        return 'ON_ERR', int(time.monotonic() - self._start_time) // 10 % len(matches_num_inp_to_stage) + 1
+
+    def create_instat(self, first_inp: int) -> str:
+        nums = range(first_inp, first_inp + NUM_INPUTS_INSTAT)
+        hundreds = ''.join(str(num // 100 % 10) for num in nums)
+        tens = ''.join(str(num // 10 % 10) for num in nums)
+        units = ''.join(str(num % 10) for num in nums)
+        states = ''.join(str(self.inputs.get(num, 0)) for num in nums)
+        return (
+            f'\r\n     {hundreds}\r\n     {tens}\r\n     {units}\r\n'
+            f' {int(time.monotonic() - self._start_time) % 100:2d}: {states}\r\r\n'
+        )
+
+    def create_display(self, address: str) -> str:
+        mode, stage = self.get_mode_and_stage()
+        return (
+            f'Line 1: *** ITC-2 Linux  ***\r\n'
+            f'Line 2: {address[:8]:<8} {time.strftime("%d.%m-%H:%M:%S")}\r\n'
+            f'Line 3: P1CL      TVP    208\r\n'
+            f'Line 4: 1-1 {mode:<6} S{stage}/S{stage} 0  \r\n'
+            f'Signals: 1 0 0 0 0 0 0 0\r\n'
+        )
+
+
+class ItcShellSession:
+    """
+    Сеанс интерактивной оболочки ITC.
+    """
+
+    def __init__(
+            self,
+            process: asyncssh.SSHServerProcess,
+            state: SwarcoItcState,
+            config: SwarcoSimulatorConfig
+    ):
+        self._process = process
+        self._state = state
+        self._config = config
+        self.level2 = False
+        self._awaiting_password = False
+
+    @property
+    def prompt(self) -> str:
+        return PROMPT_L2 if self.level2 else PROMPT_L1
+
+    async def write(self, text: str):
+        chunk_size = self._config.chunk_size
+        if chunk_size <= 0:
+            self._process.stdout.write(text)
+            return
+        for i in range(0, len(text), chunk_size):
+            self._process.stdout.write(text[i:i + chunk_size])
+            if self._config.chunk_delay:
+                await asyncio.sleep(self._config.chunk_delay)
+
+    async def _delay(self):
+        cfg = self._config
+        if cfg.command_delay or cfg.jitter:
+            await asyncio.sleep(cfg.command_delay + random.uniform(0, cfg.jitter))
+
+    async def check_password(self, password: str) -> tuple[str, str]:
+        self._awaiting_password = False
+        if self._config.login_l2_delay:
+            await asyncio.sleep(self._config.login_l2_delay)
+        if password == self._config.l2_pass:
+            self.level2 = True
+            return 'Code level 2 opened.\r\n', self.prompt
+        return 'Wrong password.\r\n', self.prompt
+
+    def set_input(self, command: str) -> str:
+        if not self.level2:
+            return 'Access denied: level 2 required.\r\n'
+        name, _, value = command.partition('=')
+        try:
+            num_inp, value = int(name.removeprefix('inp')), int(value)
+        except ValueError:
+            return 'Syntax error.\r\n'
+        if num_inp not in self._state.inputs or value not in (0, 1):
+            return 'Invalid input.\r\n'
+        self._state.inputs[num_inp] = value
+        return ''
+
+    def execute(self, command: str) -> tuple[str, str]:
+        """
+        Выполняет команду.
+        :return: Кортеж из вывода команды и приглашения.
+        """
+        lower = command.lower()
+        if command == self._config.l2_login:
+            self._awaiting_password = True
+            return '', PROMPT_PASSWORD
+        if command in (ItcTerminal.lang_uk, ItcTerminal.echo):
+            output = 'Ok.\r\n'
+        elif command == ItcTerminal.itc_command:
+            output = 'ITC-2 Linux\r\nSimulator\r\n'
+        elif command == ItcTerminal.display_command:
+            output = self._state.create_display(self._config.address) + '\r\n'
+        elif lower.startswith('instat') and command.endswith('?'):
+            try:
+                output = self._state.create_instat(int(lower.removeprefix('instat').removesuffix('?')))
+            except ValueError:
+                output = 'Syntax error.\r\n'
+        elif lower.startswith('inp') and '=' in command:
+            output = self.set_input(lower)
+        elif not command:
+            output = ''
+        else:
+            output = f'Unknown command: {command}\r\n'
+        return output, self.prompt
+
+    async def run(self):
+        await self.write(f'ITC-2 Linux shell. {self._config.address}\r\n{self.prompt}\x00')
+        while not self._process.stdin.at_eof():
+            try:
+                line = await self._process.stdin.readline()
+            except asyncssh.Error:
+                break
+            if not line:
+                break
+            command = line.strip('\r\n')
+            self._state.num_commands += 1
+            await self._delay()
+            if self._awaiting_password:
+                output, prompt = await self.check_password(command)
+            else:
+                output, prompt = self.execute(command)
+            await self.write(f'{command}\r\n{output}{prompt}\x00')
+        self._process.exit(0)
+
+
+class _ItcSshServer(asyncssh.SSHServer):
+
+    def __init__(self, config: SwarcoSimulatorConfig):
+        self._config = config
+
+    def begin_auth(self, username: str) -> bool:
+        return True
+
+    def password_auth_supported(self) -> bool:
+        return True
+
+    def validate_password(self, username: str, password: str) -> bool:
+        cfg = self._config
+        return (
+            (cfg.ssh_login is None or username == cfg.ssh_login)
+            and (cfg.ssh_passwd is None or password == cfg.ssh_passwd)
+        )
+
+
+class SwarcoSimulator:
+    """
+    Симулируемый контроллер Swarco: ssh-сервер и состояние контроллера.
+    """
+
+    def __init__(self, config: SwarcoSimulatorConfig = None):
+        self._config = config or SwarcoSimulatorConfig()
+        self.state = SwarcoItcState()
+        self._server: asyncssh.SSHAcceptor | None = None
+
+    @property
+    def config(self) -> SwarcoSimulatorConfig:
+        return self._config
+
+    async def handle_process(self, process: asyncssh.SSHServerProcess):
+        await ItcShellSession(process, self.state, self._config).run()
+
+    def _create_server(self) -> asyncssh.SSHServer:
+        return _ItcSshServer(self._config)
+
+    async def start(self, host: str, port: int, server_host_key: asyncssh.SSHKey):
+        algs = {}
+        if kex_algs:
+            algs['kex_algs'] = kex_algs
+        if enc_algs:
+            algs['encryption_algs'] = enc_algs
+        self._server = await asyncssh.create_server(
+            self._create_server,
+            host,
+            port,
+            server_host_keys=[server_host_key],
+            process_factory=self.handle_process,
+            line_editor=False,
+            **algs
+        )
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+async def run_simulators(
+        hosts: list[tuple[str, int]],
+        config: SwarcoSimulatorConfig = None,
+        key_factory: Callable[[], asyncssh.SSHKey] = lambda: asyncssh.generate_private_key('ssh-ed25519')
+) -> list[SwarcoSimulator]:
+    """
+    Запускает по одному симулятору на каждую пару (ip, port). Все симуляторы
+    используют один сгенерированный ключ хоста.
+    Для loopback можно использовать любые адреса 127.0.0.0/8.
+    """
+    server_host_key = key_factory()
+    simulators = []
+    for ipv4, port in hosts:
+        simulator = SwarcoSimulator(config)
+        await simulator.start(ipv4, port, server_host_key)
+        simulators.append(simulator)
+    return simulators
+
+
+async def main():
+    simulators = await run_simulators([('127.0.0.1', 8022)], SwarcoSimulatorConfig(command_delay=.02))
+    print('Симулятор Swarco запущен: ssh -p 8022 127.0.0.1. Для остановки нажмите Ctrl-C')
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for simulator in simulators:
+            await simulator.stop()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
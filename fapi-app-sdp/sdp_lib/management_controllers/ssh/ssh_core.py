@@ -1,14 +1,22 @@
 import asyncio
 import os
+import time
 from typing import Self, Sequence
 from collections import deque
 
 import asyncssh
 from asyncssh import SSHClientProcess
 
-from sdp_lib.management_controllers.exceptions import ReadFromInteractiveShellError
+from sdp_lib.management_controllers.exceptions import (
+    ConnectionTimeout,
+    ReadFromInteractiveShellError
+)
 from sdp_lib.management_controllers.fields_names import FieldsNames
-from sdp_lib.management_controllers.hosts_core import Host
+from sdp_lib.management_controllers.hosts_core import (
+    Host,
+    RequestResponse
+)
+from sdp_lib.management_controllers.parsers.parsers_swarco_ssh import SwarcoSshParser
 # from sdp_lib.management_controllers.parsers.parsers_swarco_ssh import process_stdout_instat
 from sdp_lib.management_controllers.ssh.constants import (
     kex_algs,
@@ -19,6 +27,7 @@ from sdp_lib.management_controllers.ssh.constants import (
     itc_passwd
 )
 
+from sdp_lib.management_controllers.ssh.session_pool import SshSessionPool
 from sdp_lib.management_controllers.ssh.swarco_terminal import (
     ItcTerminal,
     is_log_l2,
@@ -56,6 +65,67 @@ async def read_timed(
         #     raise ReadFromInteractiveShellError()
 
 
+async def read_until_prompt(
+    stream: asyncssh.SSHReader,
+    num_prompts: int = 1,
+    terminators: Sequence[str] = (ItcTerminal.prompt_terminator, ),
+    timeout: float = 2.,
+    bufsize: int = 4096
+) -> str:
+    """
+    Читает данные из потока вывода до появления num_prompts приглашений оболочки.
+    В отличие от read_timed, чтение завершается сразу после получения приглашения,
+    а не по истечении таймаута. Части вывода накапливаются в списке и объединяются один раз.
+    :param stream: Поток обмена данными.
+    :param num_prompts: Количество приглашений, после которого чтение завершается.
+                        Для конвейерной отправки команд равно количеству команд.
+    :param terminators: Признаки окончания вывода команды.
+    :param timeout: Максимальное время ожидания в секундах. По истечении возвращаются
+                    прочитанные к этому моменту данные.
+    :param bufsize: Размер буфера в байтах.
+    :return: Вывод данных в строковом представлении, включая символы '\x00' после приглашений.
+    """
+    chunks = []
+    tail = ''
+    tail_size = max(len(terminator) for terminator in terminators) - 1
+    found = 0
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while found < num_prompts:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        try:
+            chunk = await asyncio.wait_for(stream.read(bufsize), remaining)
+        except asyncio.TimeoutError:
+            break
+        if not chunk:
+            break
+        chunks.append(chunk)
+        window = tail + chunk
+        found += sum(window.count(terminator) for terminator in terminators)
+        tail = window[-tail_size:] if tail_size else ''
+    return ''.join(chunks)
+
+
+def split_stdout_by_prompts(
+        stdout: str,
+        terminator: str = ItcTerminal.prompt_terminator
+) -> list[str]:
+    """
+    Разделяет вывод нескольких команд, отправленных одной записью, на вывод каждой команды.
+    Вывод каждой команды содержит эхо команды и завершается приглашением оболочки,
+    как при отправке команд по одной.
+    :param stdout: Вывод, полученный read_until_prompt.
+    :param terminator: Признак окончания вывода команды.
+    :return: Список с выводом каждой команды без символов '\x00'.
+    """
+    prompt_end = terminator.replace('\u0000', '')
+    *commands_stdout, _ = stdout.split(terminator)
+    return [f'{data}{prompt_end}'.replace('\u0000', '') for data in commands_stdout]
+
+
+
 class SwarcoItcUserConnectionsSSH:
     """
     Класс ssh соединений.
@@ -66,16 +136,28 @@ class SwarcoItcUserConnectionsSSH:
             connect_timeout: float = 20,
             login_timeout: float = 10,
             open_interactive_process_timeout: float = 2,
+            keepalive_interval: float = 15,
+            port: int = 22,
     ):
         self._ipv4 = ip
+        self._port = port
         self._connect_timeout = connect_timeout
         self._login_timeout = login_timeout
         self._open_interactive_process_timeout = open_interactive_process_timeout
+        self._keepalive_interval = keepalive_interval
         self._ssh_connection = None
         self._ssh_process = None
         self._last_conn_time = None
         self.command_timeout = .2
         self._connection_errors = deque(maxlen=1)
+        self.last_used: float = time.monotonic()
+
+    def __repr__(self):
+        return (
+            f'{self.__class__.__name__}('
+            f'ip={self._ipv4} is_alive={self.is_alive()}'
+            f')'
+        )
 
     async def create_connect(self) -> bool:
         """
@@ -84,14 +166,18 @@ class SwarcoItcUserConnectionsSSH:
         try:
             self._ssh_connection = await asyncssh.connect(
                 host=self._ipv4,
+                port=self._port,
                 username=itc_login,
                 password=itc_passwd,
                 options=asyncssh.SSHClientConnectionOptions(connect_timeout=self._connect_timeout,
-                                                            login_timeout=self._login_timeout),
+                                                            login_timeout=self._login_timeout,
+                                                            keepalive_interval=self._keepalive_interval,
+                                                            keepalive_count_max=3),
                 kex_algs=kex_algs,
                 encryption_algs=enc_algs,
                 known_hosts=None,
             )
+            self._last_conn_time = time.monotonic()
             return True
         except (OSError, asyncssh.Error):
             self.add_connection_error('SSH connection failed')
@@ -143,6 +229,57 @@ class SwarcoItcUserConnectionsSSH:
             self._connect_timeout = value
         return self._connect_timeout
 
+    @property
+    def ip_v4(self) -> str:
+        return self._ipv4
+
+    def is_alive(self) -> bool:
+        """
+        Проверяет, что ssh-соединение не закрыто и процесс оболочки не завершён.
+        Проверка выполняется без обмена данными с контроллером.
+        """
+        if self._ssh_connection is None or self._ssh_process is None:
+            return False
+        return not self._ssh_connection.is_closed() and self._ssh_process.exit_status is None
+
+    async def login_l2(self) -> bool:
+        """
+        Выполняет вход в сеанс оболочки с уровнем доступа 2.
+        :return: True, если вход выполнен, иначе False.
+        """
+        stdout = ''
+        for command in login_commands:
+            stdout = await self.write_and_read_shell(command)
+        if is_log_l2(stdout):
+            return True
+        self.add_connection_error('Ошибка входа в сеанс оболочки с уровнем доступа 2')
+        return False
+
+    async def warm_up(self) -> bool:
+        """
+        Устанавливает ssh-соединение, открывает сеанс интерактивной оболочки
+        и выполняет вход с уровнем доступа 2.
+        :return: True, если сеанс готов к отправке команд управления, иначе False.
+        """
+        if not await self.check_connection_and_interactive_session():
+            return False
+        return await self.login_l2()
+
+    async def close(self) -> None:
+        """
+        Закрывает сеанс интерактивной оболочки и ssh-соединение.
+        """
+        if self._ssh_process is not None:
+            self._ssh_process.close()
+            self._ssh_process = None
+        if self._ssh_connection is not None:
+            self._ssh_connection.close()
+            try:
+                await asyncio.wait_for(self._ssh_connection.wait_closed(), timeout=1)
+            except (asyncio.TimeoutError, OSError, asyncssh.Error):
+                pass
+            self._ssh_connection = None
+
     @property
     def ssh_connection(self):
         """
@@ -182,14 +319,33 @@ class SwarcoItcUserConnectionsSSH:
         """
         self._ssh_process.stdin.write(f'{data}\n')
 
-    async def write_and_read_shell(self, data: str, timeout: float = .6) -> str:
+    async def write_and_read_shell(self, data: str, timeout: float = 2.) -> str:
         """
-        Записывает данные в stdin сеанса интерактивной оболочки и ожидает ответа.
+        Записывает данные в stdin сеанса интерактивной оболочки и ожидает ответа
+        до появления приглашения оболочки.
         :param data: Данные для записи в stdin.
+        :param timeout: Максимальное время ожидания приглашения в секундах.
         :return: Stdout сеанса интерактивной оболочки.
         """
         self.write_to_shell(data)
-        return await read_timed(self._ssh_process.stdout, timeout=timeout)
+        stdout = await read_until_prompt(self._ssh_process.stdout, timeout=timeout)
+        return stdout.replace('\u0000', '')
+
+    async def write_commands_and_read_shell(self, commands: Sequence[str], timeout: float = 5.) -> list[str]:
+        """
+        Записывает несколько команд в stdin одной записью (конвейерно) и ожидает
+        вывода всех команд. Оболочка ITC выполняет команды по очереди, выводя эхо
+        команды, результат и приглашение, поэтому вывод разделяется по приглашениям.
+        :param commands: Последовательность команд.
+        :param timeout: Максимальное время ожидания вывода всех команд в секундах.
+        :return: Список с выводом каждой команды. Если за timeout получен вывод не всех
+                 команд, список короче commands.
+        """
+        if not commands:
+            return []
+        self._ssh_process.stdin.write(''.join(f'{command}\n' for command in commands))
+        stdout = await read_until_prompt(self._ssh_process.stdout, num_prompts=len(commands), timeout=timeout)
+        return split_stdout_by_prompts(stdout)
 
     async def check_connection_and_interactive_session(self) -> bool:
         """
@@ -203,7 +359,7 @@ class SwarcoItcUserConnectionsSSH:
         ok = False
         try:
             self.write_to_shell(ItcTerminal.echo)
-            r = await read_timed(self._ssh_process.stdout)
+            r = await read_until_prompt(self._ssh_process.stdout)
             if 'Ok' in r or 'ITC' in r:
                 return True
         except (AttributeError, BrokenPipeError, ConnectionResetError):
@@ -212,7 +368,7 @@ class SwarcoItcUserConnectionsSSH:
         try:
             success = await self.create_proc()
             if success:
-                r = await read_timed(self._ssh_process.stdout)
+                r = await read_until_prompt(self._ssh_process.stdout)
                 if 'ITC' in r:
                     return True
         except (AttributeError, BrokenPipeError, ConnectionResetError):
@@ -230,7 +386,7 @@ class SwarcoItcUserConnectionsSSH:
         if self._connection_errors:
             return False
 
-        r = await read_timed(self._ssh_process.stdout)
+        r = await read_until_prompt(self._ssh_process.stdout)
         print(f'r2: {r}')
         if 'ITC' in r:
             return True
@@ -238,15 +394,26 @@ class SwarcoItcUserConnectionsSSH:
         return False
 
 
+ssh_sessions_pool = SshSessionPool(connection_factory=SwarcoItcUserConnectionsSSH)
+
+
 class SwarcoSSH(Host):
 
     protocol = FieldsNames.protocol_ssh
+    _parser_class = SwarcoSshParser
 
-    def __init__(self, ip=None, host_id=None, driver: SwarcoItcUserConnectionsSSH = None):
+    def __init__(
+            self,
+            ip=None,
+            host_id=None,
+            driver: SwarcoItcUserConnectionsSSH = None,
+            sessions_pool: SshSessionPool | None = ssh_sessions_pool
+    ):
 
         super().__init__(
             ipv4=ip, host_id=host_id, driver=driver
         )
+        self._sessions_pool = sessions_pool
         self._sent_commands = None
         self.pretty_output = None
         self.raw_stdout = None
@@ -255,6 +422,25 @@ class SwarcoSSH(Host):
     def create_and_set_driver(self):
         self.set_driver(SwarcoItcUserConnectionsSSH(self.ip_v4))
 
+    def add_data_to_data_response_attrs(self, error: str | Exception = None, data: dict = None):
+        """
+        Добавляет ошибку и/или данные сеанса в хранилище ответов хоста.
+        :param error: Текст ошибки или экземпляр Exception.
+        :param data: Данные для response.
+        """
+        parser = self._parser_class()
+        request_response = RequestResponse(
+            protocol=self.protocol,
+            add_to_response_storage=True,
+            parser_obj=parser,
+            parser=parser.parse
+        )
+        if error is not None:
+            request_response.load_error(error)
+        if data is not None:
+            request_response.load_raw_response(data)
+        self._data_storage.put(request_response)
+
     async def check_ssh_session_with_interactive_shell_and_reconnect_if_need(
             self,
             add_err_to_response_data_if_has = True
@@ -280,24 +466,22 @@ class SwarcoSSH(Host):
         self._sent_commands = []
         print(f'argsargs: {terminal_commands_entity}')
         for group_commands in terminal_commands_entity:
-            for data in group_commands:
-                print(f'data: {data}')
-                command, need_processing = data
-                try:
-                    stdout = await self.driver.write_and_read_shell(command)
-                    self.raw_stdout.append((command, stdout))
-                    self._sent_commands.append(command)
-                    if need_processing:
-                        field_name, processed_data = process_terminal_stdout(command, stdout)
-                        states[field_name] = processed_data
-
-                except ReadFromInteractiveShellError as exc:
-                    raise TypeError('ALARM! FAULT IN SENDING DATA TO SHELL')
+            group_commands = list(group_commands)
+            commands = [command for command, _ in group_commands]
+            commands_stdout = await self.driver.write_commands_and_read_shell(commands)
+            if len(commands_stdout) != len(commands):
+                raise ReadFromInteractiveShellError()
+            for (command, need_processing), stdout in zip(group_commands, commands_stdout):
+                self.raw_stdout.append((command, stdout))
+                self._sent_commands.append(command)
+                if need_processing:
+                    field_name, processed_data = process_terminal_stdout(command, stdout)
+                    states[field_name] = processed_data
 
-                self.add_data_to_data_response_attrs(data={
-                    'states_after_shell_session': states,
-                    'sent_commands': self._sent_commands
-                })
+        self.add_data_to_data_response_attrs(data={
+            'states_after_shell_session': states,
+            'sent_commands': self._sent_commands
+        })
 
 
 
@@ -308,10 +492,34 @@ class SwarcoSSH(Host):
 
 
     async def set_stage(self, stage: int) -> Self:
-
-        success_conn = await self.check_ssh_session_with_interactive_shell_and_reconnect_if_need()
-        if not success_conn:
+        """
+        Устанавливает фазу. Если драйвер не задан явно, использует сеанс из пула ssh-сеансов,
+        в котором соединение установлено и вход уровня 2 уже выполнен.
+        :param stage: Номер фазы.
+        :return: Self.
+        """
+        if self.driver is not None or self._sessions_pool is None:
+            try:
+                return await self._set_stage(stage)
+            except ReadFromInteractiveShellError as exc:
+                self.add_data_to_data_response_attrs(exc)
+                return self
+        try:
+            async with self._sessions_pool.session(self.ip_v4) as session:
+                self._driver = session
+                return await self._set_stage(stage, check_connection=False)
+        except (ConnectionError, ConnectionTimeout, ReadFromInteractiveShellError) as exc:
+            self.add_data_to_data_response_attrs(exc)
             return self
+        finally:
+            self._driver = None
+
+    async def _set_stage(self, stage: int, check_connection: bool = True) -> Self:
+
+        if check_connection:
+            success_conn = await self.check_ssh_session_with_interactive_shell_and_reconnect_if_need()
+            if not success_conn:
+                return self
 
         self._varbinds_for_request = []
 
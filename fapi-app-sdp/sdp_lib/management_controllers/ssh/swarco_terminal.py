@@ -36,6 +36,7 @@ class ItcTerminal(StrEnum):
 
     echo = 'ECHO'
     l2_identifier = '&&>'
+    prompt_terminator = '> \x00'
 
 
 
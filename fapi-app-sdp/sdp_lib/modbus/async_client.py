@@ -0,0 +1,288 @@
+"""
+Нативный asyncio-клиент Modbus TCP: чтение дискретных входов (0x02) и катушек (0x01).
+
+В отличие от AsyncModbus, который выполняет блокирующий pyModbusTCP в потоке и
+с auto_close=True открывает новое TCP-соединение на каждое чтение, соединение
+ModbusTcpConnection постоянное. Несколько запросов могут быть отправлены без ожидания
+ответов на предыдущие: ответы сопоставляются с запросами по идентификатору транзакции.
+При разрыве соединения или нарушении протокола(некорректный заголовок MBAP) все ожидающие
+запросы завершаются ошибкой, а следующий запрос устанавливает соединение заново.
+"""
+
+import asyncio
+import logging
+import struct
+import time
+from collections.abc import Iterable
+from typing import Any
+
+from sdp_lib.modbus.client import Modbus
+from sdp_lib.type_aliases import alias_matched_bit_states_to_descr, alias_matched_bit_addr_to_descr
+
+
+logger = logging.getLogger(__name__)
+
+
+READ_COILS = 0x01
+READ_DISCRETE_INPUTS = 0x02
+MAX_BITS_PER_READ = 2000
+# Длина в заголовке MBAP: идентификатор устройства + PDU(от 2 до 253 байт).
+MIN_MBAP_LENGTH = 3
+MAX_MBAP_LENGTH = 254
+
+mbap_header = struct.Struct('>HHHB')
+read_bits_request = struct.Struct('>BHH')
+
+
+class ModbusError(Exception):
+    pass
+
+
+class ModbusExceptionResponse(ModbusError):
+    """
+    Ответ устройства с кодом исключения Modbus.
+    """
+    def __init__(self, function_code: int, exception_code: int):
+        self.function_code = function_code
+        self.exception_code = exception_code
+        super().__init__(f'Modbus exception: function=0x{function_code:02X}, code={exception_code}')
+
+
+def unpack_bits(data: bytes, count: int) -> list[bool]:
+    """
+    Распаковывает биты из байтов ответа (младший бит первого байта - первый адрес).
+    """
+    return [bool(data[i >> 3] >> (i & 7) & 1) for i in range(count)]
+
+
+class ModbusTcpConnection:
+    """
+    Постоянное соединение Modbus TCP с одним устройством.
+        -- timeout: таймаут ожидания ответа на запрос и установки соединения;
+        -- max_in_flight: максимальное количество запросов, ожидающих ответа;
+        -- reconnect_delay: минимальный интервал между попытками установить соединение.
+    """
+
+    def __init__(
+            self,
+            host: str,
+            port: int = 502,
+            *,
+            unit_id: int = 1,
+            timeout: float = .6,
+            max_in_flight: int = 16,
+            reconnect_delay: float = 1.
+    ):
+        self._host = host
+        self._port = port
+        self._unit_id = unit_id
+        self._timeout = timeout
+        self._reconnect_delay = reconnect_delay
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._reader_task: asyncio.Task | None = None
+        self._pending: dict[int, asyncio.Future] = {}
+        self._transaction_id = 0
+        self._connect_lock = asyncio.Lock()
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._next_connect_time = 0.
+
+    def __repr__(self):
+        return (
+            f'{self.__class__.__name__}('
+            f'host={self._host} port={self._port} connected={self.is_connected} pending={len(self._pending)}'
+            f')'
+        )
+
+    @property
+    def is_connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self):
+        """
+        Устанавливает соединение, если оно не установлено.
+        :raise ConnectionError: Если соединение установить не удалось.
+        """
+        async with self._connect_lock:
+            if self.is_connected:
+                return
+            if time.monotonic() < self._next_connect_time:
+                raise ConnectionError(f'Повторное подключение к {self._host}:{self._port} отложено')
+            try:
+                self._reader, self._writer = await asyncio.wait_for(
+                    asyncio.open_connection(self._host, self._port), timeout=self._timeout
+                )
+            except (OSError, asyncio.TimeoutError) as exc:
+                self._next_connect_time = time.monotonic() + self._reconnect_delay
+                raise ConnectionError(f'Не удалось подключиться к {self._host}:{self._port}: {exc!r}')
+            self._reader_task = asyncio.create_task(self._read_responses(self._reader))
+
+    def _next_transaction_id(self) -> int:
+        self._transaction_id = (self._transaction_id + 1) & 0xFFFF
+        return self._transaction_id
+
+    async def _read_responses(self, reader: asyncio.StreamReader):
+        try:
+            while True:
+                header = await reader.readexactly(mbap_header.size)
+                transaction_id, protocol_id, length, _ = mbap_header.unpack(header)
+                if protocol_id != 0 or not MIN_MBAP_LENGTH <= length <= MAX_MBAP_LENGTH:
+                    # Границы следующих ответов в потоке неизвестны, поэтому соединение закрывается.
+                    self._drop_connection(
+                        ModbusError(f'Некорректный заголовок MBAP от {self._host}:{self._port}: {header.hex()}')
+                    )
+                    return
+                pdu = await reader.readexactly(length - 1)
+                future = self._pending.pop(transaction_id, None)
+                if future is not None and not future.done():
+                    future.set_result(pdu)
+        except (asyncio.IncompleteReadError, OSError) as exc:
+            self._drop_connection(ConnectionError(f'Соединение с {self._host}:{self._port} разорвано: {exc!r}'))
+        except asyncio.CancelledError:
+            self._drop_connection(ConnectionError('Соединение закрыто'))
+            raise
+
+    def _drop_connection(self, exc: Exception):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(exc)
+
+    async def request(self, pdu: bytes) -> bytes:
+        """
+        Отправляет PDU и ожидает ответ с тем же идентификатором транзакции.
+        :return: PDU ответа.
+        :raise ConnectionError: Ошибка соединения.
+        :raise TimeoutError: Ответ не получен за self._timeout секунд.
+        :raise ModbusExceptionResponse: Устройство вернуло код исключения.
+        """
+        async with self._in_flight:
+            if not self.is_connected:
+                await self.connect()
+            transaction_id = self._next_transaction_id()
+            future = asyncio.get_running_loop().create_future()
+            self._pending[transaction_id] = future
+            self._writer.write(mbap_header.pack(transaction_id, 0, len(pdu) + 1, self._unit_id) + pdu)
+            try:
+                response = await asyncio.wait_for(future, timeout=self._timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f'Нет ответа от {self._host}:{self._port} за {self._timeout} сек')
+            finally:
+                self._pending.pop(transaction_id, None)
+        if response[0] & 0x80:
+            raise ModbusExceptionResponse(response[0] & 0x7F, response[1] if len(response) > 1 else 0)
+        return response
+
+    async def _read_bits(self, function_code: int, address: int, count: int) -> list[bool]:
+        if not 1 <= count <= MAX_BITS_PER_READ:
+            raise ValueError(f'count должен быть от 1 до {MAX_BITS_PER_READ}')
+        response = await self.request(read_bits_request.pack(function_code, address, count))
+        if response[0] != function_code or len(response) < 2 + (count + 7) // 8:
+            raise ModbusError(f'Некорректный ответ на функцию 0x{function_code:02X}: {response.hex()}')
+        return unpack_bits(response[2:], count)
+
+    async def read_discrete_inputs(self, address: int, count: int = 1) -> list[bool]:
+        return await self._read_bits(READ_DISCRETE_INPUTS, address, count)
+
+    async def read_coils(self, address: int, count: int = 1) -> list[bool]:
+        return await self._read_bits(READ_COILS, address, count)
+
+    def close(self):
+        """
+        Закрывает соединение. Ожидающие запросы завершаются ошибкой.
+        """
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        self._drop_connection(ConnectionError('Соединение закрыто'))
+
+
+class ModbusTcpConnections:
+    """
+    Общие соединения Modbus TCP, ключ - (ip, port, unit_id).
+    Позволяет нескольким объектам опроса одного устройства использовать одно соединение.
+    """
+
+    def __init__(self):
+        self._connections: dict[tuple[str, int, int], ModbusTcpConnection] = {}
+
+    def get(self, host: str, port: int = 502, unit_id: int = 1, **kwargs: Any) -> ModbusTcpConnection:
+        key = (host, port, unit_id)
+        connection = self._connections.get(key)
+        if connection is None:
+            connection = self._connections[key] = ModbusTcpConnection(host, port, unit_id=unit_id, **kwargs)
+        return connection
+
+    def close_all(self):
+        for connection in self._connections.values():
+            connection.close()
+        self._connections.clear()
+
+
+modbus_tcp_connections = ModbusTcpConnections()
+
+
+class NativeAsyncModbus(Modbus):
+    """
+    Асинхронный опрос дискретных входов через постоянное соединение ModbusTcpConnection.
+    Интерфейс и обработка ответа такие же, как у AsyncModbus.
+    """
+
+    def __init__(
+            self,
+            *,
+            ipv4: str,
+            port: int = 502,
+            matched_bit_states_to_description: alias_matched_bit_states_to_descr,
+            matched_bit_addr_to_description: alias_matched_bit_addr_to_descr = None,
+            bad_value_expected_val: Any = -1,
+            unit_id: int = 1,
+            connections: ModbusTcpConnections = modbus_tcp_connections
+    ):
+        self._unit_id = unit_id
+        self._connections = connections
+        super().__init__(
+            ipv4=ipv4,
+            port=port,
+            matched_bit_states_to_description=matched_bit_states_to_description,
+            matched_bit_addr_to_description=matched_bit_addr_to_description,
+            bad_value_expected_val=bad_value_expected_val
+        )
+
+    def _create_client(self) -> ModbusTcpConnection:
+        return self._connections.get(self._ipv4, self._port, self._unit_id)
+
+    async def read_discrete_inputs(self) -> list[bool] | None:
+        try:
+            return await self._mb_client.read_discrete_inputs(self._start_bit_addr, self._num_bits_to_read)
+        except (ConnectionError, TimeoutError, ModbusError) as exc:
+            self._response.add_errors(exc)
+            return None
+
+    async def read_coils(self, address: int = 0, count: int = 8) -> list[bool] | None:
+        try:
+            return await self._mb_client.read_coils(address, count)
+        except (ConnectionError, TimeoutError, ModbusError) as exc:
+            self._response.add_errors(exc)
+            return None
+
+    async def read_discrete_inputs_and_process(self):
+        self._response.reset_errors_and_data()
+        dig_inputs = await self.read_discrete_inputs()
+        self.process_response_discrete_inputs(dig_inputs)
+
+    async def get_current_stage(self):
+        await self.read_discrete_inputs_and_process()
+        return self
+
+
+async def read_discrete_inputs_many(
+        hosts: Iterable[NativeAsyncModbus]
+) -> list[NativeAsyncModbus]:
+    """
+    Одновременно опрашивает дискретные входы всех hosts.
+    """
+    return list(await asyncio.gather(*(host.get_current_stage() for host in hosts)))
@@ -13,6 +13,7 @@ from typing import Any, NamedTuple, TypeAlias, TypeVar, AnyStr
 from pyModbusTCP.client import ModbusClient
 
 from sdp_lib.modbus.data_helpers import Description
+from sdp_lib.modbus.decoder import BitsDecoder, DecodedStates
 from sdp_lib.modbus.fields import FieldNames
 from sdp_lib.modbus.formatters import Formatter
 from sdp_lib.type_aliases import alias_matched_bit_states_to_descr, alias_matched_bit_addr_to_descr
@@ -77,17 +78,29 @@ class Modbus:
             port: int = 502,
             matched_bit_states_to_description: alias_matched_bit_states_to_descr,
             matched_bit_addr_to_description: alias_matched_bit_addr_to_descr = None,
-            bad_value_expected_val: Any = -1
+            bad_value_expected_val: Any = -1,
+            build_pretty: bool = True
     ):
         self._ipv4 = str(ipaddress.IPv4Address(ipv4))
         self._port = port
-        self._mb_client = ModbusClient(host=self._ipv4, port=port, timeout=.6, auto_close=True)
+        self._mb_client = self._create_client()
         self._response = ResponseEntity()
         self._matched_bit_states_to_description = dict(matched_bit_states_to_description)
         self._matched_bit_addr_to_description = dict(matched_bit_addr_to_description or {})
         self._bad_value_expected_val = bad_value_expected_val
         self._start_bit_addr = 0
         self._num_bits_to_read = 8
+        self._decoder = BitsDecoder(
+            self._matched_bit_states_to_description,
+            self._matched_bit_addr_to_description,
+            num_bits=self._num_bits_to_read,
+            bad_value_expected_val=bad_value_expected_val
+        )
+        self._build_pretty = build_pretty
+        self._last_decoded: DecodedStates | None = None
+
+    def _create_client(self):
+        return ModbusClient(host=self._ipv4, port=self._port, timeout=.6, auto_close=True)
 
     def __getattr__(self, item):
         if FieldNames.current_stage in item:
@@ -122,6 +135,20 @@ class Modbus:
     def matched_bit_address_to_description(self):
         return self._matched_bit_addr_to_description
 
+    @property
+    def decoder(self) -> BitsDecoder:
+        return self._decoder
+
+    @property
+    def pretty(self) -> str | None:
+        """
+        Строка описания состояний битов последнего успешного чтения.
+        Если build_pretty=False, формируется только при обращении.
+        """
+        if self._last_decoded is None:
+            return None
+        return self._last_decoded.pretty
+
     def read_discrete_inputs(self) -> list[bool] | None:
         return self._mb_client.read_discrete_inputs(self._start_bit_addr, self._num_bits_to_read)
 
@@ -135,9 +162,10 @@ class Modbus:
             self._response.add_errors(f'Ошибка соединения...')
         else:
             self._response.reset_errors_and_data()
-            recv = self.create_data(dig_inputs)
-            self._response.put_data_to_pretty_field_name(recv.string_pattern)
-            self._response.put_stage_to_current_data_field_name(recv.expected_val)
+            self._last_decoded = self._decoder.decode(dig_inputs)
+            if self._build_pretty:
+                self._response.put_data_to_pretty_field_name(self._last_decoded.pretty)
+            self._response.put_stage_to_current_data_field_name(self._last_decoded.expected_val)
 
     def get_expected_val_from_states(self, states: list[bool]):
         try:
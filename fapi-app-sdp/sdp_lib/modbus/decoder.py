@@ -0,0 +1,133 @@
+from collections.abc import Sequence
+from typing import Any
+
+from sdp_lib.modbus.data_helpers import Description
+from sdp_lib.modbus.fields import FieldNames
+from sdp_lib.type_aliases import alias_matched_bit_states_to_descr, alias_matched_bit_addr_to_descr
+
+
+MAX_BITS_FOR_TABLE = 16
+
+
+def states_to_mask(states: Sequence[bool | int]) -> int:
+    """
+    Упаковывает состояния битов в целое число: состояние бита с адресом i -> i-й разряд.
+    """
+    mask = 0
+    for i, state in enumerate(states):
+        if state:
+            mask |= 1 << i
+    return mask
+
+
+class DecodedStates:
+    """
+    Результат декодирования состояний дискретных входов.
+    Строка с описанием битов формируется только при обращении к pretty.
+    """
+    __slots__ = ('mask', 'expected_val', '_decoder', '_pretty')
+
+    def __init__(self, mask: int, expected_val: Any, decoder: 'BitsDecoder'):
+        self.mask = mask
+        self.expected_val = expected_val
+        self._decoder = decoder
+        self._pretty = None
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(mask={self.mask:#0{self._decoder.num_bits + 2}b} expected_val={self.expected_val})'
+
+    @property
+    def pretty(self) -> str:
+        if self._pretty is None:
+            self._pretty = self._decoder.get_pretty(self.mask)
+        return self._pretty
+
+    def as_description(self) -> Description:
+        return Description(self.pretty, self.expected_val)
+
+
+class BitsDecoder:
+    """
+    Декодер состояний дискретных входов на основе таблицы, построенной один раз.
+
+    Состояния битов упаковываются в целое число, биты из FieldNames.ignored_bits
+    исключаются маской, значение (например, фаза) берётся из таблицы по индексу-маске.
+    Строки описания каждого бита также подготавливаются заранее, итоговая строка
+    для каждой маски формируется один раз и кэшируется.
+    """
+
+    def __init__(
+            self,
+            matched_bit_states_to_description: alias_matched_bit_states_to_descr,
+            matched_bit_addr_to_description: alias_matched_bit_addr_to_descr = None,
+            num_bits: int = 8,
+            bad_value_expected_val: Any = -1
+    ):
+        self.num_bits = num_bits
+        self._bad_value_expected_val = bad_value_expected_val
+        self.ignored_bits = frozenset(matched_bit_states_to_description.get(FieldNames.ignored_bits, ()))
+        self.full_mask = (1 << num_bits) - 1
+        self.care_mask = self.full_mask & ~states_to_mask(
+            [i in self.ignored_bits for i in range(num_bits)]
+        )
+        self._table = self._create_table(matched_bit_states_to_description)
+        self._bits_strings = self._create_bits_strings(matched_bit_addr_to_description or {})
+        self._pretty_cache: dict[int, str] = {}
+
+    def _create_table(self, matched_bit_states_to_description) -> list[Any] | dict[int, Any]:
+        if self.num_bits <= MAX_BITS_FOR_TABLE:
+            table = [self._bad_value_expected_val] * (1 << self.num_bits)
+        else:
+            table = {}
+        matched_masks = {}
+        for states, description in matched_bit_states_to_description.items():
+            if states == FieldNames.ignored_bits:
+                continue
+            mask = states_to_mask(states) & self.care_mask
+            expected_val = description.expected_val
+            if matched_masks.get(mask, expected_val) != expected_val:
+                raise ValueError(
+                    f'Состояния {states} без учёта битов {set(self.ignored_bits)} совпадают '
+                    f'с состояниями другого значения: {matched_masks[mask]}'
+                )
+            matched_masks[mask] = expected_val
+        if isinstance(table, dict):
+            table.update(matched_masks)
+            return table
+        for index in range(len(table)):
+            table[index] = matched_masks.get(index & self.care_mask, self._bad_value_expected_val)
+        return table
+
+    def _create_bits_strings(self, matched_bit_addr_to_description) -> list[tuple[str, str]]:
+        bits_strings = []
+        for i in range(self.num_bits):
+            d = matched_bit_addr_to_description.get(i)
+            description = d.string_pattern if isinstance(d, Description) else (d or '')
+            bits_strings.append(
+                (f' <Bit address={i} State=0{description}>', f' <Bit address={i} State=1{description}>')
+            )
+        return bits_strings
+
+    def get_expected_val(self, mask: int) -> Any:
+        if isinstance(self._table, dict):
+            return self._table.get(mask & self.care_mask, self._bad_value_expected_val)
+        return self._table[mask]
+
+    def get_pretty(self, mask: int) -> str:
+        """
+        Возвращает строку описания состояний битов, аналогичную Modbus.create_data.
+        """
+        pretty = self._pretty_cache.get(mask)
+        if pretty is None:
+            pretty = self._pretty_cache[mask] = ''.join(
+                strings[mask >> i & 1] for i, strings in enumerate(self._bits_strings)
+            )
+        return pretty
+
+    def decode(self, states: Sequence[bool | int]) -> DecodedStates:
+        """
+        Декодирует состояния битов.
+        :param states: Состояния битов, длина не больше self.num_bits.
+        """
+        mask = states_to_mask(states) & self.full_mask
+        return DecodedStates(mask, self.get_expected_val(mask), self)
@@ -1,11 +1,30 @@
+import logging
+
 from docx import Document
+from docx.table import Table
 
+from sdp_lib.passport.ooxml import OoxmlDocument, XmlTable
+from sdp_lib.passport.base import TheTable
 from sdp_lib.passport.passport import Passport
 from sdp_lib.passport.validation.common_validators import check_is_directions_table
+from sdp_lib.passport.validation.compiled_validators import validate_and_create_directions_table_compiled
 from sdp_lib.passport.validation.dt_validators import validate_and_create_directions_table
 from sdp_lib.utils_common.utils_common import to_json
 
 
+logger = logging.getLogger(__name__)
+
+
+# Проверять таблицу направлений скомпилированными валидаторами (по столбцам).
+use_compiled_validators = True
+
+
+def validate_directions_table(i_table: int, table: Table | XmlTable) -> TheTable:
+    if use_compiled_validators:
+        return validate_and_create_directions_table_compiled(i_table, table)
+    return validate_and_create_directions_table(i_table, table)
+
+
 def create_passport(
     filename: str,
     docx: Document,
@@ -20,7 +39,26 @@ def create_passport(
     for i, table in enumerate(docx.tables):
         if check_is_directions_table(table.rows):
             print('Direction table was found')
-            passport.load_direction_table(validate_and_create_directions_table(i, table))
+            passport.load_direction_table(validate_directions_table(i, table))
+    return passport
+
+
+def create_passport_from_ooxml(
+    filename: str,
+    docx: OoxmlDocument,
+) -> Passport:
+    """
+    Проверяет ошибки и создает паспорт светофорного объекта без построения python-docx Document.
+    Таблицы читаются потоково из word/document.xml, экземпляры таблиц создаются
+    только для таблиц направлений. Отмеченные ошибки записываются при docx.save().
+    :param filename: Имя(путь) файла.
+    :param docx: Исходный docx файл.
+    :return: Экземпляр паспорта.
+    """
+    passport = Passport(filename, docx)
+    for table in docx.iter_tables(check_is_directions_table):
+        logger.debug(f'{filename}: найдена таблица направлений, таблица {table.i_table}')
+        passport.load_direction_table(validate_directions_table(table.i_table, table))
     return passport
 
 
@@ -60,7 +60,8 @@ class MessageStorage(NamedTuple):
     #     return res
 
 
-
+# Общее хранилище для ячеек без сообщений. Только для чтения.
+EMPTY_MESSAGES = MessageStorage((), ())
 
 
 class ValidationData(NamedTuple):
@@ -162,8 +163,8 @@ class AbstractDataRow:
                 'value': r.value,
                 'text_is_valid': r.text_is_valid,
                 'ctx_is_valid': r.context_is_valid,
-                'errors': r.messages.errors,
-                'warnings': r.messages.warnings,
+                'errors': list(r.messages.errors),
+                'warnings': list(r.messages.warnings),
             }
             for r in self._row
         ]
@@ -262,7 +263,7 @@ class TheTable:
             head_rows: Sequence[T_Row] = None,
             data_rows: Sequence[T_Row] = None,
             empty_rows: Sequence[T_Row] = None,
-            messages: MessageStorage = MessageStorage([], []),
+            messages: MessageStorage = None,
     ):
         self.i_table = i_table
         self.table = table
@@ -270,7 +271,7 @@ class TheTable:
         self.head_rows = head_rows
         self.data_rows = data_rows
         self.empty_rows = empty_rows
-        self.messages = messages
+        self.messages = messages or MessageStorage([], [])
 
     def __str__(self):
         return (
@@ -298,8 +299,9 @@ class TheTable:
                 Fields.num_rows: self.geometry_check_list.num_rows.value,
                 Fields.ok: self.geometry_check_list.is_valid,
             },
-            Fields.head_rows: [[name.value for name in row_instance.get_row()] for row_instance in self.head_rows],
-            Fields.data_rows: [r.dump() for r in self.data_rows]
+            # При ошибке геометрии или заголовка таблицы строки не разбираются(head_rows/data_rows - None).
+            Fields.head_rows: [[name.value for name in row_instance.get_row()] for row_instance in self.head_rows or ()],
+            Fields.data_rows: [r.dump() for r in self.data_rows or ()]
         }
 
 
@@ -0,0 +1,106 @@
+"""
+Сравнение проверки таблицы направлений:
+    -- dt_validators.validate_and_create_directions_table: проверка по строкам, перебор шаблонов для каждой ячейки;
+    -- compiled_validators.validate_and_create_directions_table_compiled: проверка по столбцам,
+       объединённые шаблоны, хранилища сообщений только для ячеек с ошибками.
+Паспорта синтезируются из _mock_data/directions_*: строки (номер, тип направления, фазы)
+повторяются до нужного количества направлений, остальные столбцы заполняются допустимыми
+значениями для типа направления, в каждой BAD_EVERY строке значения содержат ошибки.
+Таблица читается через python-docx и через OoxmlDocument (время проверки без разбора документа).
+Для каждого паспорта проверяется совпадение dump() таблицы и текста ячеек с отметками ошибок.
+
+Запуск: python -m sdp_lib.passport.benchmark_validators
+"""
+
+import contextlib
+import io
+import itertools
+import time
+from pathlib import Path
+
+from docx import Document
+
+from sdp_lib.passport.constants import mapping_direction_data, row0_dt_names, row1_dt_names
+from sdp_lib.passport.ooxml import OoxmlDocument
+from sdp_lib.passport.validation.compiled_validators import validate_and_create_directions_table_compiled
+from sdp_lib.passport.validation.dt_validators import validate_and_create_directions_table
+
+
+MOCK_DATA_DIR = Path(__file__).parent / '_mock_data'
+NUM_DIRECTIONS = (24, 96, 384)
+BAD_EVERY = 4
+REPEATS = 5
+
+tl_names = {'Транспортное': 'Тр.', 'Пешеходное': 'Пеш.', 'Поворотное': 'Д/с'}
+
+
+def load_mock_directions(path: Path) -> list[list[str]]:
+    return [line.split('\t') for line in path.read_text(encoding='utf-8').splitlines() if line.strip()]
+
+
+def create_row(i: int, num: str, entity: str, stages: str) -> list[str]:
+    direction_data = mapping_direction_data.get(entity)
+    timings = [str(int(t.default)) for t in direction_data.get_timings()] if direction_data is not None else ['0'] * 7
+    toov = '-' if entity == 'Поворотное' else 'Вкл'
+    row = [num, entity, stages, f'{tl_names.get(entity, "Тр.")} {i + 1},{i + 2}', *timings, '', toov, toov, '']
+    if i % BAD_EVERY == 0:
+        row[1] = entity[:-2]
+        row[4] = 'x'
+        row[11] = row[12] = 'да'
+    return row
+
+
+def create_passport_docx(mock_rows: list[list[str]], num_directions: int) -> bytes:
+    doc = Document()
+    table = doc.add_table(rows=2 + num_directions, cols=len(row1_dt_names))
+    for row, names in zip(table.rows, (row0_dt_names, row1_dt_names)):
+        for cell, name in zip(row.cells, names):
+            cell.text = str(name)
+    for i in range(num_directions):
+        _, entity, stages = mock_rows[i % len(mock_rows)]
+        for cell, val in zip(table.rows[i + 2].cells, create_row(i, str(i + 1), entity, stages)):
+            cell.text = val
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+readers = {
+    'python-docx': lambda content: Document(io.BytesIO(content)).tables[0],
+    'OoxmlDocument': lambda content: next(OoxmlDocument(content).iter_tables()),
+}
+
+
+def run(validator, table) -> tuple[float, dict, list[str]]:
+    """
+    :return: Время проверки, dump таблицы, текст ячеек после записи сообщений.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        the_table = validator(0, table)
+        elapsed = time.perf_counter() - start
+    return elapsed, the_table.dump(), [c.text for r in table.rows for c in r.cells]
+
+
+def main():
+    for path in sorted(MOCK_DATA_DIR.glob('directions_*')):
+        mock_rows = load_mock_directions(path)
+        for (reader_name, reader), num_directions in itertools.product(readers.items(), NUM_DIRECTIONS):
+            content = create_passport_docx(mock_rows, num_directions)
+            times = {validate_and_create_directions_table: [], validate_and_create_directions_table_compiled: []}
+            results = {}
+            for _ in range(REPEATS):
+                for validator, validator_times in times.items():
+                    elapsed, *results[validator] = run(validator, reader(content))
+                    validator_times.append(elapsed)
+            legacy, compiled = results.values()
+            legacy_t, compiled_t = (min(t) for t in times.values())
+            print(
+                f'{path.name} {reader_name}: {num_directions} направлений | по строкам: {legacy_t * 1000:.2f} мс | '
+                f'по столбцам: {compiled_t * 1000:.2f} мс | x{legacy_t / compiled_t:.1f} | '
+                f'совпадение: {legacy == compiled}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+"""
+Кэш результатов проверки паспортов по хэшу содержимого загруженного файла.
+
+Ключ - sha256 байтов docx (и версии кэша), значение - docx с отмеченными ошибками
+и Passport.dump(). Результаты хранятся в памяти (LRU, ограничение по суммарному размеру)
+и на диске (LRU по времени последнего обращения, ограничение по суммарному размеру),
+поэтому повторная загрузка неизменного паспорта не требует разбора и проверки документа,
+в том числе после перезапуска сервиса.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any
+
+from docx import Document
+
+from sdp_lib.passport.api import create_passport, create_passport_from_ooxml
+from sdp_lib.passport.ooxml import OoxmlDocument
+
+
+logger = logging.getLogger(__name__)
+
+# Увеличивается при изменении правил проверки, чтобы не отдавать результаты прежних проверок.
+CACHE_VERSION = '2'
+
+# Проверять паспорта через OoxmlDocument. При ошибке разбора используется python-docx.
+use_ooxml_reader = True
+
+
+def get_digest(content: bytes, version: str = CACHE_VERSION) -> str:
+    h = hashlib.sha256(content)
+    h.update(f'\x00{version}'.encode())
+    return h.hexdigest()
+
+
+@dataclass(frozen=True, slots=True)
+class PassportResult:
+    """
+    Результат проверки паспорта.
+    docx -> содержимое docx с отмеченными ошибками.
+    dump -> Passport.dump().
+    cached -> результат получен из кэша.
+    """
+    filename: Path
+    digest: str
+    docx: bytes
+    dump: dict[str, Any]
+    cached: bool = False
+
+    @property
+    def size(self) -> int:
+        return len(self.docx)
+
+
+def validate_passport(filename: str | Path, content: bytes, digest: str = None) -> PassportResult:
+    """
+    Проверяет паспорт из байтов docx. Документ разбирается один раз.
+    Если use_ooxml_reader - таблицы читаются через OoxmlDocument.
+    :param filename: Имя файла паспорта.
+    :param content: Содержимое docx.
+    :param digest: Хэш содержимого. Если None - вычисляется.
+    :return: Экземпляр PassportResult.
+    """
+    passport = None
+    if use_ooxml_reader:
+        try:
+            passport = create_passport_from_ooxml(filename, OoxmlDocument(content))
+        except Exception as exc:
+            logger.warning(f'Ошибка чтения {filename} через OoxmlDocument, используется python-docx: {exc!r}')
+    if passport is None:
+        passport = create_passport(filename, Document(io.BytesIO(content)))
+    buffer = io.BytesIO()
+    passport.get_docx().save(buffer)
+    return PassportResult(
+        Path(filename), digest or get_digest(content), buffer.getvalue(), passport.dump()
+    )
+
+
+class PassportResultCache:
+    """
+    Двухуровневый LRU-кэш результатов проверки паспортов: память и каталог directory.
+    Если directory is None - только память.
+    На диске результат хранится в двух файлах: <digest>.docx и <digest>.json.
+    """
+
+    def __init__(
+            self,
+            directory: str | os.PathLike | None = None,
+            max_memory_bytes: int = 64 * 1024 * 1024,
+            max_disk_bytes: int = 1024 * 1024 * 1024,
+    ):
+        self._directory = Path(directory) if directory is not None else None
+        self._max_memory_bytes = max_memory_bytes
+        self._max_disk_bytes = max_disk_bytes
+        self._memory: OrderedDict[str, PassportResult] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: OrderedDict[str, int] = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if self._directory is not None:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            self._load_disk_index()
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(directory={self._directory} memory={len(self._memory)} '
+                f'disk={len(self._disk)} hits={self.hits} misses={self.misses})')
+
+    def _get_paths(self, digest: str) -> tuple[Path, Path]:
+        return self._directory / f'{digest}.docx', self._directory / f'{digest}.json'
+
+    def _load_disk_index(self):
+        entries = []
+        for docx_path in self._directory.glob('*.docx'):
+            json_path = docx_path.with_suffix('.json')
+            try:
+                docx_stat, json_stat = docx_path.stat(), json_path.stat()
+            except FileNotFoundError:
+                docx_path.unlink(missing_ok=True)
+                continue
+            entries.append((docx_stat.st_mtime, docx_path.stem, docx_stat.st_size + json_stat.st_size))
+        for _, digest, size in sorted(entries):
+            self._disk[digest] = size
+            self._disk_bytes += size
+        self._evict_disk()
+
+    def _put_memory(self, result: PassportResult):
+        if result.size > self._max_memory_bytes:
+            return
+        old = self._memory.pop(result.digest, None)
+        if old is not None:
+            self._memory_bytes -= old.size
+        self._memory[result.digest] = result
+        self._memory_bytes += result.size
+        while self._memory_bytes > self._max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.size
+
+    def _put_disk(self, result: PassportResult):
+        docx_path, json_path = self._get_paths(result.digest)
+        dump = json.dumps(result.dump, ensure_ascii=False).encode()
+        # Запись через временные файлы: при сбое в каталоге не остаётся неполных результатов.
+        for path, content in ((json_path, dump), (docx_path, result.docx)):
+            tmp_path = path.with_suffix(f'{path.suffix}.tmp')
+            tmp_path.write_bytes(content)
+            os.replace(tmp_path, path)
+        size = len(dump) + result.size
+        self._disk_bytes += size - self._disk.pop(result.digest, 0)
+        self._disk[result.digest] = size
+        self._evict_disk()
+
+    def _evict_disk(self):
+        while self._disk_bytes > self._max_disk_bytes and self._disk:
+            digest, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            for path in self._get_paths(digest):
+                path.unlink(missing_ok=True)
+
+    def _get_disk(self, digest: str) -> PassportResult | None:
+        if digest not in self._disk:
+            return None
+        docx_path, json_path = self._get_paths(digest)
+        try:
+            dump = json.loads(json_path.read_bytes())
+            docx = docx_path.read_bytes()
+            os.utime(docx_path)
+        except (OSError, ValueError) as exc:
+            logger.warning(f'Ошибка чтения результата {digest} из кэша: {exc}')
+            self._disk_bytes -= self._disk.pop(digest)
+            return None
+        self._disk.move_to_end(digest)
+        return PassportResult(Path(docx_path.name), digest, docx, dump)
+
+    def get(self, digest: str) -> PassportResult | None:
+        with self._lock:
+            result = self._memory.get(digest)
+            if result is not None:
+                self._memory.move_to_end(digest)
+            elif self._directory is not None and (result := self._get_disk(digest)) is not None:
+                self._put_memory(result)
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return result
+
+    def put(self, result: PassportResult):
+        with self._lock:
+            self._put_memory(result)
+            if self._directory is not None:
+                try:
+                    self._put_disk(result)
+                except OSError as exc:
+                    logger.warning(f'Ошибка записи результата {result.digest} в кэш: {exc}')
+
+    def get_or_create(self, filename: str | Path, content: bytes) -> PassportResult:
+        """
+        Возвращает результат проверки паспорта из кэша или проверяет паспорт и добавляет результат в кэш.
+        :param filename: Имя файла паспорта. Не входит в ключ кэша.
+        :param content: Содержимое docx.
+        """
+        digest = get_digest(content)
+        result = self.get(digest)
+        if result is not None:
+            return replace(result, filename=Path(filename), cached=True)
+        result = validate_passport(filename, content, digest)
+        self.put(result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self._directory is not None:
+                for digest in self._disk:
+                    for path in self._get_paths(digest):
+                        path.unlink(missing_ok=True)
+            self._disk.clear()
+            self._disk_bytes = 0
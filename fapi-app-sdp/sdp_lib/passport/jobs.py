@@ -0,0 +1,363 @@
+"""
+Фоновая проверка паспортов: очередь заданий с отслеживанием хода проверки.
+
+Задание создаётся сразу после загрузки файлов (submit), проверка выполняется
+обработчиками очереди в PassportValidationPool, поэтому время ответа на загрузку
+не зависит от количества и размера файлов. Ход проверки доступен по идентификатору
+задания (get, iter_progress), по завершении результат (docx или zip) и описание
+задания (job.json) сохраняются в каталоге задания и доступны после перезапуска сервиса.
+Очередь ограничена max_queued_jobs и суммарным размером файлов незавершённых заданий
+max_queued_bytes (содержимое файлов хранится в памяти до завершения задания),
+завершённые задания удаляются через ttl секунд.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from collections.abc import AsyncIterator, Container, Sequence
+from dataclasses import dataclass, field
+from enum import StrEnum
+from pathlib import Path
+from typing import Any
+from zipfile import ZIP_STORED, ZipFile
+
+from sdp_lib.passport.cache import PassportResult
+from sdp_lib.passport.pool import PassportValidationPool, PassportValidationTimeoutError
+
+
+logger = logging.getLogger(__name__)
+
+JOB_FILENAME = 'job.json'
+
+
+class JobQueueFullError(Exception):
+    pass
+
+
+class JobStatus(StrEnum):
+    queued = 'queued'
+    running = 'running'
+    done = 'done'
+    failed = 'failed'
+
+
+class JobFileStatus(StrEnum):
+    queued = 'queued'
+    done = 'done'
+    invalid = 'invalid'
+    timeout = 'timeout'
+
+
+@dataclass(slots=True)
+class JobFile:
+    filename: str
+    status: JobFileStatus = JobFileStatus.queued
+    digest: str | None = None
+    cached: bool = False
+    error: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            'filename': self.filename,
+            'status': str(self.status),
+            'digest': self.digest,
+            'cached': self.cached,
+            'error': self.error,
+        }
+
+
+@dataclass(slots=True)
+class Job:
+    """
+    Задание проверки паспортов.
+    artifact -> имя файла результата в каталоге задания (docx для одного файла, иначе zip).
+    version -> увеличивается при каждом изменении состояния, используется для отслеживания хода проверки.
+    """
+    id: str
+    files: list[JobFile]
+    status: JobStatus = JobStatus.queued
+    created: float = field(default_factory=time.time)
+    finished: float | None = None
+    artifact: str | None = None
+    error: str | None = None
+    version: int = 0
+    contents: list[bytes] | None = field(default=None, repr=False)
+    changed: asyncio.Condition | None = field(default=None, repr=False)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JobStatus.done, JobStatus.failed)
+
+    @property
+    def num_processed(self) -> int:
+        return sum(f.status != JobFileStatus.queued for f in self.files)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            'id': self.id,
+            'status': str(self.status),
+            'created': self.created,
+            'finished': self.finished,
+            'processed': self.num_processed,
+            'total': len(self.files),
+            'artifact': self.artifact,
+            'error': self.error,
+            'files': [f.as_dict() for f in self.files],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'Job':
+        return cls(
+            id=data['id'],
+            files=[
+                JobFile(f['filename'], JobFileStatus(f['status']), f['digest'], f['cached'], f['error'])
+                for f in data['files']
+            ],
+            status=JobStatus(data['status']),
+            created=data['created'],
+            finished=data['finished'],
+            artifact=data['artifact'],
+            error=data['error'],
+        )
+
+
+class PassportJobQueue:
+    """
+    Очередь заданий проверки паспортов с num_workers обработчиками в цикле событий.
+    Файлы каждого задания проверяются параллельно в пуле pool.
+    Завершённые задания сохраняются в directory/<id>.
+    """
+
+    def __init__(
+            self,
+            pool: PassportValidationPool,
+            directory: str | os.PathLike,
+            max_queued_jobs: int = 100,
+            num_workers: int = 2,
+            ttl: float = 24 * 60 * 60,
+            max_queued_bytes: int = 512 * 1024 * 1024,
+    ):
+        self._pool = pool
+        self._directory = Path(directory)
+        self._max_queued_jobs = max_queued_jobs
+        self._num_workers = num_workers
+        self._ttl = ttl
+        self._max_queued_bytes = max_queued_bytes
+        self._queued_bytes = 0
+        self._jobs: dict[str, Job] = {}
+        self._queue: asyncio.Queue[Job] | None = None
+        self._workers: list[asyncio.Task] = []
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(directory={self._directory} jobs={len(self._jobs)} '
+                f'queued={self._queue.qsize() if self._queue is not None else 0} '
+                f'queued_bytes={self._queued_bytes} workers={len(self._workers)})')
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl
+
+    @property
+    def queued_bytes(self) -> int:
+        return self._queued_bytes
+
+    def start(self):
+        """ Запускает обработчики очереди. Вызывается в работающем цикле событий. """
+        if self._workers:
+            return
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._queue = asyncio.Queue(maxsize=self._max_queued_jobs)
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self._num_workers)]
+
+    async def stop(self):
+        """ Останавливает обработчики. Незавершённые задания не сохраняются. """
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        self._queue = None
+        for job in self._jobs.values():
+            self._release_contents(job)
+
+    def submit(self, files: Sequence[tuple[str, bytes]]) -> Job:
+        """
+        Добавляет задание в очередь.
+        :param files: Последовательность пар (имя файла, содержимое docx).
+        :return: Экземпляр Job.
+        :raises JobQueueFullError: Очередь заполнена или превышен суммарный размер файлов в очереди.
+        """
+        if self._queue is None:
+            raise RuntimeError('Очередь заданий не запущена')
+        size = sum(len(content) for _, content in files)
+        if self._queued_bytes + size > self._max_queued_bytes:
+            raise JobQueueFullError(f'Превышен размер файлов в очереди заданий: {self._max_queued_bytes} байт')
+        job = Job(
+            uuid.uuid4().hex,
+            [JobFile(str(filename)) for filename, _ in files],
+            contents=[content for _, content in files],
+            changed=asyncio.Condition(),
+        )
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFullError(f'Очередь заданий заполнена: {self._max_queued_jobs}') from None
+        self._queued_bytes += size
+        self._jobs[job.id] = job
+        return job
+
+    def _release_contents(self, job: Job):
+        """ Освобождает содержимое файлов задания и его место в max_queued_bytes. """
+        if job.contents is not None:
+            self._queued_bytes -= sum(len(content) for content in job.contents)
+            job.contents = None
+
+    def _get_job_dir(self, job_id: str) -> Path:
+        return self._directory / job_id
+
+    def _load_job(self, job_id: str) -> Job | None:
+        try:
+            return Job.from_dict(json.loads((self._get_job_dir(job_id) / JOB_FILENAME).read_bytes()))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    async def get(self, job_id: str) -> Job | None:
+        """
+        Возвращает задание из памяти или описание завершённого задания из каталога заданий.
+        """
+        job = self._jobs.get(job_id)
+        if job is not None or not job_id.isalnum():
+            return job
+        job = await asyncio.to_thread(self._load_job, job_id)
+        if job is not None:
+            self._jobs.setdefault(job.id, job)
+        return job
+
+    def get_artifact_path(self, job: Job) -> Path | None:
+        if job.artifact is None:
+            return None
+        return self._get_job_dir(job.id) / job.artifact
+
+    async def _notify(self, job: Job):
+        job.version += 1
+        if job.changed is not None:
+            async with job.changed:
+                job.changed.notify_all()
+
+    async def iter_progress(self, job: Job) -> AsyncIterator[dict[str, Any]]:
+        """
+        Возвращает состояние задания при каждом изменении, последнее - состояние завершённого задания.
+        """
+        version = job.version
+        yield job.as_dict()
+        while not job.is_finished and job.changed is not None:
+            async with job.changed:
+                await job.changed.wait_for(lambda: job.version != version)
+            version = job.version
+            yield job.as_dict()
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            except Exception as exc:
+                logger.exception(f'Ошибка выполнения задания {job.id}')
+                job.status, job.error = JobStatus.failed, repr(exc)
+                job.finished = time.time()
+                await asyncio.to_thread(self._save_job, job)
+                await self._notify(job)
+            finally:
+                self._release_contents(job)
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        job.status = JobStatus.running
+        await self._notify(job)
+        results: list[PassportResult | None] = [None] * len(job.files)
+        files = [(f.filename, content) for f, content in zip(job.files, job.contents)]
+        async for i, result in self._pool.iter_validate(files):
+            job_file = job.files[i]
+            if isinstance(result, PassportValidationTimeoutError):
+                job_file.status, job_file.error = JobFileStatus.timeout, str(result)
+            elif isinstance(result, Exception):
+                job_file.status, job_file.error = JobFileStatus.invalid, 'Invalid document type'
+            else:
+                results[i] = result
+                job_file.status, job_file.digest, job_file.cached = JobFileStatus.done, result.digest, result.cached
+            await self._notify(job)
+        await asyncio.to_thread(self._save_artifact, job, [r for r in results if r is not None])
+        job.status, job.finished = JobStatus.done, time.time()
+        await asyncio.to_thread(self._save_job, job)
+        await self._notify(job)
+
+    def _save_artifact(self, job: Job, results: Sequence[PassportResult]):
+        """ Сохраняет docx с отмеченными ошибками: один файл - docx, несколько - zip. """
+        if not results:
+            return
+        job_dir = self._get_job_dir(job.id)
+        job_dir.mkdir(parents=True, exist_ok=True)
+        if len(results) == 1:
+            job.artifact = 'result.docx'
+            (job_dir / job.artifact).write_bytes(results[0].docx)
+            return
+        job.artifact = 'results.zip'
+        # docx уже сжат, поэтому записи сохраняются без сжатия.
+        with ZipFile(job_dir / job.artifact, 'w', compression=ZIP_STORED) as obj_zip:
+            for result in results:
+                obj_zip.writestr(str(result.filename), result.docx)
+
+    def _save_job(self, job: Job):
+        """ Сохраняет описание задания. Наличие job.json означает, что результат задания сохранён полностью. """
+        job_dir = self._get_job_dir(job.id)
+        job_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = job_dir / f'{JOB_FILENAME}.tmp'
+        tmp_path.write_text(json.dumps(job.as_dict(), ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp_path, job_dir / JOB_FILENAME)
+
+    def remove_expired_dirs(self, exclude: Container[str] = ()) -> int:
+        """
+        Удаляет каталоги заданий, описание которых сохранено более ttl секунд назад,
+        а также каталоги без описания задания (прерванные перезапуском сервиса).
+        :param exclude: Идентификаторы выполняемых заданий.
+        :return: Количество удалённых каталогов.
+        """
+        deadline = time.time() - self._ttl
+        removed = 0
+        if not self._directory.exists():
+            return removed
+        for path in self._directory.iterdir():
+            if path.name in exclude:
+                continue
+            try:
+                job_path = path / JOB_FILENAME
+                mtime = job_path.stat().st_mtime if job_path.exists() else path.stat().st_mtime
+                if mtime < deadline:
+                    shutil.rmtree(path)
+                    removed += 1
+            except OSError as exc:
+                logger.warning(f'Ошибка удаления задания {path}: {exc}')
+        return removed
+
+    async def remove_expired(self) -> int:
+        """
+        Удаляет завершённые задания старше ttl секунд из памяти и каталога заданий.
+        :return: Количество удалённых каталогов.
+        """
+        deadline = time.time() - self._ttl
+        for job_id, job in list(self._jobs.items()):
+            if job.is_finished and job.finished < deadline:
+                del self._jobs[job_id]
+        active = {job_id for job_id, job in self._jobs.items() if not job.is_finished}
+        return await asyncio.to_thread(self.remove_expired_dirs, active)
+
+    async def run_cleanup(self, interval: float):
+        """ Периодически удаляет устаревшие задания. """
+        while True:
+            removed = await self.remove_expired()
+            if removed:
+                logger.info(f'Удалено устаревших заданий проверки паспортов: {removed}')
+            await asyncio.sleep(interval)
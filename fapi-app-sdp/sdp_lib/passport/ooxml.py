@@ -0,0 +1,398 @@
+"""
+Чтение таблиц паспорта напрямую из word/document.xml без построения объектов python-docx.
+
+word/document.xml читается потоково (lxml.etree.iterparse), в памяти находится только
+текущая таблица верхнего уровня. Для таблиц, отобранных по тексту шапки, создаются лёгкие
+объекты XmlTable/XmlRow/XmlCell с тем же интерфейсом, который используют валидаторы
+(table.rows, row.cells, cell.text, cell.paragraphs[0].runs[0].font.color.rgb, table.add_row()),
+поэтому валидаторы и CellMapping работают без изменений.
+
+Изменения ячеек не применяются сразу, а записываются. При сохранении (OoxmlDocument.save)
+document.xml разбирается один раз и изменяются только затронутые ячейки, остальные части
+архива копируются без изменений. Если изменений нет, исходный файл копируется как есть.
+
+Текст ячеек формируется так же, как в python-docx: абзацы ячейки через '\\n',
+в абзаце учитываются w:r и w:hyperlink. Объединённые ячейки (gridSpan, vMerge)
+повторяются в строке так же, как в docx.table._Row.cells.
+"""
+
+import io
+import os
+import shutil
+import zipfile
+from collections.abc import Callable, Iterator, Sequence
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from docx.opc.oxml import serialize_part_xml
+from docx.oxml.ns import qn
+from docx.oxml.parser import parse_xml
+from docx.table import Table, _Cell
+from lxml import etree
+
+
+DOCUMENT_XML = 'word/document.xml'
+
+W_BODY = qn('w:body')
+W_TBL = qn('w:tbl')
+W_TBL_GRID = qn('w:tblGrid')
+W_GRID_COL = qn('w:gridCol')
+W_TR = qn('w:tr')
+W_TR_PR = qn('w:trPr')
+W_GRID_BEFORE = qn('w:gridBefore')
+W_TC = qn('w:tc')
+W_TC_PR = qn('w:tcPr')
+W_GRID_SPAN = qn('w:gridSpan')
+W_V_MERGE = qn('w:vMerge')
+W_P = qn('w:p')
+W_R = qn('w:r')
+W_HYPERLINK = qn('w:hyperlink')
+W_T = qn('w:t')
+W_TAB = qn('w:tab')
+W_PTAB = qn('w:ptab')
+W_BR = qn('w:br')
+W_CR = qn('w:cr')
+W_NO_BREAK_HYPHEN = qn('w:noBreakHyphen')
+W_TYPE = qn('w:type')
+W_VAL = qn('w:val')
+
+_run_chars = {W_TAB: '\t', W_PTAB: '\t', W_CR: '\n', W_NO_BREAK_HYPHEN: '-'}
+
+
+def _get_run_text(r: etree._Element) -> str:
+    chars = []
+    for e in r:
+        if e.tag == W_T:
+            chars.append(e.text or '')
+        elif e.tag == W_BR:
+            chars.append('\n' if e.get(W_TYPE, 'textWrapping') == 'textWrapping' else '')
+        elif (char := _run_chars.get(e.tag)) is not None:
+            chars.append(char)
+    return ''.join(chars)
+
+
+def _get_paragraph_text(p: etree._Element) -> str:
+    chars = []
+    for e in p:
+        if e.tag == W_R:
+            chars.append(_get_run_text(e))
+        elif e.tag == W_HYPERLINK:
+            chars.extend(_get_run_text(r) for r in e.iterchildren(W_R))
+    return ''.join(chars)
+
+
+def get_tc_text(tc: etree._Element) -> str:
+    """ Текст ячейки w:tc, аналогичный docx.table._Cell.text. """
+    return '\n'.join(_get_paragraph_text(p) for p in tc.iterchildren(W_P))
+
+
+def _get_int_val(parent: etree._Element | None, tag: str, default: int) -> int:
+    e = parent.find(tag) if parent is not None else None
+    return int(e.get(W_VAL)) if e is not None and e.get(W_VAL) is not None else default
+
+
+def _is_v_merge_continue(tc: etree._Element) -> bool:
+    tc_pr = tc.find(W_TC_PR)
+    v_merge = tc_pr.find(W_V_MERGE) if tc_pr is not None else None
+    return v_merge is not None and v_merge.get(W_VAL, 'continue') == 'continue'
+
+
+class _Recorder:
+    """
+    Объект для цепочек cell.paragraphs[0].runs[0].font.color.rgb и
+    cell.paragraphs[0].paragraph_format.alignment: присвоения записываются в ячейку.
+    """
+    __slots__ = ('_cell',)
+
+    def __init__(self, cell: 'XmlCell'):
+        self._cell = cell
+
+    @property
+    def runs(self):
+        return [self]
+
+    @property
+    def font(self):
+        return self
+
+    @property
+    def color(self):
+        return self
+
+    @property
+    def paragraph_format(self):
+        return self
+
+    @property
+    def rgb(self):
+        raise AttributeError('rgb доступен только для записи')
+
+    @rgb.setter
+    def rgb(self, value):
+        self._cell.record('rgb', value)
+
+    @property
+    def alignment(self):
+        raise AttributeError('alignment доступен только для записи')
+
+    @alignment.setter
+    def alignment(self, value):
+        self._cell.record('alignment', value)
+
+
+class XmlCell:
+    """
+    Ячейка таблицы: текст и записанные изменения.
+    i_row, i_tc -> индексы w:tr в таблице и w:tc в строке.
+    """
+    __slots__ = ('i_row', 'i_tc', '_text', '_src_text', 'patches')
+
+    def __init__(self, i_row: int, i_tc: int, text: str):
+        self.i_row = i_row
+        self.i_tc = i_tc
+        self._text = self._src_text = text
+        self.patches: list[tuple[str, Any]] = []
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(i_row={self.i_row} i_tc={self.i_tc} text={self._text!r})'
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    @text.setter
+    def text(self, value: str):
+        self._text = value
+        # Присвоение исходного текста не изменяет документ и не записывается,
+        # форматирование таких ячеек сохраняется.
+        if value == self._src_text and not self.patches:
+            return
+        self.patches.append(('text', value))
+
+    @property
+    def paragraphs(self):
+        return [_Recorder(self)]
+
+    def record(self, name: str, value: Any):
+        if not self.patches:
+            # Форматирование задаётся для первого прогона, как после присвоения cell.text в python-docx.
+            self.patches.append(('text', self._text))
+        self.patches.append((name, value))
+
+    @property
+    def is_touched(self) -> bool:
+        return bool(self.patches)
+
+
+class XmlRow:
+    __slots__ = ('cells',)
+
+    def __init__(self, cells: Sequence[XmlCell]):
+        self.cells = tuple(cells)
+
+
+class _XmlRows(Sequence):
+    """ Строки таблицы. Объекты строк создаются при первом обращении. """
+
+    def __init__(self, table: 'XmlTable', trs: list[etree._Element]):
+        self._table = table
+        self._trs = trs
+        self._rows: list[XmlRow | None] = [None] * len(trs)
+        self._grids: list[dict[int, tuple[int, etree._Element]] | None] = [None] * len(trs)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if self._rows[i] is None:
+            self._rows[i] = self._create_row(i)
+        return self._rows[i]
+
+    def append(self, row: XmlRow):
+        self._rows.append(row)
+
+    def _get_grid(self, i_row: int) -> dict[int, tuple[int, etree._Element]]:
+        """ Смещение в сетке таблицы -> (индекс w:tc, w:tc) для строки i_row. """
+        if self._grids[i_row] is None:
+            tr = self._trs[i_row]
+            offset = _get_int_val(tr.find(W_TR_PR), W_GRID_BEFORE, 0)
+            grid = {}
+            for i_tc, tc in enumerate(tr.iterchildren(W_TC)):
+                grid[offset] = i_tc, tc
+                offset += _get_int_val(tc.find(W_TC_PR), W_GRID_SPAN, 1)
+            self._grids[i_row] = grid
+        return self._grids[i_row]
+
+    def _get_root_cell(self, i_row: int, offset: int) -> tuple[XmlCell, int] | None:
+        """ Ячейка, содержащая текст для позиции сетки (с учётом vMerge), и её gridSpan. """
+        while True:
+            found = self._get_grid(i_row).get(offset)
+            if found is None:
+                return None
+            i_tc, tc = found
+            if not _is_v_merge_continue(tc) or i_row == 0:
+                return self._table.get_cell(i_row, i_tc, tc), _get_int_val(tc.find(W_TC_PR), W_GRID_SPAN, 1)
+            i_row -= 1
+
+    def _create_row(self, i_row: int) -> XmlRow:
+        cells = []
+        for offset in self._get_grid(i_row):
+            root = self._get_root_cell(i_row, offset)
+            if root is not None:
+                cell, span = root
+                cells.extend(cell for _ in range(span))
+        return XmlRow(cells)
+
+
+class XmlTable:
+    """
+    Таблица верхнего уровня document.xml с интерфейсом docx.table.Table, необходимым валидаторам.
+    """
+
+    def __init__(self, i_table: int, tbl: etree._Element):
+        self.i_table = i_table
+        grid = tbl.find(W_TBL_GRID)
+        self._num_columns = len(grid.findall(W_GRID_COL)) if grid is not None else 0
+        self._cells: dict[tuple[int, int], XmlCell] = {}
+        self.num_added_rows = 0
+        self.rows = _XmlRows(self, tbl.findall(W_TR))
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(i_table={self.i_table} rows={len(self.rows)} columns={self._num_columns})'
+
+    @property
+    def columns(self) -> range:
+        return range(self._num_columns)
+
+    def get_cell(self, i_row: int, i_tc: int, tc: etree._Element) -> XmlCell:
+        cell = self._cells.get((i_row, i_tc))
+        if cell is None:
+            cell = self._cells[(i_row, i_tc)] = XmlCell(i_row, i_tc, get_tc_text(tc))
+        return cell
+
+    def add_row(self) -> XmlRow:
+        """ Добавляет пустую строку из ячеек по количеству колонок, как docx.table.Table.add_row(). """
+        i_row = len(self.rows)
+        cells = [XmlCell(i_row, i_tc, '') for i_tc in range(self._num_columns)]
+        for cell in cells:
+            self._cells[(i_row, cell.i_tc)] = cell
+        row = XmlRow(cells)
+        self.rows.append(row)
+        self.num_added_rows += 1
+        return row
+
+    @property
+    def touched_cells(self) -> list[XmlCell]:
+        return [cell for cell in self._cells.values() if cell.is_touched]
+
+
+def iter_body_tables(source: BinaryIO) -> Iterator[tuple[int, etree._Element]]:
+    """
+    Потоково перебирает таблицы верхнего уровня document.xml (как docx.Document.tables).
+    Элемент таблицы действителен до перехода к следующей таблице, затем удаляется из памяти.
+    :return: Пары (индекс таблицы, элемент w:tbl).
+    """
+    context = etree.iterparse(
+        source, events=('end',), tag=W_TBL, resolve_entities=False, no_network=True, huge_tree=False
+    )
+    i_table = 0
+    for _, tbl in context:
+        parent = tbl.getparent()
+        if parent is None or parent.tag != W_BODY:
+            continue
+        yield i_table, tbl
+        i_table += 1
+        tbl.clear()
+        while tbl.getprevious() is not None:
+            del parent[0]
+
+
+class OoxmlDocument:
+    """
+    Документ docx для проверки без python-docx Document.
+    Поддерживает save() для формирования документа с изменёнными ячейками.
+    """
+
+    def __init__(self, source: bytes | str | os.PathLike | BinaryIO):
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        self._source = source
+        self._zip = zipfile.ZipFile(source)
+        self.tables: dict[int, XmlTable] = {}
+
+    def iter_tables(self, predicate: Callable[[_XmlRows], bool] = None) -> Iterator[XmlTable]:
+        """
+        Возвращает таблицы, для строк которых predicate возвращает True. Предикат получает
+        строки таблицы и обычно проверяет только шапку, остальные строки не создаются.
+        Возвращённые таблицы запоминаются для сохранения изменений.
+        """
+        with self._zip.open(DOCUMENT_XML) as document_xml:
+            for i_table, tbl in iter_body_tables(document_xml):
+                table = XmlTable(i_table, tbl)
+                if predicate is None or predicate(table.rows):
+                    self.tables[i_table] = table
+                    yield table
+
+    @property
+    def is_modified(self) -> bool:
+        return any(table.num_added_rows or table.touched_cells for table in self.tables.values())
+
+    def _create_patched_document_xml(self) -> bytes:
+        root = parse_xml(self._zip.read(DOCUMENT_XML))
+        body_tables = root.find(W_BODY).findall(W_TBL)
+        for i_table, table in self.tables.items():
+            tbl = body_tables[i_table]
+            docx_table = Table(tbl, None)
+            for _ in range(table.num_added_rows):
+                docx_table.add_row()
+            trs = tbl.tr_lst
+            for cell in table.touched_cells:
+                docx_cell = _Cell(trs[cell.i_row].tc_lst[cell.i_tc], docx_table)
+                for name, value in cell.patches:
+                    if name == 'text':
+                        docx_cell.text = value
+                    elif name == 'rgb':
+                        docx_cell.paragraphs[0].runs[0].font.color.rgb = value
+                    elif name == 'alignment':
+                        docx_cell.paragraphs[0].paragraph_format.alignment = value
+        return serialize_part_xml(root)
+
+    def save(self, target: str | os.PathLike | BinaryIO):
+        """
+        Сохраняет документ. Если изменений нет, исходный архив копируется без изменений.
+        """
+        if isinstance(target, (str, os.PathLike)):
+            with open(target, 'wb') as f:
+                return self.save(f)
+        if not self.is_modified:
+            if isinstance(self._source, (str, os.PathLike)):
+                with open(self._source, 'rb') as src:
+                    shutil.copyfileobj(src, target)
+            else:
+                self._source.seek(0)
+                shutil.copyfileobj(self._source, target)
+            return
+        document_xml = self._create_patched_document_xml()
+        with zipfile.ZipFile(target, 'w', compression=zipfile.ZIP_DEFLATED) as dst:
+            for info in self._zip.infolist():
+                dst.writestr(info, document_xml if info.filename == DOCUMENT_XML else self._zip.read(info))
+
+    def close(self):
+        self._zip.close()
+
+
+if __name__ == '__main__':
+    import sys
+    import time
+
+    from sdp_lib.passport.validation.common_validators import check_is_directions_table
+
+    start = time.perf_counter()
+    doc = OoxmlDocument(Path(sys.argv[1]))
+    for t in doc.iter_tables(check_is_directions_table):
+        print(t, [c.text for c in t.rows[1].cells])
+    print(f'{time.perf_counter() - start:.3f} сек')
@@ -30,6 +30,6 @@ class Passport:
     def dump(self):
         return {
             'tables': {
-                'directions': self._direction_table.dump()
+                'directions': self._direction_table.dump() if self._direction_table is not None else None
             }
         }
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""
+Проверка паспортов в пуле процессов.
+
+Разбор docx, проверка таблиц и сохранение docx с отмеченными ошибками выполняются
+в процессах пула, цикл событий не блокируется, файлы одной загрузки проверяются
+параллельно на всех ядрах. Количество одновременно проверяемых файлов ограничено
+max_concurrency для всех запросов, время проверки каждого файла - timeout.
+"""
+
+import asyncio
+import logging
+import os
+from collections.abc import AsyncIterator, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+
+from sdp_lib.passport.cache import PassportResult, PassportResultCache, get_digest, validate_passport
+
+
+logger = logging.getLogger(__name__)
+
+
+class PassportValidationTimeoutError(TimeoutError):
+    pass
+
+
+class PassportValidationPool:
+    """
+    Пул процессов для проверки паспортов с кэшем результатов cache.
+    Пул создаётся при первой проверке.
+    При превышении timeout результат файла не ожидается, но процесс пула
+    завершает проверку этого файла, прервать её невозможно.
+    """
+
+    def __init__(
+            self,
+            max_workers: int | None = None,
+            max_concurrency: int | None = None,
+            timeout: float = 60.,
+            cache: PassportResultCache | None = None,
+            executor: Executor | None = None,
+    ):
+        self._max_workers = max_workers or min(os.cpu_count() or 1, 8)
+        self._max_concurrency = max_concurrency or self._max_workers * 2
+        self._timeout = timeout
+        self._cache = cache
+        self._executor = executor
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(max_workers={self._max_workers} '
+                f'max_concurrency={self._max_concurrency} timeout={self._timeout})')
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+        return self._executor
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        return self._semaphore
+
+    async def validate(self, filename: str | Path, content: bytes) -> PassportResult:
+        """
+        Возвращает результат проверки паспорта из кэша или проверяет паспорт в процессе пула.
+        :raises PassportValidationTimeoutError: Проверка не завершилась за timeout секунд.
+        """
+        digest = get_digest(content)
+        if self._cache is not None:
+            result = await asyncio.to_thread(self._cache.get, digest)
+            if result is not None:
+                return PassportResult(Path(filename), digest, result.docx, result.dump, cached=True)
+
+        loop = asyncio.get_running_loop()
+        async with self.semaphore:
+            future = loop.run_in_executor(self.executor, validate_passport, filename, content, digest)
+            try:
+                result = await asyncio.wait_for(future, self._timeout)
+            except asyncio.TimeoutError:
+                raise PassportValidationTimeoutError(
+                    f'Превышено время проверки файла {filename}: {self._timeout} сек'
+                ) from None
+        if self._cache is not None:
+            await asyncio.to_thread(self._cache.put, result)
+        return result
+
+    async def _validate_indexed(self, i: int, filename: str | Path, content: bytes):
+        try:
+            return i, await self.validate(filename, content)
+        except Exception as exc:
+            if not isinstance(exc, PassportValidationTimeoutError):
+                logger.debug(f'Ошибка проверки файла {filename}: {exc!r}')
+            return i, exc
+
+    async def iter_validate(
+            self,
+            files: Sequence[tuple[str | Path, bytes]]
+    ) -> AsyncIterator[tuple[int, PassportResult | Exception]]:
+        """
+        Проверяет файлы параллельно и возвращает результаты по мере готовности.
+        :param files: Последовательность пар (имя файла, содержимое docx).
+        :return: Пары (индекс файла в files, PassportResult или исключение).
+        """
+        tasks = [asyncio.ensure_future(self._validate_indexed(i, *f)) for i, f in enumerate(files)]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
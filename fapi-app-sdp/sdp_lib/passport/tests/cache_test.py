@@ -0,0 +1,123 @@
+import io
+import os
+import tempfile
+import time
+from pathlib import Path
+from unittest import TestCase, main, mock
+
+from docx import Document
+
+from sdp_lib.passport import cache as cache_module
+from sdp_lib.passport.cache import CACHE_VERSION, PassportResult, PassportResultCache, get_digest
+
+
+def create_result(content: bytes, size: int = 100, version: str = CACHE_VERSION) -> PassportResult:
+    return PassportResult(Path(f'{content.decode()}.docx'), get_digest(content, version), content * size, {'n': 1})
+
+
+def create_docx_with_bad_directions_table() -> bytes:
+    """ docx с таблицей направлений из 4 столбцов: строки таблицы не разбираются из-за ошибки геометрии. """
+    doc = Document()
+    table = doc.add_table(rows=3, cols=4)
+    for i, row in enumerate((
+            ('Направления', '', '', ''),
+            ('№ направления', 'Тип направления', 'Фазы', ''),
+            ('1', 'Транспортное', '1', ''),
+    )):
+        for j, text in enumerate(row):
+            table.cell(i, j).text = text
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+class TestPassportResultCache(TestCase):
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp_dir.name)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_memory_lru_eviction(self):
+        cache = PassportResultCache(max_memory_bytes=250)
+        a, b, c = create_result(b'a'), create_result(b'b'), create_result(b'c')
+        cache.put(a)
+        cache.put(b)
+        # Обращение к a делает b самым давно использованным.
+        self.assertEqual(cache.get(a.digest), a)
+        cache.put(c)
+        self.assertIsNone(cache.get(b.digest))
+        self.assertEqual(cache.get(a.digest), a)
+        self.assertEqual(cache.get(c.digest), c)
+        # Результат больше max_memory_bytes в памяти не хранится.
+        cache.put(create_result(b'd', 300))
+        self.assertIsNone(cache.get(get_digest(b'd')))
+        self.assertEqual((cache.hits, cache.misses), (3, 2))
+
+    def test_disk_lru_eviction(self):
+        a, b, c = create_result(b'a'), create_result(b'b'), create_result(b'c')
+        entry_size = a.size + len(b'{"n": 1}')
+        cache = PassportResultCache(self.directory, max_memory_bytes=0, max_disk_bytes=entry_size * 2)
+        cache.put(a)
+        cache.put(b)
+        self.assertEqual(cache.get(a.digest).docx, a.docx)
+        cache.put(c)
+        self.assertEqual(sorted(p.stem for p in self.directory.glob('*.docx')), sorted([a.digest, c.digest]))
+        self.assertFalse((self.directory / f'{b.digest}.json').exists())
+        self.assertIsNone(cache.get(b.digest))
+
+    def test_reload_disk_index(self):
+        cache = PassportResultCache(self.directory)
+        results = [create_result(b'a'), create_result(b'b'), create_result(b'c')]
+        for i, result in enumerate(results):
+            cache.put(result)
+            mtime = time.time() - 100 + i
+            os.utime(self.directory / f'{result.digest}.docx', (mtime, mtime))
+        # docx без json(прерванная запись) при загрузке удаляется.
+        (self.directory / f'{get_digest(b"x")}.docx').write_bytes(b'x')
+
+        reloaded = PassportResultCache(self.directory, max_memory_bytes=0)
+        self.assertFalse((self.directory / f'{get_digest(b"x")}.docx').exists())
+        result = reloaded.get(results[1].digest)
+        self.assertEqual((result.digest, result.docx, result.dump), (results[1].digest, results[1].docx, {'n': 1}))
+        # Порядок LRU восстанавливается по времени изменения файлов: первым вытесняется самый старый.
+        entry_size = results[0].size + len(b'{"n": 1}')
+        limited = PassportResultCache(self.directory, max_memory_bytes=0, max_disk_bytes=entry_size * 2)
+        self.assertIsNone(limited.get(results[0].digest))
+        self.assertIsNotNone(limited.get(results[2].digest))
+
+    def test_version_invalidation(self):
+        cache = PassportResultCache(self.directory)
+        cache.put(create_result(b'a', version='1'))
+        self.assertNotEqual(get_digest(b'a', '1'), get_digest(b'a'))
+        self.assertIsNone(PassportResultCache(self.directory).get(get_digest(b'a')))
+        validated = create_result(b'a')
+        with mock.patch('sdp_lib.passport.cache.validate_passport', return_value=validated) as validate_passport:
+            self.assertEqual(cache.get_or_create('a.docx', b'a'), validated)
+            result = cache.get_or_create('renamed.docx', b'a')
+        validate_passport.assert_called_once()
+        self.assertTrue(result.cached)
+        self.assertEqual(result.filename, Path('renamed.docx'))
+
+    def test_invalid_directions_table(self):
+        content = create_docx_with_bad_directions_table()
+        for use_ooxml_reader in (True, False):
+            with self.subTest(use_ooxml_reader=use_ooxml_reader), \
+                    mock.patch.object(cache_module, 'use_ooxml_reader', use_ooxml_reader):
+                cache = PassportResultCache(self.directory / str(use_ooxml_reader))
+                result = cache.get_or_create('bad.docx', content)
+                directions = result.dump['tables']['directions']
+                self.assertFalse(directions['geometry']['ok'])
+                self.assertEqual((directions['head_rows'], directions['data_rows']), ([], []))
+                # В docx результата к таблице добавлена строка с ошибкой.
+                rows = Document(io.BytesIO(result.docx)).tables[0].rows
+                self.assertEqual(len(rows), 4)
+                self.assertTrue(rows[-1].cells[0].text.startswith('*'))
+                reloaded = PassportResultCache(self.directory / str(use_ooxml_reader)).get(result.digest)
+                self.assertEqual(reloaded.dump['tables'], {'directions': directions})
+
+
+if __name__ == '__main__':
+    main()
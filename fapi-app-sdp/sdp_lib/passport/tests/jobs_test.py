@@ -0,0 +1,135 @@
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+from unittest import TestCase, main
+from zipfile import ZipFile
+
+from sdp_lib.passport.cache import PassportResult, get_digest
+from sdp_lib.passport.jobs import JOB_FILENAME, JobFileStatus, JobQueueFullError, JobStatus, PassportJobQueue
+
+
+class FakeValidationPool:
+    """
+    Пул проверки для тестов: b'bad' - ошибка проверки, иначе docx результата равен содержимому файла.
+    Проверка каждого файла ожидает события gate.
+    """
+
+    def __init__(self):
+        self.gate: asyncio.Event | None = None
+
+    async def iter_validate(self, files):
+        for i, (filename, content) in enumerate(files):
+            if self.gate is not None:
+                await self.gate.wait()
+            if content == b'bad':
+                yield i, ValueError(filename)
+            else:
+                yield i, PassportResult(Path(filename), get_digest(content), content, {'filename': filename})
+
+
+class TestPassportJobQueue(TestCase):
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp_dir.name)
+        self.pool = FakeValidationPool()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def create_queue(self, **kwargs) -> PassportJobQueue:
+        return PassportJobQueue(self.pool, self.directory, num_workers=1, **kwargs)
+
+    def run_with_queue(self, queue: PassportJobQueue, coro_func):
+        async def run():
+            queue.start()
+            try:
+                return await coro_func()
+            finally:
+                await queue.stop()
+        return asyncio.run(run())
+
+    def test_progress(self):
+        queue = self.create_queue()
+
+        async def run():
+            job = queue.submit([('a.docx', b'A'), ('b.docx', b'bad'), ('c.docx', b'C')])
+            return job, [state async for state in queue.iter_progress(job)]
+
+        job, states = self.run_with_queue(queue, run)
+        self.assertEqual(states[0]['status'], 'queued')
+        self.assertEqual(states[-1]['status'], 'done')
+        processed = [state['processed'] for state in states]
+        self.assertEqual(processed, sorted(processed))
+        self.assertEqual(processed[-1], 3)
+        self.assertEqual(
+            [f.status for f in job.files], [JobFileStatus.done, JobFileStatus.invalid, JobFileStatus.done]
+        )
+        self.assertIsNone(job.contents)
+        with ZipFile(queue.get_artifact_path(job)) as obj_zip:
+            self.assertEqual(obj_zip.namelist(), ['a.docx', 'c.docx'])
+            self.assertEqual(obj_zip.read('c.docx'), b'C')
+
+    def test_queued_bytes_limit(self):
+        queue = self.create_queue(max_queued_bytes=10)
+
+        async def run():
+            self.pool.gate = asyncio.Event()
+            job = queue.submit([('a.docx', b'A' * 6)])
+            with self.assertRaises(JobQueueFullError):
+                queue.submit([('b.docx', b'B' * 6)])
+            self.assertEqual(queue.queued_bytes, 6)
+            self.pool.gate.set()
+            async for _ in queue.iter_progress(job):
+                pass
+            await asyncio.sleep(0)
+            self.assertEqual(queue.queued_bytes, 0)
+            return queue.submit([('b.docx', b'B' * 6)])
+
+        job = self.run_with_queue(queue, run)
+        self.assertEqual(queue.queued_bytes, 0)
+        self.assertIsNone(job.contents)
+
+    def test_reload_after_restart(self):
+        queue = self.create_queue()
+
+        async def run():
+            job = queue.submit([('a.docx', b'A')])
+            async for _ in queue.iter_progress(job):
+                pass
+            return job
+
+        job = self.run_with_queue(queue, run)
+        reloaded = asyncio.run(self.create_queue().get(job.id))
+        self.assertEqual(reloaded.as_dict(), job.as_dict())
+        self.assertEqual(self.create_queue().get_artifact_path(reloaded).read_bytes(), b'A')
+        self.assertIsNone(asyncio.run(self.create_queue().get('unknown')))
+
+    def test_ttl_cleanup(self):
+        queue = self.create_queue(ttl=60)
+
+        async def run():
+            jobs = [queue.submit([('a.docx', b'A')]), queue.submit([('b.docx', b'B')])]
+            for job in jobs:
+                async for _ in queue.iter_progress(job):
+                    pass
+            return jobs
+
+        expired, fresh = self.run_with_queue(queue, run)
+        old = time.time() - 120
+        expired.finished = old
+        os.utime(self.directory / expired.id / JOB_FILENAME, (old, old))
+        interrupted_dir = self.directory / 'interrupted'
+        interrupted_dir.mkdir()
+        os.utime(interrupted_dir, (old, old))
+
+        self.assertEqual(asyncio.run(queue.remove_expired()), 2)
+        self.assertIsNone(asyncio.run(queue.get(expired.id)))
+        self.assertFalse(interrupted_dir.exists())
+        self.assertEqual(asyncio.run(queue.get(fresh.id)).status, JobStatus.done)
+
+
+if __name__ == '__main__':
+    main()
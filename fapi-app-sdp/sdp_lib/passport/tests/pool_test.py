@@ -0,0 +1,68 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import TestCase, main, mock
+
+from sdp_lib.passport.cache import PassportResult, PassportResultCache
+from sdp_lib.passport.pool import PassportValidationPool, PassportValidationTimeoutError
+
+
+def fake_validate_passport(filename, content, digest=None):
+    """ b'slow' - проверка дольше таймаута пула, b'bad' - ошибка разбора документа. """
+    if content == b'slow':
+        time.sleep(0.5)
+    elif content == b'bad':
+        raise ValueError('Invalid document type')
+    return PassportResult(Path(filename), digest, content.lower(), {'filename': str(filename)})
+
+
+class TestPassportValidationPool(TestCase):
+
+    def setUp(self) -> None:
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.cache = PassportResultCache()
+        self.pool = PassportValidationPool(timeout=0.1, cache=self.cache, executor=self.executor)
+        patcher = mock.patch('sdp_lib.passport.pool.validate_passport', side_effect=fake_validate_passport)
+        self.validate_passport = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        self.pool.close()
+
+    def iter_validate(self, files):
+        async def collect():
+            return dict([r async for r in self.pool.iter_validate(files)])
+        return asyncio.run(collect())
+
+    def test_results_and_errors(self):
+        results = self.iter_validate([('a.docx', b'A'), ('b.docx', b'bad'), ('c.docx', b'slow')])
+        self.assertEqual(results[0].docx, b'a')
+        self.assertFalse(results[0].cached)
+        self.assertIsInstance(results[1], ValueError)
+        self.assertIsInstance(results[2], PassportValidationTimeoutError)
+        # В кэш попадают только успешные результаты.
+        self.assertIsNotNone(self.cache.get(results[0].digest))
+        self.assertEqual(len(self.cache._memory), 1)
+
+    def test_timeout(self):
+        with self.assertRaises(PassportValidationTimeoutError):
+            asyncio.run(self.pool.validate('slow.docx', b'slow'))
+
+    def test_cache_hit(self):
+        first = asyncio.run(self.pool.validate('a.docx', b'A'))
+        second = asyncio.run(self.pool.validate('renamed.docx', b'A'))
+        self.assertEqual(self.validate_passport.call_count, 1)
+        self.assertTrue(second.cached)
+        self.assertEqual(second.filename, Path('renamed.docx'))
+        self.assertEqual((second.digest, second.docx), (first.digest, first.docx))
+
+    def test_close(self):
+        asyncio.run(self.pool.validate('a.docx', b'A'))
+        self.pool.close()
+        self.assertTrue(self.executor._shutdown)
+        self.assertIsNone(self.pool._executor)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,344 @@
+"""
+Скомпилированные валидаторы таблицы направлений.
+
+Шаблоны с псевдонимами (entity_patterns_and_aliases, toov_patterns) объединяются в одно
+регулярное выражение с именованными группами вместо перебора шаблонов для каждой ячейки.
+Ячейки проверяются по столбцам: каждое различное значение столбца (с учётом типа направления)
+проверяется один раз. Хранилища сообщений создаются только для ячеек с ошибками,
+остальные ячейки используют общее EMPTY_MESSAGES.
+
+Результат validate_and_create_directions_table_compiled совпадает с
+dt_validators.validate_and_create_directions_table.
+"""
+
+import itertools
+import re
+from collections.abc import Callable, Hashable, Iterable, Sequence
+from typing import Any, NamedTuple
+
+from docx.shared import RGBColor
+from docx.table import Table, _Cell
+
+from sdp_lib.passport.base import (
+    EMPTY_MESSAGES,
+    CellData,
+    CellMapping,
+    DirectionDataRow,
+    MessageStorage,
+    TheTable
+)
+from sdp_lib.passport.constants import (
+    AllowedValues,
+    DirectionDataContainer,
+    DirectionEntities,
+    PatternsDirectionTable,
+    allowed_column_lengths_dt,
+    allowed_min_num_rows,
+    head_rows_data_dt,
+    mapping_direction_data
+)
+from sdp_lib.passport.text_messages import Text
+from sdp_lib.passport.validation.common_validators import (
+    create_cells_for_head_row,
+    validate_geometry,
+    validate_sequence_directions_or_stages_nums_and_create_cell
+)
+from sdp_lib.passport.validation.dt_validators import (
+    RowPosition,
+    entity_patterns_and_aliases,
+    validate_traffic_lights
+)
+from sdp_lib.utils_common.utils_common import get_stage_or_direction_number_or_none
+
+
+_inline_flags = ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's'), (re.VERBOSE, 'x'))
+
+
+class AliasMatcher:
+    """
+    Сопоставление строки с последовательностью пар (шаблон, псевдоним) одним регулярным выражением.
+    Каждый шаблон - именованная группа альтернативы со своими флагами, порядок шаблонов сохраняется,
+    поэтому результат совпадает с перебором re.match по шаблонам: псевдоним первого совпавшего шаблона.
+    """
+
+    def __init__(self, patterns_and_aliases: Iterable[tuple[str | re.Pattern, Any]]):
+        branches = []
+        self._aliases = {}
+        for i, (pattern, alias) in enumerate(patterns_and_aliases):
+            pattern = re.compile(pattern)
+            if pattern.groups:
+                raise ValueError(f'Шаблон не должен содержать групп: {pattern.pattern!r}')
+            flags = ''.join(char for flag, char in _inline_flags if pattern.flags & flag)
+            name = f'p{i}'
+            branches.append(f'(?P<{name}>(?{flags}:{pattern.pattern}))' if flags else f'(?P<{name}>{pattern.pattern})')
+            self._aliases[name] = alias
+        self._regex = re.compile('|'.join(branches)) if branches else None
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self._regex.pattern if self._regex is not None else ""!r})'
+
+    def match(self, string: str) -> Any | None:
+        """
+        Псевдоним первого шаблона, для которого re.match(шаблон, string) находит совпадение, иначе None.
+        """
+        if self._regex is None or (m := self._regex.match(string)) is None:
+            return None
+        return self._aliases[m.lastgroup]
+
+    def get_alias(self, string: str) -> Any | None:
+        """ Аналог common_validators.get_alias: для пустой строки возвращает None. """
+        return self.match(string) if string else None
+
+
+_matchers: dict[tuple, AliasMatcher] = {}
+
+
+def get_matcher(patterns: Sequence[str | re.Pattern]) -> AliasMatcher:
+    """
+    AliasMatcher для проверки соответствия строки хотя бы одному шаблону patterns (псевдоним - True).
+    Объекты создаются один раз для каждой последовательности шаблонов.
+    """
+    key = tuple(patterns)
+    matcher = _matchers.get(key)
+    if matcher is None:
+        matcher = _matchers[key] = AliasMatcher((p, True) for p in key)
+    return matcher
+
+
+entity_matcher = AliasMatcher(entity_patterns_and_aliases)
+
+
+class CellResult(NamedTuple):
+    """ Результат проверки значения ячейки без привязки к ячейке таблицы. """
+    value: str
+    text_is_valid: bool = None
+    context_is_valid: bool = None
+    converted_val: Any = None
+    recovered_val: Any = None
+    messages: MessageStorage = EMPTY_MESSAGES
+
+
+def _errors(*errors: str) -> MessageStorage:
+    return MessageStorage(errors, ())
+
+
+def map_unique(func: Callable[..., CellResult], keys: Iterable[Hashable]) -> list[CellResult]:
+    """
+    Применяет func к каждому различному ключу keys один раз.
+    :param func: Функция проверки, принимает элементы ключа.
+    :param keys: Кортежи аргументов func для каждой ячейки столбца.
+    :return: Результаты в порядке keys.
+    """
+    results = {}
+    out = []
+    for key in keys:
+        result = results.get(key)
+        if result is None:
+            result = results[key] = func(*key)
+        out.append(result)
+    return out
+
+
+def create_cells(results: Iterable[CellResult], cell_mappings: Iterable[CellMapping]) -> list[CellData]:
+    return [
+        CellData(r.value, r.text_is_valid, r.context_is_valid, r.converted_val, r.recovered_val,
+                 cell_mapping=cm, messages=r.messages)
+        for r, cm in zip(results, cell_mappings, strict=True)
+    ]
+
+
+def create_default_cell(cell_mapping: CellMapping) -> CellData:
+    return CellData(value=cell_mapping.cell.text, messages=EMPTY_MESSAGES, cell_mapping=cell_mapping)
+
+
+def strip_cells_and_create_cell_mappings(
+    i_table: int,
+    i_row: int,
+    docx_cells: Iterable[_Cell],
+) -> tuple[list[CellMapping], int]:
+    """
+    Аналог common_validators.lrstrip_in_cell_and_create_cell_mappings. Текст присваивается ячейке
+    только если изменился после удаления пробелов: присвоение cell.text в python-docx пересоздаёт
+    содержимое ячейки и сбрасывает её форматирование.
+    """
+    empty_cells = 0
+    cell_mappings = []
+    for i, c in enumerate(docx_cells):
+        src_txt = c.text
+        txt = src_txt.strip()
+        if txt != src_txt:
+            c.text = txt
+        if txt == '':
+            empty_cells += 1
+        cell_mappings.append(CellMapping(i_table, i, i_row, c))
+    return cell_mappings, empty_cells
+
+
+def check_num(txt: str) -> CellResult:
+    num = get_stage_or_direction_number_or_none(txt)
+    is_valid = bool(num)
+    return CellResult(
+        txt, is_valid, is_valid, num if is_valid else None,
+        messages=_errors(Text.bad_number) if not is_valid and txt else EMPTY_MESSAGES
+    )
+
+
+def check_entity(txt: str) -> CellResult:
+    alias = entity_matcher.get_alias(txt)
+    is_valid = bool(alias)
+    recovered_val = alias if alias is not None and len(alias) != len(txt) else None
+    if alias and len(alias) == len(txt) or not txt:
+        messages = EMPTY_MESSAGES
+    elif alias:
+        messages = _errors(Text.typo_in_name)
+    else:
+        messages = _errors(Text.invalid_name)
+    return CellResult(txt, is_valid, is_valid, alias, recovered_val, messages)
+
+
+def check_timing(txt: str, timings: AllowedValues | None) -> CellResult:
+    """
+    :param timings: Допустимые значения для типа направления. None - тип направления не определён.
+    """
+    try:
+        val_i = int(txt)
+    except ValueError:
+        return CellResult(txt, False, False, messages=_errors(Text.is_not_a_number))
+    if timings is None:
+        return CellResult(txt, True, None, val_i)
+    if timings.min <= val_i <= timings.max:
+        return CellResult(txt, True, True, val_i)
+    err = Text.val_must_be_gt(timings.min) if val_i < timings.min else Text.val_must_be_lt(timings.max)
+    return CellResult(txt, True, False, messages=_errors(err))
+
+
+def check_always_red(txt: str, direction_entity: DirectionEntities | None) -> CellResult:
+    if direction_entity is None:
+        return CellResult(txt)
+    red_pattern = re.match(PatternsDirectionTable.always_red_text_yes.value, txt)
+    is_always_red = direction_entity == DirectionEntities.always_red
+    if (not is_always_red and txt == '') or (is_always_red and red_pattern):
+        return CellResult(txt, True, True)
+    has_error = bool((not is_always_red and red_pattern) or (txt and red_pattern is None))
+    return CellResult(
+        txt, bool(txt == '' or red_pattern is not None), has_error,
+        messages=_errors(Text.invalid_value) if has_error else EMPTY_MESSAGES
+    )
+
+
+def check_toov(txt: str, toov_patterns: tuple | None) -> CellResult:
+    """
+    :param toov_patterns: Допустимые шаблоны для типа направления. None - тип направления не определён.
+    """
+    if toov_patterns is None:
+        return CellResult(txt)
+    text_is_valid = get_matcher(toov_patterns).match(txt) is not None
+    return CellResult(
+        txt, text_is_valid, False if not text_is_valid else None,
+        messages=_errors(Text.invalid_value_for_direction_entity) if not text_is_valid else EMPTY_MESSAGES
+    )
+
+
+def validate_column(
+    func: Callable[..., CellResult],
+    cell_mappings: Sequence[CellMapping],
+    contexts: Iterable[Hashable] = None,
+) -> list[CellData]:
+    """
+    Проверяет столбец таблицы.
+    :param func: Функция проверки значения ячейки: func(текст) или func(текст, контекст).
+    :param cell_mappings: Ячейки столбца.
+    :param contexts: Контекст проверки для каждой ячейки (например, допустимые значения для типа направления).
+    :return: CellData ячеек столбца.
+    """
+    if contexts is None:
+        keys = ((cm.cell.text, ) for cm in cell_mappings)
+    else:
+        keys = ((cm.cell.text, ctx) for cm, ctx in zip(cell_mappings, contexts, strict=True))
+    return create_cells(map_unique(func, keys), cell_mappings)
+
+
+def validate_data_rows(data_rows: Sequence[Sequence[CellMapping]]) -> list[DirectionDataRow]:
+    """
+    Проверяет непустые строки таблицы направлений по столбцам и записывает сообщения в ячейки.
+    :param data_rows: CellMapping ячеек каждой строки.
+    :return: Строки таблицы в порядке data_rows.
+    """
+    def column(i_col: int) -> list[CellMapping]:
+        return [row[i_col] for row in data_rows]
+
+    nums = validate_column(check_num, column(RowPosition.num))
+    entities = validate_column(check_entity, column(RowPosition.entity))
+    directions_data: list[DirectionDataContainer | None] = [
+        mapping_direction_data.get(cell.converted_val) for cell in entities
+    ]
+    entity_names = [dd.entity if dd is not None else None for dd in directions_data]
+    stages = [
+        validate_sequence_directions_or_stages_nums_and_create_cell(cm) for cm in column(RowPosition.stages)
+    ]
+    traffic_lights = [
+        validate_traffic_lights(cm, entity_name, dd.tl_patterns if dd is not None else None)
+        for cm, entity_name, dd in zip(column(RowPosition.tlc), entity_names, directions_data)
+    ]
+    timings_by_row = [tuple(dd.get_timings()) if dd is not None else None for dd in directions_data]
+    timings = [
+        validate_column(
+            check_timing, column(i_col), (t[i] if t is not None else None for t in timings_by_row)
+        )
+        for i, i_col in enumerate(range(RowPosition.t_green_ext, RowPosition.t_zz + 1))
+    ]
+    always_red = validate_column(check_always_red, column(RowPosition.always_red), entity_names)
+    toov_patterns = [tuple(dd.toov_patterns) if dd is not None else None for dd in directions_data]
+    toov_red = validate_column(check_toov, column(RowPosition.toov_red), toov_patterns)
+    toov_green = validate_column(check_toov, column(RowPosition.toov_green), toov_patterns)
+    descriptions = [create_default_cell(cm) for cm in column(RowPosition.description)]
+
+    checked_columns = (nums, entities, stages, traffic_lights, *timings, always_red, toov_red, toov_green)
+    for cell in itertools.chain.from_iterable(checked_columns):
+        if cell.messages is not EMPTY_MESSAGES:
+            cell.write_messages_to_table_cell()
+    return [
+        DirectionDataRow(cells)
+        for cells in zip(*checked_columns, descriptions)
+    ]
+
+
+def validate_and_create_directions_table_compiled(i_table: int, table: Table) -> TheTable:
+    """
+    Проверяет таблицу направлений по столбцам. Результат и отметки ошибок в ячейках таблицы
+    совпадают с dt_validators.validate_and_create_directions_table.
+    :param i_table: Индекс таблицы в документе.
+    :param table: Таблица направлений.
+    :return: Экземпляр TheTable.
+    """
+    table_rows = table.rows
+    the_table = TheTable(
+        i_table,
+        table,
+        validate_geometry(table, allowed_column_lengths_dt, allowed_min_num_rows)
+    )
+    if not the_table.geometry_check_list.is_valid:
+        for err in the_table.geometry_check_list.get_errors():
+            the_table.messages.add_errors(err)
+        target = table.add_row()
+        target.cells[0].text = '\n'.join(f"*{e}" for e in the_table.messages.chain())
+        target.cells[0].paragraphs[0].runs[0].font.color.rgb = RGBColor(255, 0, 0)
+        return the_table
+    first_row = strip_cells_and_create_cell_mappings(i_table, 0, table_rows[0].cells)
+    first_row = tuple(create_default_cell(cm) for cm in first_row[0])
+    second_row = tuple(create_cells_for_head_row(
+        i_table, 1, table_rows[1].cells, head_rows_data_dt.row1_col_patterns, head_rows_data_dt.row1_col_names
+    ))
+    the_table.load_head_rows((DirectionDataRow(first_row), DirectionDataRow(second_row)))
+    if not the_table.head_rows[1].is_valid:
+        return the_table
+    data_rows, empty_rows = [], []
+    for i in range(2, len(table_rows)):
+        cell_mappings, empty_cells = strip_cells_and_create_cell_mappings(i_table, i, table_rows[i].cells)
+        if len(cell_mappings) == empty_cells:
+            empty_rows.append(DirectionDataRow(tuple(create_default_cell(cm) for cm in cell_mappings)))
+        else:
+            data_rows.append(cell_mappings)
+    the_table.load_data_rows(validate_data_rows(data_rows))
+    the_table.load_empty_rows(empty_rows)
+    return the_table
@@ -0,0 +1,246 @@
+"""
+Компиляция условий перехода/продления из tlc конфигурации контроллера Поток.
+
+Строка условия разбирается один раз: каждому токену (функции) назначается номер ячейки
+(слот), выражение компилируется в функцию Python. Вычисление условия не требует замены
+токенов в строке, лексического и синтаксического разбора, как ConditionResult.get_condition_result,
+и выполняется за единицы микросекунд. Результат совпадает с ConditionResult:
+"and" и "or" соответствуют "*" и "+", приоритет операторов: not > and > or.
+
+Для вычисления множества наборов выражение также компилируется в побитовую функцию:
+значения каждого токена для N наборов упаковываются в целое число (бит j - значение в наборе j),
+и все N наборов вычисляются одним вызовом (evaluate_packed).
+"""
+
+import re
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from typing import NamedTuple
+
+from .constants import ALLOWED_FUNCTIONS
+
+
+TOKEN_PATTERN = re.compile(
+    rf'\s*(?:(?P<func>(?:{"|".join(sorted(ALLOWED_FUNCTIONS, key=len, reverse=True))})\([DG]\d+\)'
+    r'(?:\s*(?:[<>]=?|==)\s*\d+)?)|(?P<num>\d+)|(?P<op>and|or|not|[()+*]))'
+)
+_operators = {'and': 'and', '*': 'and', 'or': 'or', '+': 'or', 'not': 'not', '(': '(', ')': ')'}
+_bits = {0: False, 1: True}
+
+
+class ConditionSyntaxError(ValueError):
+    pass
+
+
+class Node(NamedTuple):
+    """
+    Узел дерева выражения.
+    kind -> 'var' (value - номер слота), 'const' (value - bool), 'not', 'and', 'or' (args - операнды).
+    """
+    kind: str
+    value: int | bool | None = None
+    args: tuple['Node', ...] = ()
+
+
+def tokenize(condition_string: str) -> list[tuple[str, str, int]]:
+    """
+    Разбивает строку условия на лексемы.
+    :return: Список (тип лексемы: 'func', 'num' или оператор, текст, позиция в строке).
+    :raises ConditionSyntaxError: Недопустимый символ в строке.
+    """
+    lexemes = []
+    pos, end = 0, len(condition_string.rstrip())
+    while pos < end:
+        m = TOKEN_PATTERN.match(condition_string, pos)
+        if m is None:
+            raise ConditionSyntaxError(f'Недопустимый символ в позиции {pos}: {condition_string[pos:pos + 10]!r}')
+        kind = m.lastgroup
+        text = m.group(kind)
+        lexemes.append((_operators[text] if kind == 'op' else kind, text, m.start(kind)))
+        pos = m.end()
+    return lexemes
+
+
+class _Parser:
+    """
+    Рекурсивный спуск:
+        or_expr  : and_expr (('or' | '+') and_expr)*
+        and_expr : unary (('and' | '*') unary)*
+        unary    : 'not' unary | primary
+        primary  : '(' or_expr ')' | функция | число
+    """
+
+    def __init__(self, condition_string: str, slots: Mapping[str, int]):
+        self._lexemes = tokenize(condition_string)
+        self._slots = slots
+        self._pos = 0
+
+    def _peek(self) -> str | None:
+        return self._lexemes[self._pos][0] if self._pos < len(self._lexemes) else None
+
+    def _error(self, message: str):
+        pos = self._lexemes[self._pos][2] if self._pos < len(self._lexemes) else 'конец строки'
+        raise ConditionSyntaxError(f'{message}. Позиция: {pos}')
+
+    def parse(self) -> Node:
+        if not self._lexemes:
+            self._error('Пустое условие')
+        node = self._or_expr()
+        if self._pos != len(self._lexemes):
+            self._error(f'Лишняя лексема {self._lexemes[self._pos][1]!r}')
+        return node
+
+    def _binary(self, kind: str, operand: Callable[[], Node]) -> Node:
+        args = [operand()]
+        while self._peek() == kind:
+            self._pos += 1
+            args.append(operand())
+        return args[0] if len(args) == 1 else Node(kind, args=tuple(args))
+
+    def _or_expr(self) -> Node:
+        return self._binary('or', self._and_expr)
+
+    def _and_expr(self) -> Node:
+        return self._binary('and', self._unary)
+
+    def _unary(self) -> Node:
+        if self._peek() == 'not':
+            self._pos += 1
+            return Node('not', args=(self._unary(), ))
+        return self._primary()
+
+    def _primary(self) -> Node:
+        kind = self._peek()
+        if kind is None:
+            self._error('Неожиданный конец условия')
+        text = self._lexemes[self._pos][1]
+        if kind == '(':
+            self._pos += 1
+            node = self._or_expr()
+            if self._peek() != ')':
+                self._error('Ожидается ")"')
+            self._pos += 1
+            return node
+        if kind == 'func':
+            self._pos += 1
+            return Node('var', self._slots[text])
+        if kind == 'num':
+            self._pos += 1
+            return Node('const', bool(int(text)))
+        self._error(f'Неожиданная лексема {text!r}')
+
+
+def get_tokens(condition_string: str) -> tuple[str, ...]:
+    """
+    Токены (функции) условия в порядке слотов: уникальные и отсортированные, как в Tokens.get_tokens.
+    """
+    return tuple(sorted({text for kind, text, _ in tokenize(condition_string) if kind == 'func'}))
+
+
+def to_python_source(node: Node) -> str:
+    """ Выражение Python с логическими операторами, значение слота i - v[i]. """
+    if node.kind == 'var':
+        return f'v[{node.value}]'
+    if node.kind == 'const':
+        return str(node.value)
+    if node.kind == 'not':
+        return f'(not {to_python_source(node.args[0])})'
+    return f'({f" {node.kind} ".join(to_python_source(arg) for arg in node.args)})'
+
+
+def to_bitwise_source(node: Node) -> str:
+    """
+    Побитовое выражение Python: значение слота i - v[i], m - маска из единиц по количеству наборов.
+    Подходит для целых чисел (упакованные наборы) и для логических массивов numpy (m=True).
+    """
+    if node.kind == 'var':
+        return f'v[{node.value}]'
+    if node.kind == 'const':
+        return 'm' if node.value else '(m ^ m)'
+    if node.kind == 'not':
+        return f'(m ^ {to_bitwise_source(node.args[0])})'
+    op = ' & ' if node.kind == 'and' else ' | '
+    return f'({op.join(to_bitwise_source(arg) for arg in node.args)})'
+
+
+def pack_vectors(vectors: Sequence[Sequence[int]], num_slots: int) -> list[int]:
+    """
+    Упаковывает наборы значений в целые числа по слотам: бит j числа слота i - vectors[j][i].
+    """
+    return [
+        int(''.join('1' if vector[i] else '0' for vector in reversed(vectors)) or '0', 2)
+        for i in range(num_slots)
+    ]
+
+
+def unpack_result(packed: int, num_vectors: int) -> list[bool]:
+    bits = format(packed, f'0{num_vectors}b')[::-1] if num_vectors else ''
+    return [bit == '1' for bit in bits]
+
+
+class CompiledCondition:
+    """
+    Условие перехода/продления, скомпилированное один раз для многократного вычисления.
+    """
+
+    def __init__(self, condition_string: str):
+        """
+        :param condition_string: Строка с условием перехода/продления из tlc конфигурации контроллера Поток.
+                                 Пример: '(ddr(D33) or ddr(D34)) and mr(G2) and (fctg(G1)<66)'
+        :raises ConditionSyntaxError: Строка условия содержит ошибки.
+        """
+        self.condition_string = condition_string
+        self.tokens = get_tokens(condition_string)
+        self.slots = {token: i for i, token in enumerate(self.tokens)}
+        self.tree = _Parser(condition_string, self.slots).parse()
+        self._function: Callable[[Sequence], bool] = eval(f'lambda v: bool({to_python_source(self.tree)})')
+        self._bitwise_function: Callable[[Sequence, int], int] = eval(f'lambda v, m: {to_bitwise_source(self.tree)}')
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.condition_string!r})'
+
+    def get_vector(self, values: Mapping[str, int]) -> list[bool]:
+        """
+        Значения слотов из словаря токен -> 0 или 1.
+        :raises ValueError: Не задано значение токена или значение не 0/1.
+        """
+        try:
+            return [_bits[values[token]] for token in self.tokens]
+        except KeyError as exc:
+            raise ValueError(
+                f'Не задано значение токена или значение не 0/1: {exc.args[0]!r}. Токены: {self.tokens}'
+            ) from None
+
+    def evaluate(self, values: Mapping[str, int] | Sequence[int]) -> bool:
+        """
+        Вычисляет условие.
+        :param values: Словарь токен -> 0 или 1, например {'ddr(D33)': 1, 'fctg(G1)<66': 0},
+                       или последовательность значений в порядке self.tokens.
+        :return: Результат условия.
+        """
+        if isinstance(values, Mapping):
+            values = self.get_vector(values)
+        return self._function(values)
+
+    def evaluate_packed(self, columns: Sequence[int], num_vectors: int) -> int:
+        """
+        Вычисляет условие для num_vectors наборов одновременно.
+        :param columns: Упакованные значения для каждого слота (см. pack_vectors).
+        :param num_vectors: Количество наборов.
+        :return: Число, бит j которого - результат условия для набора j.
+        """
+        return self._bitwise_function(columns, (1 << num_vectors) - 1)
+
+    def evaluate_batch(self, vectors: Iterable[Mapping[str, int] | Sequence[int]]) -> list[bool]:
+        """
+        Вычисляет условие для каждого набора значений (словарь или последовательность в порядке self.tokens).
+        Для наборов, уже упакованных по слотам, быстрее evaluate_packed.
+        """
+        function, get_vector = self._function, self.get_vector
+        return [function(get_vector(v) if isinstance(v, Mapping) else v) for v in vectors]
+
+
+if __name__ == '__main__':
+    condition = CompiledCondition('(ddr(D33) or ddr(D34) or ddr(D35) or ddr(D36)) and (fctg(G1)<66)')
+    print(condition, condition.tokens)
+    print(condition.evaluate({'ddr(D33)': 0, 'ddr(D34)': 1, 'ddr(D35)': 0, 'ddr(D36)': 0, 'fctg(G1)<66': 1}))
+    print(condition.evaluate_batch([(0, 0, 0, 0, 1), (1, 0, 0, 0, 1), (1, 1, 1, 1, 0)]))
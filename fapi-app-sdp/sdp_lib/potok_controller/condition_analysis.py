@@ -0,0 +1,223 @@
+"""
+Анализ условий перехода/продления из tlc конфигурации контроллера Поток по таблице истинности.
+
+Условие вычисляется сразу для всех 2^n наборов значений n токенов: значения каждого токена
+упаковываются в целое число из 2^n бит (бит j - значение токена в наборе j, т.е. бит i номера j
+для токена i), операторы and/or/not выполняются побитово над этими числами. Результат - таблица
+истинности условия в одном числе, по которой определяются:
+    -- токены, от которых зависит результат (остальные токены не влияют на результат);
+    -- условие всегда истинно/всегда ложно;
+    -- части условия (скобки, not), результат которых не зависит от значений токенов;
+    -- минимальные наборы токенов, равных 1, при которых условие выполняется
+       (наборы, ни одно подмножество которых не выполняет условие).
+Для 24 токенов таблица истинности занимает 2 МБ, анализ выполняется за доли секунды.
+"""
+
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+from .compiled_condition import CompiledCondition, Node
+
+
+MAX_TOKENS = 26
+
+_nonzero_byte = re.compile(rb'[^\x00]')
+
+
+def get_token_masks(num_tokens: int) -> list[int]:
+    """
+    Значения токенов во всех 2^num_tokens наборах.
+    :return: Список чисел, бит j числа i равен биту i номера набора j.
+    """
+    num_assignments = 1 << num_tokens
+    masks = []
+    for i in range(num_tokens):
+        step = 1 << i
+        mask, width = ((1 << step) - 1) << step, step << 1
+        while width < num_assignments:
+            mask |= mask << width
+            width <<= 1
+        masks.append(mask)
+    return masks
+
+
+def iter_set_bits(value: int, num_bits: int) -> Iterator[int]:
+    """ Номера единичных бит числа value в порядке возрастания. """
+    data = value.to_bytes((num_bits + 7) // 8 or 1, 'little')
+    for m in _nonzero_byte.finditer(data):
+        byte, offset = data[m.start()], m.start() * 8
+        for bit in range(8):
+            if byte >> bit & 1:
+                yield offset + bit
+
+
+def to_condition_string(node: Node, tokens: tuple[str, ...]) -> str:
+    """ Строка условия из дерева выражения, скобки только там, где они нужны. """
+    if node.kind == 'var':
+        return tokens[node.value]
+    if node.kind == 'const':
+        return str(int(node.value))
+    if node.kind == 'not':
+        arg = node.args[0]
+        string = to_condition_string(arg, tokens)
+        return f'not ({string})' if arg.kind in ('and', 'or') else f'not {string}'
+    parts = []
+    for arg in node.args:
+        string = to_condition_string(arg, tokens)
+        parts.append(f'({string})' if node.kind == 'and' and arg.kind == 'or' else string)
+    return f' {node.kind} '.join(parts)
+
+
+@dataclass(slots=True)
+class ConditionAnalysis:
+    """
+    Результат анализа условия.
+    dependent_tokens -> токены, изменение значения которых может изменить результат условия.
+    constant_branches -> части условия с постоянным результатом: пары (строка части условия, результат).
+                         Вложенные части постоянной части не включаются.
+    minimal_assignments -> минимальные наборы токенов, равных 1 (остальные токены равны 0),
+                           при которых условие выполняется. Не более max_assignments наборов.
+    """
+    condition_string: str
+    tokens: tuple[str, ...]
+    num_satisfying: int
+    dependent_tokens: tuple[str, ...]
+    constant_branches: list[tuple[str, bool]] = field(default_factory=list)
+    minimal_assignments: list[tuple[str, ...]] = field(default_factory=list)
+    num_minimal_assignments: int = 0
+
+    @property
+    def num_assignments(self) -> int:
+        return 1 << len(self.tokens)
+
+    @property
+    def is_tautology(self) -> bool:
+        return self.num_satisfying == self.num_assignments
+
+    @property
+    def is_contradiction(self) -> bool:
+        return self.num_satisfying == 0
+
+    @property
+    def redundant_tokens(self) -> tuple[str, ...]:
+        return tuple(token for token in self.tokens if token not in self.dependent_tokens)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            'condition': self.condition_string,
+            'tokens': list(self.tokens),
+            'num_assignments': self.num_assignments,
+            'num_satisfying': self.num_satisfying,
+            'is_tautology': self.is_tautology,
+            'is_contradiction': self.is_contradiction,
+            'dependent_tokens': list(self.dependent_tokens),
+            'redundant_tokens': list(self.redundant_tokens),
+            'constant_branches': [{'branch': branch, 'result': result} for branch, result in self.constant_branches],
+            'minimal_assignments': [list(assignment) for assignment in self.minimal_assignments],
+            'num_minimal_assignments': self.num_minimal_assignments,
+        }
+
+
+class _TruthTable:
+    """
+    Вычисление таблицы истинности дерева выражения с поиском частей условия с постоянным результатом.
+    """
+
+    def __init__(self, tokens: tuple[str, ...], masks: list[int], full: int):
+        self._tokens = tokens
+        self._masks = masks
+        self._full = full
+        self.constant_branches: list[tuple[str, bool]] = []
+
+    def evaluate(self, node: Node, is_root: bool = True) -> int:
+        if node.kind == 'var':
+            return self._masks[node.value]
+        if node.kind == 'const':
+            return self._full if node.value else 0
+        num_branches = len(self.constant_branches)
+        values = [self.evaluate(arg, False) for arg in node.args]
+        if node.kind == 'not':
+            result = self._full ^ values[0]
+        elif node.kind == 'and':
+            result = values[0]
+            for value in values[1:]:
+                result &= value
+        else:
+            result = values[0]
+            for value in values[1:]:
+                result |= value
+        if not is_root and result in (0, self._full):
+            del self.constant_branches[num_branches:]
+            self.constant_branches.append((to_condition_string(node, self._tokens), result == self._full))
+        return result
+
+
+def get_minimal_satisfying(table: int, masks: list[int], full: int) -> int:
+    """
+    Наборы, выполняющие условие, ни одно подмножество единичных токенов которых не выполняет условие.
+    :param table: Таблица истинности условия.
+    :return: Число, бит j которого равен 1 для минимального набора j.
+    """
+    closure = table
+    for i, mask in enumerate(masks):
+        # Добавляет наборы, полученные заменой 0 на 1 в токене i.
+        closure |= (closure & (full ^ mask)) << (1 << i)
+    strict_supersets = 0
+    for i, mask in enumerate(masks):
+        strict_supersets |= (closure & (full ^ mask)) << (1 << i)
+    return table & ~strict_supersets
+
+
+def analyze_condition(
+        condition: str | CompiledCondition,
+        max_assignments: int = 100,
+        max_tokens: int = MAX_TOKENS
+) -> ConditionAnalysis:
+    """
+    Анализирует условие по таблице истинности.
+    :param condition: Строка с условием перехода/продления или экземпляр CompiledCondition.
+    :param max_assignments: Максимальное количество минимальных наборов в результате.
+    :param max_tokens: Максимальное количество токенов. Таблица истинности занимает 2^max_tokens бит.
+    :return: Экземпляр ConditionAnalysis.
+    :raises ConditionSyntaxError: Строка условия содержит ошибки.
+    :raises ValueError: Количество токенов больше max_tokens.
+    """
+    if not isinstance(condition, CompiledCondition):
+        condition = CompiledCondition(condition)
+    tokens = condition.tokens
+    if len(tokens) > max_tokens:
+        raise ValueError(f'Количество токенов {len(tokens)} больше допустимого: {max_tokens}')
+    num_assignments = 1 << len(tokens)
+    full = (1 << num_assignments) - 1
+    masks = get_token_masks(len(tokens))
+    truth_table = _TruthTable(tokens, masks, full)
+    table = truth_table.evaluate(condition.tree)
+    dependent_tokens = tuple(
+        token for i, (token, mask) in enumerate(zip(tokens, masks))
+        if (table & mask) >> (1 << i) != table & (full ^ mask)
+    )
+    minimal = get_minimal_satisfying(table, masks, full)
+    minimal_assignments = []
+    for j in iter_set_bits(minimal, num_assignments):
+        if len(minimal_assignments) >= max_assignments:
+            break
+        minimal_assignments.append(tuple(token for i, token in enumerate(tokens) if j >> i & 1))
+    return ConditionAnalysis(
+        condition.condition_string,
+        tokens,
+        table.bit_count(),
+        dependent_tokens,
+        truth_table.constant_branches,
+        minimal_assignments,
+        minimal.bit_count(),
+    )
+
+
+if __name__ == '__main__':
+    analysis = analyze_condition(
+        '(ddr(D33) or ddr(D34) or not ddr(D33)) and mr(G2) or (fctg(G1)<66 and not fctg(G1)<66)'
+    )
+    print(analysis)
+    print(analysis.is_tautology, analysis.is_contradiction, analysis.redundant_tokens)
@@ -8,6 +8,7 @@ from typing import List, Dict
 from .lexer import LexerValuesInConditionString
 from .parser import pg
 from .condition_string import ConditionStringPotokTlc
+from .condition_analysis import ConditionAnalysis, analyze_condition
 
 
 lexer = LexerValuesInConditionString.get_lexer().make()
@@ -156,6 +157,15 @@ class Checker(BaseCondition):
                     break
         return stack
 
+    def analyze(self, max_assignments: int = 100) -> ConditionAnalysis:
+        """
+        Анализирует условие по таблице истинности: токены, влияющие на результат, условие всегда истинно/ложно,
+        части условия с постоянным результатом, минимальные наборы токенов, выполняющие условие.
+        :param max_assignments: Максимальное количество минимальных наборов в результате.
+        :return: Экземпляр ConditionAnalysis.
+        """
+        return analyze_condition(self.condition_string, max_assignments)
+
 
 if __name__ == '__main__':
     values_ = {
@@ -0,0 +1,84 @@
+import contextlib
+import io
+import itertools
+from random import Random
+from unittest import TestCase, main
+
+from sdp_lib.potok_controller import potok_user_api
+from sdp_lib.potok_controller.compiled_condition import (
+    CompiledCondition,
+    ConditionSyntaxError,
+    pack_vectors,
+    unpack_result
+)
+
+
+def generate_condition_string(rnd: Random, tokens: list[str], depth: int = 3) -> str:
+    """ Случайное условие из tokens с операторами and, or, not и скобками. """
+    if depth == 0 or rnd.random() < 0.3:
+        token = rnd.choice(tokens)
+        return f'not {token}' if rnd.random() < 0.2 else token
+    parts = [generate_condition_string(rnd, tokens, depth - 1) for _ in range(rnd.randint(2, 4))]
+    string = f' {rnd.choice(("and", "or"))} '.join(parts)
+    if rnd.random() < 0.3:
+        string = f' {rnd.choice(("and", "or"))} '.join((string, rnd.choice(tokens)))
+    return f'not ({string})' if rnd.random() < 0.15 else f'({string})'
+
+
+def get_parser_result(condition_string: str, values: dict) -> bool:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return potok_user_api.ConditionResult(condition_string).get_condition_result(values)
+
+
+class TestCompiledCondition(TestCase):
+
+    tokens = ['ddr(D1)', 'ddr(D2)', 'ddo(D13)', 'ngp(D4)', 'mr(G1)', 'fctg(G1)<66', 'fctg(G2) >= 10']
+
+    def test_tokens(self):
+        condition = CompiledCondition('(ddr(D21) or ddr(D22) or ddr(D21)) and mr(G6) and fctg(G1) >= 40')
+        self.assertEqual(condition.tokens, ('ddr(D21)', 'ddr(D22)', 'fctg(G1) >= 40', 'mr(G6)'))
+
+    def test_result_equal_to_parser(self):
+        """ Результаты совпадают с ConditionResult для всех наборов значений случайных условий. """
+        rnd = Random(0)
+        for _ in range(30):
+            condition_string = generate_condition_string(rnd, self.tokens)
+            condition = CompiledCondition(condition_string)
+            vectors = list(itertools.product((0, 1), repeat=len(condition.tokens)))
+            batch = condition.evaluate_batch(vectors)
+            packed = unpack_result(
+                condition.evaluate_packed(pack_vectors(vectors, len(condition.tokens)), len(vectors)), len(vectors)
+            )
+            self.assertEqual(batch, packed, condition_string)
+            for vector, batch_result in zip(vectors, batch, strict=True):
+                values = dict(zip(condition.tokens, vector))
+                expected = get_parser_result(condition_string, values)
+                self.assertEqual(condition.evaluate(values), expected, (condition_string, values))
+                self.assertEqual(condition.evaluate(vector), expected, (condition_string, values))
+                self.assertEqual(batch_result, expected, (condition_string, values))
+
+    def test_precedence(self):
+        condition = CompiledCondition('not ddr(D1) and ddr(D2) or mr(G1)')
+        for vector in itertools.product((0, 1), repeat=3):
+            ddr1, ddr2, mr1 = vector
+            self.assertEqual(
+                condition.evaluate({'ddr(D1)': ddr1, 'ddr(D2)': ddr2, 'mr(G1)': mr1}),
+                bool((not ddr1) and ddr2 or mr1)
+            )
+
+    def test_errors(self):
+        with self.assertRaises(ConditionSyntaxError):
+            CompiledCondition('ddr(D1) and (ddr(D2)')
+        with self.assertRaises(ConditionSyntaxError):
+            CompiledCondition('ddr(D1) and')
+        with self.assertRaises(ConditionSyntaxError):
+            CompiledCondition('ddr(D1) & ddr(D2)')
+        condition = CompiledCondition('ddr(D1) and ddr(D2)')
+        with self.assertRaises(ValueError):
+            condition.evaluate({'ddr(D1)': 1})
+        with self.assertRaises(ValueError):
+            condition.evaluate({'ddr(D1)': 1, 'ddr(D2)': 2})
+
+
+if __name__ == '__main__':
+    main()
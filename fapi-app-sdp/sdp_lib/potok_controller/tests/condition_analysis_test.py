@@ -0,0 +1,80 @@
+import itertools
+import time
+from random import Random
+from unittest import TestCase, main
+
+from sdp_lib.potok_controller.compiled_condition import CompiledCondition
+from sdp_lib.potok_controller.condition_analysis import analyze_condition
+from sdp_lib.potok_controller.tests.compiled_condition_test import generate_condition_string
+
+
+def is_subset(vector: tuple[int, ...], other: tuple[int, ...]) -> bool:
+    return all(x <= y for x, y in zip(vector, other))
+
+
+class TestConditionAnalysis(TestCase):
+
+    tokens = ['ddr(D1)', 'ddr(D2)', 'ddo(D13)', 'ngp(D4)', 'mr(G1)', 'fctg(G1)<66', 'fctg(G2) >= 10']
+
+    def test_tautology_and_contradiction(self):
+        analysis = analyze_condition('ddr(D1) or not ddr(D1)')
+        self.assertTrue(analysis.is_tautology)
+        self.assertEqual(analysis.redundant_tokens, ('ddr(D1)', ))
+        analysis = analyze_condition('ddr(D1) and mr(G1) and not ddr(D1)')
+        self.assertTrue(analysis.is_contradiction)
+        self.assertEqual(analysis.dependent_tokens, ())
+        self.assertEqual(analysis.minimal_assignments, [])
+
+    def test_constant_branches(self):
+        analysis = analyze_condition('(ddr(D1) or not ddr(D1)) and mr(G1) or (ddr(D2) and not (ddr(D2) or 1))')
+        self.assertEqual(analysis.dependent_tokens, ('mr(G1)', ))
+        self.assertEqual(
+            analysis.constant_branches,
+            [('ddr(D1) or not ddr(D1)', True), ('ddr(D2) and not (ddr(D2) or 1)', False)]
+        )
+        self.assertEqual(analysis.minimal_assignments, [('mr(G1)', )])
+
+    def test_minimal_assignments(self):
+        analysis = analyze_condition('(ddr(D1) or ddr(D2)) and mr(G1) or ddr(D1) and ddr(D2)')
+        self.assertEqual(
+            sorted(analysis.minimal_assignments),
+            [('ddr(D1)', 'ddr(D2)'), ('ddr(D1)', 'mr(G1)'), ('ddr(D2)', 'mr(G1)')]
+        )
+
+    def test_result_equal_to_enumeration(self):
+        """ Результат совпадает с перебором всех наборов значений для случайных условий. """
+        rnd = Random(0)
+        for _ in range(50):
+            condition = CompiledCondition(generate_condition_string(rnd, self.tokens, 4))
+            analysis = analyze_condition(condition, max_assignments=1 << len(condition.tokens))
+            vectors = list(itertools.product((0, 1), repeat=len(condition.tokens)))
+            results = {vector: condition.evaluate(vector) for vector in vectors}
+            satisfying = [vector for vector, result in results.items() if result]
+            self.assertEqual(analysis.num_satisfying, len(satisfying))
+            dependent_tokens = tuple(
+                token for i, token in enumerate(condition.tokens)
+                if any(results[v] != results[(*v[:i], 1 - v[i], *v[i + 1:])] for v in vectors)
+            )
+            self.assertEqual(analysis.dependent_tokens, dependent_tokens, condition)
+            minimal_assignments = {
+                tuple(token for token, value in zip(condition.tokens, vector) if value)
+                for vector in satisfying
+                if not any(other != vector and is_subset(other, vector) for other in satisfying)
+            }
+            self.assertEqual(set(analysis.minimal_assignments), minimal_assignments, condition)
+            self.assertEqual(analysis.num_minimal_assignments, len(minimal_assignments), condition)
+
+    def test_many_tokens(self):
+        condition_string = ' or '.join(f'(ddr(D{i}) and not ddo(D{i}))' for i in range(1, 13))
+        start = time.perf_counter()
+        analysis = analyze_condition(condition_string, max_assignments=5)
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertEqual(len(analysis.dependent_tokens), 24)
+        self.assertEqual(analysis.num_minimal_assignments, 12)
+        self.assertEqual(len(analysis.minimal_assignments), 5)
+        with self.assertRaises(ValueError):
+            analyze_condition(condition_string, max_tokens=20)
+
+
+if __name__ == '__main__':
+    main()
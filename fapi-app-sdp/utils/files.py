@@ -1,15 +1,26 @@
-from collections.abc import Iterable, Sequence
+import asyncio
+import io
+import logging
+import shutil
+import time
+from collections.abc import Iterable, Iterator, Sequence
 from pathlib import Path
-from zipfile import ZipFile
+from typing import BinaryIO
+from zipfile import ZIP_STORED, ZipFile, ZipInfo
 
 import aiofiles
 from fastapi import UploadFile
 
-from core.config import PASSPORTS_DIR
+from core.config import PASSPORTS_DIR, PASSPORTS_CACHE_DIR, PASSPORTS_JOBS_DIR, settings
+from sdp_lib.passport.cache import PassportResult, PassportResultCache
+from sdp_lib.passport.jobs import PassportJobQueue
 from sdp_lib.passport.passport import Passport
+from sdp_lib.passport.pool import PassportValidationPool
 from sdp_lib.utils_common.utils_common import get_curr_datetime
 
 
+logger = logging.getLogger(__name__)
+
 doc_suffixes = {'.docx', '.doc'}
 
 def get_filepath_with_docx_suffix(parent_dir: str, filename: str) -> Path:
@@ -41,10 +52,22 @@ def save_and_zip_passport_docx(
         return obj_zip.filename
 
 
+passport_results_cache = PassportResultCache(PASSPORTS_CACHE_DIR)
+passport_validation_pool = PassportValidationPool(cache=passport_results_cache)
+passport_job_queue = PassportJobQueue(
+    passport_validation_pool,
+    PASSPORTS_JOBS_DIR,
+    max_queued_jobs=settings.passport.max_queued_jobs,
+    num_workers=settings.passport.job_workers,
+    ttl=settings.passport.job_ttl_seconds,
+    max_queued_bytes=settings.passport.max_queued_bytes,
+)
+
+
 class PassportSaver:
-    """ Сохраняет паспорта на диск, формирует zip-архив.  """
+    """ Сохраняет результаты проверки паспортов на диск, формирует zip-архив.  """
 
-    def __init__(self, passports: Sequence[Passport]):
+    def __init__(self, passports: Sequence[PassportResult]):
         self.passports = passports
         if not passports:
             raise ValueError(f'passports cant be empty.')
@@ -52,7 +75,7 @@ class PassportSaver:
 
     def save_and_get_as_docx_if_only_one_else_as_zip_archive(self) -> Path:
         """
-        Сохраняет паспорта в word формате из экземпляров Passport(self.passport).
+        Сохраняет паспорта в word формате из экземпляров PassportResult(self.passport).
         Если в последовательности self.passport один экземпляр - вернёт ссылку на word,
         если более одного - упакует все word в архив zip и вернёт на него ссылку(экземпляр Path).
         :return: Экземпляр Path документа word или архива zip.
@@ -60,20 +83,103 @@ class PassportSaver:
         if len(self.passports) == 1:
             passport = self.passports[0]
             filepath = get_filepath_with_docx_suffix(self.parent_dir, passport.filename)
-            passport.get_docx().save(filepath)
+            Path(filepath).write_bytes(passport.docx)
             return filepath
         return self.save_and_get_as_zip()
 
     def save_and_get_as_zip(self):
         """
-        Сохраняет документ как word файл у каждого объекта passports и добавляет в архив.
+        Добавляет docx каждого объекта passports в архив без промежуточной записи на диск.
         :return: Путь к zip архиву.
         """
         with ZipFile(f'{self.parent_dir}/results.zip', 'a') as obj_zip:
             for passport in self.passports:
-                p = passport.filename
-                filepath = get_filepath_with_docx_suffix(self.parent_dir, p)
-                passport.get_docx().save(filepath)
-                obj_zip.write(filepath, arcname=p)
-                filepath.unlink()
-            return Path(obj_zip.filename)
\ No newline at end of file
+                obj_zip.writestr(str(passport.filename), passport.docx)
+            return Path(obj_zip.filename)
+
+
+class _ZipStreamBuffer(io.RawIOBase):
+    """
+    Несохраняемый (без seek) приёмник данных ZipFile: записанные байты забираются
+    методом take() и сразу отдаются клиенту. ZipFile пишет записи с дескрипторами данных,
+    поэтому архив не требует возврата к уже записанным данным.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        self._position += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._position
+
+    def take(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip_stream(
+    entries: Iterable[tuple[str, bytes | BinaryIO]],
+    chunk_size: int = 256 * 1024,
+) -> Iterator[bytes]:
+    """
+    Формирует zip-архив по частям без записи на диск. Каждая запись отдаётся клиенту
+    по мере формирования, в памяти одновременно находится не больше одной записи
+    (для файловых объектов - не больше chunk_size байт).
+    docx уже сжат, поэтому записи сохраняются без сжатия.
+    :param entries: Пары (имя в архиве, содержимое в виде bytes или открытого двоичного файла).
+    :param chunk_size: Размер части при чтении файловых объектов.
+    """
+    buffer = _ZipStreamBuffer()
+    with ZipFile(buffer, 'w', compression=ZIP_STORED) as obj_zip:
+        for arcname, content in entries:
+            zinfo = ZipInfo(arcname, time.localtime()[:6])
+            is_bytes = isinstance(content, (bytes, bytearray, memoryview))
+            if is_bytes:
+                zinfo.file_size = len(content)
+            # Размер файлового объекта заранее неизвестен, поэтому для него запись в формате zip64.
+            with obj_zip.open(zinfo, 'w', force_zip64=not is_bytes) as entry:
+                if is_bytes:
+                    entry.write(content)
+                else:
+                    while chunk := content.read(chunk_size):
+                        entry.write(chunk)
+                        yield buffer.take()
+            yield buffer.take()
+    yield buffer.take()
+
+
+def remove_expired_passport_dirs(max_age: float, parent_dir: Path = PASSPORTS_DIR) -> int:
+    """
+    Удаляет каталоги результатов проверки паспортов(режим с сохранением на диск),
+    изменённые более max_age секунд назад.
+    :return: Количество удалённых каталогов.
+    """
+    deadline = time.time() - max_age
+    removed = 0
+    for path in Path(parent_dir).iterdir():
+        try:
+            if path.is_dir() and path.stat().st_mtime < deadline:
+                shutil.rmtree(path)
+                removed += 1
+        except OSError as exc:
+            logger.warning(f'Ошибка удаления {path}: {exc}')
+    return removed
+
+
+async def run_passport_dirs_cleanup(max_age: float, interval: float, parent_dir: Path = PASSPORTS_DIR):
+    """ Периодически удаляет устаревшие каталоги результатов проверки паспортов. """
+    while True:
+        removed = await asyncio.to_thread(remove_expired_passport_dirs, max_age, parent_dir)
+        if removed:
+            logger.info(f'Удалено устаревших каталогов результатов проверки паспортов: {removed}')
+        await asyncio.sleep(interval)
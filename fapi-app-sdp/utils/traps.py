@@ -0,0 +1,25 @@
+import logging
+
+from core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+def start_trap_receiver():
+    """
+    Запускает TrapReceiver в текущем цикле событий по конфигурации settings.traps.config_path.
+    Ошибка запуска не останавливает приложение: endpoints /traps остаются доступны без событий.
+    :return: Запущенный экземпляр TrapReceiver или None.
+    """
+    try:
+        # pysnmp загружается только при запуске приёма trap.
+        from sdp_lib.management_controllers.snmp.trap_server.configparser import ConfigParser
+        from sdp_lib.management_controllers.snmp.trap_server.ntfc_processor import create_trap_receiver
+
+        receiver = create_trap_receiver(ConfigParser(settings.traps.config_path))
+        receiver.start()
+    except Exception:
+        logger.exception('Ошибка запуска приёма trap')
+        return None
+    return receiver